@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: weekly volume, per-workout 1RM and weekday heatmap over N sets,
+computed per row in Python (the old code paths), with pandas, and with the
+NumPy kernels in src.utils.analytics_kernels.
+
+Usage: python benchmarks/bench_analytics_kernels.py [--sizes 10000 1000000 10000000] [--python-max 1000000]
+"""
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils import analytics_kernels as kernels
+
+def make_sets(n: int, seed: int = 0):
+    """n sets spread over ten years of workouts, in date order"""
+    rng = np.random.default_rng(seed)
+    workouts = max(1, n // 20)
+    workout_dates = np.sort(np.datetime64("2016-01-01T00:00", "us") + rng.integers(0, 3650 * 86400, workouts).astype("timedelta64[s]"))
+    dates = workout_dates[np.sort(rng.integers(0, workouts, n))]
+    return dates, rng.uniform(20, 200, n).round(1), rng.integers(1, 15, n).astype(float)
+
+def run_python(dates, weight, reps):
+    """The per-row loops the kernels replaced"""
+    weekly = defaultdict(float)
+    one_rms = {}
+    grid = defaultdict(float)
+    for date, w, r in zip(dates.astype(object), weight.tolist(), reps.tolist()):
+        year, week, _ = date.isocalendar()
+        weekly[f"{year}-W{week:02d}"] += w * r
+        if r < 37:
+            one_rms.setdefault(date, []).append(w * (36 / (37 - r)))
+        grid[(year * 100 + week, date.weekday())] += w * r
+    return weekly, {d: (np.mean(v), np.std(v)) for d, v in one_rms.items()}, grid
+
+def run_pandas(dates, weight, reps):
+    df = pd.DataFrame({"date": dates, "weight": weight, "reps": reps})
+    df["volume"] = df["weight"] * df["reps"]
+    iso = df["date"].dt.isocalendar()
+    weekly = df.groupby([iso["year"], iso["week"]])["volume"].sum()
+    df["one_rm"] = df["weight"] * 36 / (37 - df["reps"])
+    one_rms = df.groupby("date")["one_rm"].agg(["mean", "std"])
+    grid = df.pivot_table(values="volume", index=[iso["year"], iso["week"]], columns=df["date"].dt.weekday, aggfunc="sum", fill_value=0)
+    return weekly, one_rms, grid
+
+def run_kernels(dates, weight, reps):
+    volume = weight * reps
+    weekly = kernels.per_week(dates, volume)
+    one_rms = kernels.group_stats(dates, kernels.estimate_1rm(weight, reps))
+    grid = kernels.week_day_grid(dates, volume)
+    return weekly, one_rms, grid
+
+def timed(fn, *args, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--python-max", type=int, default=1_000_000, help="skip the per-row baseline above this many sets")
+    args = parser.parse_args()
+
+    print(f"{'sets':>10}  {'python':>10}  {'pandas':>10}  {'kernels':>10}  {'vs python':>9}  {'vs pandas':>9}")
+    for n in args.sizes:
+        data = make_sets(n)
+        repeat = 3 if n <= 1_000_000 else 1
+        py = timed(run_python, *data, repeat=1) if n <= args.python_max else float("nan")
+        pdt = timed(run_pandas, *data, repeat=repeat)
+        kt = timed(run_kernels, *data, repeat=repeat)
+        print(f"{n:>10}  {py:>9.3f}s  {pdt:>9.3f}s  {kt:>9.3f}s  {py / kt:>8.1f}x  {pdt / kt:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
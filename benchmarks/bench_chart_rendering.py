@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent dashboard requests rendered on the event loop vs in the chart worker pool.
+
+Each request renders the 4-panel dashboard from a synthetic year of training.
+Reports chart throughput, per-request latency and the event loop lag other
+updates would see meanwhile.
+
+Usage: python benchmarks/bench_chart_rendering.py [--requests 16] [--concurrency 8] [--workers 1 2 4]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.chart_rendering import ChartRenderPool, render_chart
+
+async def probe_loop_lag(stop: asyncio.Event, samples: list, interval: float = 0.01):
+    """Measure how late the event loop wakes up a sleeping coroutine"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+def make_payload(sessions: int = 150, seed: int = 1) -> dict:
+    rng = np.random.default_rng(seed)
+    days = np.sort(rng.choice(365, size=sessions, replace=False))
+    dates = np.datetime64("2025-01-01", "us") + days.astype("timedelta64[D]")
+    max_weight = 60 + np.cumsum(rng.normal(0.2, 1, sessions))
+    sets = np.repeat(dates, 5)
+    return {
+        "figsize": (15, 12),
+        "dpi": 100,
+        "weight": {"dates": dates, "max_weight": max_weight, "avg_weight": max_weight - 5},
+        "volume": {"dates": dates[-36:], "volume": rng.uniform(2000, 8000, 36)},
+        "one_rm": {"dates": sets[:100], "weight": rng.uniform(40, 100, 100), "reps": rng.integers(3, 12, 100).astype(float)},
+        "muscles": {"groups": ["Chest", "Back", "Legs", "Shoulders", "Arms"], "volume": rng.uniform(1e4, 5e4, 5)},
+    }
+
+def report(name: str, wall: float, latencies: list, lag: list):
+    latencies = sorted(latencies)
+    lag_ms = sorted(x * 1000 for x in lag) or [0.0]
+    p99 = lag_ms[min(len(lag_ms) - 1, int(len(lag_ms) * 0.99))]
+    print(
+        f"{name:<12} {len(latencies) / wall:5.2f} charts/s  "
+        f"latency p50={statistics.median(latencies):5.2f}s max={latencies[-1]:5.2f}s  "
+        f"loop lag p50={statistics.median(lag_ms):7.2f}ms p99={p99:7.2f}ms max={lag_ms[-1]:7.2f}ms"
+    )
+
+async def run(name: str, render, requests: int, concurrency: int):
+    payload = make_payload()
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def request():
+        async with slots:
+            started = time.perf_counter()
+            png = await render("dashboard", payload)
+            latencies.append(time.perf_counter() - started)
+            assert png.startswith(b"\x89PNG")
+
+    stop, lag = asyncio.Event(), []
+    probe = asyncio.create_task(probe_loop_lag(stop, lag))
+    wall = time.perf_counter()
+    await asyncio.gather(*[request() for _ in range(requests)])
+    wall = time.perf_counter() - wall
+    stop.set()
+    await probe
+    report(name, wall, latencies, lag)
+
+async def render_inline(kind: str, payload: dict) -> bytes:
+    """The old behaviour: draw on the event loop"""
+    return render_chart(kind, payload)
+
+async def run_pool(workers: int, requests: int, concurrency: int):
+    pool = ChartRenderPool(workers=workers, queue_size=requests)
+    # Warm up so worker start-up is not measured
+    await asyncio.gather(*[pool.render("dashboard", make_payload()) for _ in range(workers)])
+    await run(f"pool x{workers}", pool.render, requests, concurrency)
+    pool.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    print(f"{args.requests} dashboards, {args.concurrency} requests in flight")
+    render_chart("dashboard", make_payload())  # import matplotlib before timing
+    asyncio.run(run("event loop", render_inline, args.requests, args.concurrency))
+    for workers in args.workers:
+        asyncio.run(run_pool(workers, args.requests, args.concurrency))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark: workout exports of growing training histories.
+
+Fills a temporary SQLite database with one user's sets, then builds each
+export and reports its time, size, the longest stall of the event loop and
+the peak of Python memory allocated while building it (tracemalloc). A
+streaming export keeps the peak flat as the history grows; work moved to
+threads keeps the stall short. "csv-pandas" is the CSV export as it was before it
+streamed: ORM objects into a DataFrame, then to_csv.
+
+Usage: python benchmarks/bench_export.py [--sets 10000 50000] [--formats xlsx csv csv-pandas pdf]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.bot.config import config
+from src.database import connection
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from src.models import User, Exercise, Workout, WorkoutExercise, WorkoutSet
+from src.services.export_service import ExportService
+
+FORMATS = ["xlsx", "csv", "csv-pandas", "pdf"]
+
+SETS_PER_EXERCISE = 4
+EXERCISES_PER_WORKOUT = 5
+
+async def fill(sets: int) -> int:
+    """Insert a history of ``sets`` sets, one workout a day ending today"""
+    workouts = max(1, sets // (SETS_PER_EXERCISE * EXERCISES_PER_WORKOUT))
+    async with connection.get_session() as session:
+        user = User(telegram_id=1, created_at=datetime.now(), last_active=datetime.now())
+        exercises = [Exercise(name=f"Exercise {i}", category="bench", muscle_group="Chest") for i in range(EXERCISES_PER_WORKOUT)]
+        session.add_all([user, *exercises])
+        await session.flush()
+
+        start = datetime.now() - timedelta(days=workouts)
+        await session.execute(Workout.__table__.insert(), [
+            {"id": w + 1, "user_id": user.id, "date": start + timedelta(days=w)} for w in range(workouts)
+        ])
+        await session.execute(WorkoutExercise.__table__.insert(), [
+            {"id": w * EXERCISES_PER_WORKOUT + e + 1, "workout_id": w + 1, "exercise_id": exercises[e].id, "order": e}
+            for w in range(workouts) for e in range(EXERCISES_PER_WORKOUT)
+        ])
+        await session.execute(WorkoutSet.__table__.insert(), [
+            {"workout_exercise_id": we + 1, "set_number": n + 1, "reps": 5 + n, "weight": 60.0 + we % 40}
+            for we in range(workouts * EXERCISES_PER_WORKOUT) for n in range(SETS_PER_EXERCISE)
+        ])
+        return user.id
+
+async def export_csv_pandas(user_id: int, start_date: datetime) -> bytes:
+    """Reference: the CSV export before it streamed"""
+    import pandas as pd
+
+    async with connection.get_session() as session:
+        stmt = (
+            select(Workout)
+            .where(Workout.user_id == user_id, Workout.date >= start_date, Workout.date <= datetime.now())
+            .options(
+                selectinload(Workout.workout_exercises).selectinload(WorkoutExercise.exercise),
+                selectinload(Workout.workout_exercises).selectinload(WorkoutExercise.sets)
+            )
+            .order_by(Workout.date.desc())
+        )
+        workouts = (await session.execute(stmt)).scalars().unique().all()
+
+        data = []
+        for workout in workouts:
+            for workout_exercise in workout.workout_exercises:
+                exercise = workout_exercise.exercise
+                for workout_set in workout_exercise.sets:
+                    data.append({
+                        'Date': workout.date.strftime('%Y-%m-%d'),
+                        'Exercise': exercise.name,
+                        'Category': exercise.category,
+                        'Muscle Group': exercise.muscle_group,
+                        'Set': workout_set.set_number,
+                        'Reps': workout_set.reps,
+                        'Weight (kg)': workout_set.weight,
+                        'Volume (kg)': workout_set.reps * workout_set.weight,
+                        'RPE': workout_set.rpe or '',
+                        'Rest (sec)': workout_set.rest_seconds or '',
+                        'Notes': workout_set.notes or ''
+                    })
+
+        csv_file = BytesIO()
+        pd.DataFrame(data).to_csv(csv_file, index=False, encoding='utf-8')
+        return csv_file.getvalue()
+
+async def build(fmt: str, user_id: int) -> int:
+    """Build one export and return its size in bytes"""
+    service = ExportService()
+    since = datetime.now() - timedelta(days=100 * 365)
+    if fmt == "xlsx":
+        with await service.export_to_excel_file(user_id, since) as export:
+            return export.seek(0, 2)
+    if fmt == "csv":
+        with await service.export_to_csv_file(user_id, since) as export:
+            return export.seek(0, 2)
+    if fmt == "pdf":
+        return len(await service.export_to_pdf(user_id, since))
+    return len(await export_csv_pandas(user_id, since))
+
+async def longest_stall(stop: asyncio.Event) -> float:
+    """Longest time the event loop did not run this task until stop is set"""
+    longest = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        longest = max(longest, now - last)
+        last = now
+    return longest
+
+async def run(sets: int, formats: list, report: bool = True):
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATABASE_URL = f"sqlite:///{tmp}/bench.db"
+        config.IS_DEVELOPMENT = False
+        await connection.init_db()
+        try:
+            user_id = await fill(sets)
+            for fmt in formats:
+                stop = asyncio.Event()
+                stall = asyncio.create_task(longest_stall(stop))
+                started = time.perf_counter()
+                size = await build(fmt, user_id)
+                elapsed = time.perf_counter() - started
+                stop.set()
+                stall = await stall
+                if not report:
+                    continue
+                # Traced separately, tracemalloc slows the build down several times
+                tracemalloc.start()
+                await build(fmt, user_id)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(
+                    f"{fmt:<10} {sets:>9} sets  {elapsed:7.2f}s  stall {stall * 1000:6.0f} ms  "
+                    f"{size / 2 ** 20:7.2f} MB file  peak {peak / 2 ** 20:7.2f} MB"
+                )
+        finally:
+            await connection.close_db()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sets", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--formats", nargs="+", default=FORMATS, choices=FORMATS)
+    args = parser.parse_args()
+
+    # Import the export libraries before measuring
+    asyncio.run(run(100, args.formats, report=False))
+    for sets in args.sets:
+        asyncio.run(run(sets, args.formats))
+
+if __name__ == "__main__":
+    main()
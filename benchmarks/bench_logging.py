@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: handler latency with logging off, the old synchronous FileHandler, and queue-based logging.
+
+Each simulated handler does a little CPU work and writes a few INFO lines,
+like the workout and nutrition handlers. Console output goes to /dev/null.
+With --stall-every N every Nth flush of the log file sleeps --stall-ms,
+like a busy disk or a full Docker log pipe would.
+
+Usage: python benchmarks/bench_logging.py [--handlers 10000] [--concurrency 100] [--lines 4] [--stall-every 200] [--stall-ms 20]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.logging_setup import LOG_FORMAT, setup_logging
+
+logger = logging.getLogger("src.handlers.workout")
+
+async def handler(user_id: int, lines: int) -> float:
+    start = time.perf_counter()
+    total = sum(range(2000))
+    for i in range(lines):
+        logger.info(f"User {user_id} logged set {i}: {total} kg total")
+        await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+async def run(handlers: int, concurrency: int, lines: int) -> list:
+    latencies = []
+    for batch in range(0, handlers, concurrency):
+        latencies += await asyncio.gather(*[
+            handler(user_id, lines) for user_id in range(batch, min(batch + concurrency, handlers))
+        ])
+    return latencies
+
+class StallingStream:
+    """File stream whose flush blocks every ``every`` calls"""
+
+    def __init__(self, stream, every: int, seconds: float):
+        self.stream = stream
+        self.every = every
+        self.seconds = seconds
+        self.flushes = 0
+
+    def write(self, data):
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+        self.flushes += 1
+        if self.every and self.flushes % self.every == 0:
+            time.sleep(self.seconds)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+
+def configure(mode: str, directory: str, stall_every: int, stall_seconds: float):
+    """Returns a listener to stop, if any"""
+    reset_root()
+    root = logging.getLogger()
+    if mode == "off":
+        root.setLevel(logging.WARNING)
+        return None
+    if mode == "sync":
+        formatter = logging.Formatter(LOG_FORMAT)
+        file_handler = logging.FileHandler(os.path.join(directory, "sync.log"), encoding="utf-8")
+        file_handler.stream = StallingStream(file_handler.stream, stall_every, stall_seconds)
+        for handler in (logging.StreamHandler(), file_handler):
+            handler.setFormatter(formatter)
+            root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        return None
+    listener = setup_logging(level=logging.INFO, log_file=os.path.join(directory, "queue.log"))
+    file_handler = listener.handlers[1]
+    file_handler.stream = StallingStream(file_handler.stream, stall_every, stall_seconds)
+    return listener
+
+def report(mode: str, wall: float, latencies: list, dropped: int):
+    ms = sorted(x * 1000 for x in latencies)
+    pick = lambda q: ms[min(len(ms) - 1, int(len(ms) * q))]
+    print(
+        f"{mode:<6} wall={wall:6.2f}s  {len(ms) / wall:8.0f} handlers/s  "
+        f"latency p50={pick(0.5):7.3f}ms p99={pick(0.99):7.3f}ms max={ms[-1]:7.3f}ms  dropped={dropped}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--handlers", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--lines", type=int, default=4)
+    parser.add_argument("--stall-every", type=int, default=0, help="0 disables simulated disk stalls")
+    parser.add_argument("--stall-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    stderr = sys.stderr
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull:
+        for mode in ("off", "sync", "queue"):
+            sys.stderr = devnull
+            try:
+                listener = configure(mode, directory, args.stall_every, args.stall_ms / 1000)
+                wall = time.perf_counter()
+                latencies = asyncio.run(run(args.handlers, args.concurrency, args.lines))
+                wall = time.perf_counter() - wall
+                dropped = sum(getattr(handler, "dropped", 0) for handler in logging.getLogger().handlers)
+                if listener:
+                    listener.stop()
+                reset_root()
+            finally:
+                sys.stderr = stderr
+            report(mode, wall, latencies, dropped)
+
+if __name__ == "__main__":
+    main()
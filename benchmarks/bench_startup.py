@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold import of the bot, failing when startup regresses.
+
+Each run is a fresh interpreter that first imports the libraries the bot
+cannot start without (aiogram, SQLAlchemy, aiohttp, ...), then src.bot.app.
+The second step is the bot's own overhead, which is compared against the
+budget so the check holds on slow and fast machines alike. Heavy libraries
+that must stay off the startup path fail the run if they get imported.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--budget 0.5]
+Exit status 1 on regression.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Needed to receive a single update
+FLOOR = [
+    "aiogram", "aiogram.types", "aiogram.methods", "aiohttp", "aiosqlite",
+    "sqlalchemy", "sqlalchemy.ext.asyncio", "prometheus_client", "dotenv",
+]
+
+# Loaded on first use (exports) or only in chart workers
+HEAVY = ["numpy", "pandas", "matplotlib", "seaborn", "openpyxl", "reportlab"]
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+for name in {FLOOR!r}:
+    __import__(name)
+floor = time.perf_counter()
+import src.bot.app
+end = time.perf_counter()
+print(json.dumps({{
+    "floor": floor - start,
+    "bot": end - floor,
+    "heavy": [name for name in {HEAVY!r} if name in sys.modules],
+}}))
+"""
+
+def measure() -> dict:
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        sys.exit(result.stderr)
+    return json.loads(result.stdout.splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=0.5, help="seconds the bot may add on top of its dependencies")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    floor = statistics.median(r["floor"] for r in runs)
+    bot = statistics.median(r["bot"] for r in runs)
+    heavy = sorted({name for r in runs for name in r["heavy"]})
+
+    print(f"dependencies  {floor:6.3f}s  (median of {args.runs})")
+    print(f"bot modules   {bot:6.3f}s  budget {args.budget:.3f}s")
+    print(f"cold start    {floor + bot:6.3f}s")
+
+    failed = False
+    if bot > args.budget:
+        print(f"FAIL: bot modules take {bot:.3f}s, over the {args.budget:.3f}s budget")
+        failed = True
+    if heavy:
+        print(f"FAIL: heavy libraries imported at startup: {', '.join(heavy)}")
+        print("      run benchmarks/profile_imports.py to see who imports them")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: 100k concurrent rest timers on the timing wheel vs one task per timer.
+
+Usage: python benchmarks/bench_timer_wheel.py [--timers 100000] [--spread 5]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.timer_service import TimerManager
+
+async def probe_loop_lag(stop: asyncio.Event, samples: list, interval: float = 0.01):
+    """Measure how late the event loop wakes up a sleeping coroutine"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+def report(name: str, wall: float, cpu: float, lag: list, fired: int):
+    lag_ms = sorted(x * 1000 for x in lag) or [0.0]
+    p99 = lag_ms[min(len(lag_ms) - 1, int(len(lag_ms) * 0.99))]
+    print(
+        f"{name:<14} fired={fired:>7}  wall={wall:6.2f}s  cpu={cpu:6.2f}s  "
+        f"loop lag p50={statistics.median(lag_ms):6.2f}ms p99={p99:7.2f}ms max={lag_ms[-1]:7.2f}ms"
+    )
+
+async def run_wheel(durations):
+    manager = TimerManager()
+    manager.start()
+    done = asyncio.Event()
+    fired = 0
+
+    async def on_expire(bot, user_id, timer):
+        nonlocal fired
+        fired += 1
+        if fired == len(durations):
+            done.set()
+
+    manager.set_expiry_handler(on_expire)
+    stop, lag = asyncio.Event(), []
+    probe = asyncio.create_task(probe_loop_lag(stop, lag))
+    wall, cpu = time.perf_counter(), time.process_time()
+
+    t0 = time.perf_counter()
+    for user_id, duration in enumerate(durations):
+        await manager.start_timer(user_id, duration, chat_id=user_id)
+    start_cost = (time.perf_counter() - t0) / len(durations)
+
+    await done.wait()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    stop.set()
+    await probe
+    manager.shutdown()
+    report("timing wheel", wall, cpu, lag, fired)
+    print(f"{'':<14} start_timer: {start_cost * 1e6:.2f}us/op")
+
+async def run_tasks(durations):
+    fired = 0
+    done = asyncio.Event()
+
+    async def notify(duration):
+        nonlocal fired
+        await asyncio.sleep(duration)
+        fired += 1
+        if fired == len(durations):
+            done.set()
+
+    stop, lag = asyncio.Event(), []
+    probe = asyncio.create_task(probe_loop_lag(stop, lag))
+    wall, cpu = time.perf_counter(), time.process_time()
+    tasks = [asyncio.create_task(notify(d)) for d in durations]
+    await done.wait()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    stop.set()
+    await probe
+    await asyncio.gather(*tasks)
+    report("task per timer", wall, cpu, lag, fired)
+
+async def bench_cancel(count: int):
+    manager = TimerManager()
+    for user_id in range(count):
+        await manager.start_timer(user_id, random.randint(30, 300), chat_id=user_id)
+    t0 = time.perf_counter()
+    for user_id in range(count):
+        await manager.stop_timer(user_id)
+    print(f"{'':<14} stop_timer: {(time.perf_counter() - t0) / count * 1e6:.2f}us/op")
+    manager.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--timers", type=int, default=100_000)
+    parser.add_argument("--spread", type=float, default=10.0, help="timers expire uniformly over this many seconds")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    durations = [1 + rng.random() * args.spread for _ in range(args.timers)]
+    print(f"{args.timers} timers expiring over {args.spread:.0f}s")
+    asyncio.run(run_wheel(durations))
+    asyncio.run(bench_cancel(args.timers))
+    asyncio.run(run_tasks(durations))
+
+if __name__ == "__main__":
+    main()
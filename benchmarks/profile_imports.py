@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Profile what importing a module costs, using python -X importtime in a fresh interpreter.
+
+Prints the slowest imports by cumulative time and the self time summed per
+top-level package, which shows where a cold start goes.
+
+Usage: python benchmarks/profile_imports.py [--module src.bot.app] [--top 25]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def profile(module: str):
+    """(self_us, cumulative_us, depth, name) per imported module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode:
+        sys.exit(result.stderr)
+    return [
+        (int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, m.group(4))
+        for m in map(LINE.match, result.stderr.splitlines()) if m
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.bot.app")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    rows = profile(args.module)
+    total = sum(row[0] for row in rows)
+    print(f"import {args.module}: {total / 1e6:.3f}s in {len(rows)} modules\n")
+
+    print(f"{'cumulative':>12}  {'self':>10}  module")
+    for self_us, cumulative, depth, name in sorted(rows, key=lambda r: -r[1])[:args.top]:
+        print(f"{cumulative / 1e3:>10.1f}ms  {self_us / 1e3:>8.1f}ms  {'  ' * min(depth, 8)}{name}")
+
+    packages = defaultdict(int)
+    for self_us, _, _, name in rows:
+        top = name.split(".")[0]
+        packages[f"src.{name.split('.')[1]}" if top == "src" and "." in name else top] += self_us
+    print(f"\n{'self total':>12}  package")
+    for package, self_us in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{self_us / 1e3:>10.1f}ms  {package}")
+
+if __name__ == "__main__":
+    main()
@@ -26,7 +26,7 @@ async def main():
     # Create and start bot
     bot = create_bot()
 
-    if config.IS_PRODUCTION and config.WEBHOOK_URL:
+    if config.BOT_MODE == "webhook":
         await bot.start_webhook()
     else:
         await bot.start_polling()
@@ -1,14 +1,24 @@
 import asyncio
 import logging
+import signal
+from typing import Optional
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
 from src.services.notification_service import notification_service
 from src.services.nutrition_service import nutrition_service
+from src.services.broadcast_service import broadcast_service
+from src.services.export_jobs import export_jobs
 
 from src.bot.config import config
 from src.handlers import register_all_handlers
+from src.middlewares import register_all_middlewares
 from src.database.connection import init_db, close_db
+from src.bot.monitoring import MonitoringServer, instrument_engine
+from src.bot.startup import StartupOrchestrator
+from src.middlewares.metrics import ApiTimingMiddleware, instrument_db_timing
+from src.services.data_version import track_writes
+from src.utils.logging_setup import setup_logging, parse_sampling
 
 logger = logging.getLogger(__name__)
 
@@ -20,65 +30,125 @@ class GymBot:
             token=config.TELEGRAM_TOKEN,
             default=DefaultBotProperties(parse_mode=ParseMode.HTML)
         )
+        self.bot.session.middleware(ApiTimingMiddleware())
         self.dp = Dispatcher()
+        self.monitoring = MonitoringServer(max_loop_lag=config.HEALTH_MAX_LOOP_LAG_SECONDS)
+        self.startup: Optional[StartupOrchestrator] = None
         self._setup_logging()
 
+    @property
+    def serves_monitoring_on_webhook(self) -> bool:
+        """In webhook mode on the same port, /health and /metrics live on the webhook server"""
+        return config.BOT_MODE == "webhook" and config.METRICS_PORT == config.WEBHOOK_PORT
+
     def _setup_logging(self):
         """Configure logging"""
         log_level = getattr(logging, config.LOG_LEVEL.upper(), logging.INFO)
 
-        logging.basicConfig(
+        self.log_listener = setup_logging(
             level=log_level,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(),
-                logging.FileHandler('bot.log', encoding='utf-8')
-            ]
+            log_file=config.LOG_FILE,
+            json_format=config.LOG_JSON,
+            max_bytes=config.LOG_MAX_BYTES,
+            rotate_hours=config.LOG_ROTATE_HOURS,
+            backup_count=config.LOG_BACKUP_COUNT,
+            sampling=parse_sampling(config.LOG_SAMPLING)
         )
 
     async def on_startup(self):
-        """Actions to perform on bot startup"""
+        """Actions to perform on bot startup.
+
+        Updates are accepted once the critical phases are done; reminders,
+        interrupted broadcasts and chart workers come up in the background.
+        """
         logger.info("Starting bot...")
 
-        # Initialize database
+        # Handlers may use these before their background phases finish
+        notification_service.set_bot(self.bot)
+        broadcast_service.set_bot(self.bot)
+        export_jobs.set_bot(self.bot)
+
+        startup = self.startup = StartupOrchestrator()
+        startup.add("database", self._init_database)
+        startup.add("monitoring", self._start_monitoring)
+        startup.add("handlers", self._register_handlers)
+        startup.add("nutrition", nutrition_service.create_session)
+        startup.add("seed", self._seed_exercises, after=["database"])
+        startup.add("timers", self._start_timers, after=["database"])
+        startup.add("notifications", notification_service.initialize_all_notifications, after=["database"], critical=False)
+        # Resume interrupted broadcasts from their checkpoints
+        startup.add("broadcasts", broadcast_service.resume_pending, after=["database"], critical=False)
+        startup.add("exports", self._start_export_jobs, after=["database"], critical=False)
+        # Importing matplotlib in the workers would compete for CPU with the critical phases
+        startup.add("charts", self._start_chart_workers, after=["seed", "timers"], critical=False)
+        await startup.run()
+
+        logger.info("Bot startup complete!")
+
+    async def _init_database(self):
         await init_db()
-        logger.info("Database initialized")
+        from src.database import connection
+        instrument_engine(connection.engine)
+        instrument_db_timing(connection.engine)
+        track_writes()
 
-        # Seed exercises
+    async def _start_monitoring(self):
+        """Health and metrics endpoints"""
+        self.monitoring.lag_monitor.start()
+        if not self.serves_monitoring_on_webhook:
+            await self.monitoring.start(config.METRICS_HOST, config.METRICS_PORT)
+
+    async def _seed_exercises(self):
         from src.data.exercises import seed_exercises
         from src.database.connection import get_session
         async with get_session() as session:
             count = await seed_exercises(session)
-            logger.info(f"Seeded {count} exercises to database")
+            if count:
+                logger.info(f"Seeded {count} new or changed exercises to database")
+            else:
+                logger.info("Exercise seed data unchanged")
 
-        # Register handlers
+    async def _register_handlers(self):
+        register_all_middlewares(self.dp)
         register_all_handlers(self.dp)
-        logger.info("Handlers registered")
 
-        # Start background tasks
+    async def _start_timers(self):
         from src.services.timer_service import timer_manager
-        timer_manager.start_cleanup_task()
-        logger.info("Background tasks started")
-
-        # Initialize notification service
-        notification_service.set_bot(self.bot)
-        await notification_service.initialize_all_notifications()
-        logger.info("Notification service initialized")
+        from src.services.timer_store import create_timer_store
+        timer_manager.set_bot(self.bot)
+        timer_manager.set_store(create_timer_store())
+        timer_manager.start()
+        await timer_manager.restore()
 
-        # Initialize nutrition service HTTP session
-        await nutrition_service.create_session()
-        logger.info("Nutrition service initialized")
+    async def _start_export_jobs(self):
+        # Jobs submitted before this wait in the queue
+        export_jobs.start()
+        await export_jobs.resume_pending()
 
-        logger.info("Bot startup complete!")
+    async def _start_chart_workers(self):
+        from src.services.chart_rendering import chart_pool
+        await chart_pool.warm()
 
     async def on_shutdown(self):
         """Actions to perform on bot shutdown"""
         logger.info("Shutting down bot...")
-        
+
+        # Background startup phases may still be running
+        if self.startup is not None:
+            await self.startup.cancel()
+
         # Shutdown nutrition service HTTP session
         await nutrition_service.close_session()
         logger.info("Nutrition service session closed")
         
+        # Stop broadcasts; progress is checkpointed in the database
+        await broadcast_service.shutdown()
+        logger.info("Broadcast service shutdown")
+
+        # Stop export workers; unfinished jobs are resumed on the next start
+        export_jobs.shutdown()
+        logger.info("Export workers stopped")
+
         # Shutdown notification service
         notification_service.shutdown()
         logger.info("Notification service shutdown")
@@ -86,8 +156,16 @@ class GymBot:
         # Cleanup timers
         from src.services.timer_service import timer_manager
         timer_manager.shutdown()
+        await timer_manager.store.close()
         logger.info("Timer service shutdown")
 
+        from src.services.chart_rendering import chart_pool
+        chart_pool.shutdown()
+        logger.info("Chart workers stopped")
+
+        # Stop health and metrics endpoints
+        await self.monitoring.stop()
+
         # Close database
         await close_db()
         logger.info("Database connection closed")
@@ -98,12 +176,20 @@ class GymBot:
         
         logger.info("Bot shutdown complete")
 
+        # Flush queued log records
+        self.log_listener.stop()
+
     async def start_polling(self):
         """Start bot in polling mode"""
         try:
             await self.on_startup()
             logger.info("Starting polling...")
-            await self.dp.start_polling(self.bot)
+            # Updates run as tasks; the limit stops fetching more while too many are pending
+            await self.dp.start_polling(
+                self.bot,
+                handle_as_tasks=True,
+                tasks_concurrency_limit=config.MAX_PENDING_UPDATES
+            )
         except KeyboardInterrupt:
             logger.info("Received keyboard interrupt")
         except Exception as e:
@@ -117,8 +203,41 @@ class GymBot:
         if not config.WEBHOOK_URL:
             raise ValueError("WEBHOOK_URL not configured")
 
-        # TODO: Implement webhook mode
-        raise NotImplementedError("Webhook mode not implemented yet")
+        from src.bot.webhook import WebhookServer
+        server = WebhookServer(
+            self.bot,
+            self.dp,
+            path=config.WEBHOOK_PATH,
+            secret_token=config.WEBHOOK_SECRET_TOKEN,
+            max_pending=config.MAX_PENDING_UPDATES
+        )
+        if self.serves_monitoring_on_webhook:
+            self.monitoring.add_routes(server.app)
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop_event.set)
+
+        try:
+            await self.on_startup()
+            await server.start(config.WEBHOOK_HOST, config.WEBHOOK_PORT)
+            await self.bot.set_webhook(
+                url=config.WEBHOOK_URL,
+                secret_token=config.WEBHOOK_SECRET_TOKEN,
+                allowed_updates=self.dp.resolve_used_update_types(),
+                max_connections=100
+            )
+            await self.dp.emit_startup(bot=self.bot)
+            logger.info(f"Webhook set to {config.WEBHOOK_URL}")
+            await stop_event.wait()
+        except Exception as e:
+            logger.error(f"Error in webhook mode: {e}")
+            raise
+        finally:
+            # The webhook stays registered, Telegram queues updates until we are back
+            await server.stop(config.WEBHOOK_DRAIN_SECONDS)
+            await self.dp.emit_shutdown(bot=self.bot)
+            await self.on_shutdown()
 
 def create_bot() -> GymBot:
     """Factory function to create bot instance"""
@@ -135,7 +254,7 @@ async def main():
     # Create and start bot
     bot = create_bot()
     
-    if config.IS_PRODUCTION and config.WEBHOOK_URL:
+    if config.BOT_MODE == "webhook":
         logger.info("Starting in webhook mode")
         await bot.start_webhook()
     else:
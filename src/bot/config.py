@@ -23,20 +23,92 @@ class Config:
 
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FILE: str = os.getenv("LOG_FILE", "logs/bot.log")
+    LOG_JSON: bool = os.getenv("LOG_JSON", "False").lower() == "true"
+    LOG_MAX_BYTES: int = int(os.getenv("LOG_MAX_BYTES", str(10 * 2 ** 20)))
+    LOG_ROTATE_HOURS: float = float(os.getenv("LOG_ROTATE_HOURS", "24"))
+    LOG_BACKUP_COUNT: int = int(os.getenv("LOG_BACKUP_COUNT", "14"))
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "")  # e.g. src.handlers.workout=0.1,aiogram.event=0.01
 
     USDA_API_KEY: str = os.getenv("USDA_API_KEY", "")
 
     # Rate limiting
     MAX_CONCURRENT_USERS: int = int(os.getenv("MAX_CONCURRENT_USERS", "100"))
     RATE_LIMIT_MESSAGES_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_MESSAGES_PER_MINUTE", "20"))
+    RATE_LIMIT_CALLBACKS_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_CALLBACKS_PER_MINUTE", "120"))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "10"))
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()  # memory or redis
+    MAX_PENDING_UPDATES: int = int(os.getenv("MAX_PENDING_UPDATES", "1000"))
+
+    # Heavy commands (charts, exports) run in their own admission queue
+    HEAVY_COMMANDS: list[str] = [
+        cmd.strip().lower()
+        for cmd in os.getenv("HEAVY_COMMANDS", "progress").split(",")
+        if cmd.strip()
+    ]
+    HEAVY_CALLBACK_PREFIXES: list[str] = [
+        prefix.strip()
+        for prefix in os.getenv("HEAVY_CALLBACK_PREFIXES", "progress:").split(",")
+        if prefix.strip()
+    ]
+    HEAVY_CONCURRENCY: int = int(os.getenv("HEAVY_CONCURRENCY", "2"))
+    HEAVY_QUEUE_SIZE: int = int(os.getenv("HEAVY_QUEUE_SIZE", "50"))
+
+    # Chart rendering worker processes
+    CHART_WORKERS: int = int(os.getenv("CHART_WORKERS", "2"))
+    CHART_QUEUE_SIZE: int = int(os.getenv("CHART_QUEUE_SIZE", "20"))
+    CHART_RENDER_TIMEOUT_SECONDS: float = float(os.getenv("CHART_RENDER_TIMEOUT_SECONDS", "30"))
+    CHART_WORKER_MAX_TASKS: int = int(os.getenv("CHART_WORKER_MAX_TASKS", "100"))  # charts per worker before recycling
+    CHART_MAX_POINTS: int = int(os.getenv("CHART_MAX_POINTS", "150"))  # longer series are downsampled (LTTB)
+
+    # Rendered chart cache: memory LRU and optional directory (empty disables it)
+    CHART_CACHE_MAX_BYTES: int = int(os.getenv("CHART_CACHE_MAX_BYTES", str(64 * 2 ** 20)))
+    CHART_CACHE_DIR: Optional[str] = os.getenv("CHART_CACHE_DIR") or None
+    CHART_CACHE_DISK_MAX_BYTES: int = int(os.getenv("CHART_CACHE_DISK_MAX_BYTES", str(512 * 2 ** 20)))
+
+    # Exports stream rows in chunks into a temp file that moves to disk past this size
+    EXPORT_CHUNK_ROWS: int = int(os.getenv("EXPORT_CHUNK_ROWS", "1000"))
+    EXPORT_SPOOL_MAX_BYTES: int = int(os.getenv("EXPORT_SPOOL_MAX_BYTES", str(4 * 2 ** 20)))
+    # Export jobs: files are built by background workers; a user may have this many queued or running
+    EXPORT_WORKERS: int = int(os.getenv("EXPORT_WORKERS", "2"))
+    EXPORT_MAX_JOBS_PER_USER: int = int(os.getenv("EXPORT_MAX_JOBS_PER_USER", "2"))
+    EXPORT_JOB_MAX_ATTEMPTS: int = int(os.getenv("EXPORT_JOB_MAX_ATTEMPTS", "3"))  # jobs interrupted by restarts are retried
 
     # Webhook (for production)
     WEBHOOK_URL: Optional[str] = os.getenv("WEBHOOK_URL")
-    WEBHOOK_PORT: int = int(os.getenv("WEBHOOK_PORT", "8443"))
+    WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "/webhook")
+    WEBHOOK_HOST: str = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+    WEBHOOK_PORT: int = int(os.getenv("WEBHOOK_PORT", "8000"))
+    WEBHOOK_SECRET_TOKEN: Optional[str] = os.getenv("WEBHOOK_SECRET_TOKEN")
+    WEBHOOK_DRAIN_SECONDS: float = float(os.getenv("WEBHOOK_DRAIN_SECONDS", "25"))
+
+    # Monitoring: /health and /metrics (shared with the webhook server if on the same port)
+    METRICS_HOST: str = os.getenv("METRICS_HOST", "0.0.0.0")
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "8000"))
+    HEALTH_MAX_LOOP_LAG_SECONDS: float = float(os.getenv("HEALTH_MAX_LOOP_LAG_SECONDS", "1.0"))
+    LOOP_BLOCK_THRESHOLD_MS: float = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))  # 0 disables the watchdog
+
+    # Per-update profiling, armed at startup when PROFILE_ARM_SECONDS > 0 or via /profile_arm
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "logs/profiles")
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+    PROFILE_ARM_SECONDS: int = int(os.getenv("PROFILE_ARM_SECONDS", "0"))
+    PROFILE_ARM_ROUTE: Optional[str] = os.getenv("PROFILE_ARM_ROUTE") or None  # e.g. /progress or cb:export
+    PROFILE_ARM_USER_ID: Optional[int] = int(os.getenv("PROFILE_ARM_USER_ID")) if os.getenv("PROFILE_ARM_USER_ID") else None
+    PROFILE_MAX_CAPTURES: int = int(os.getenv("PROFILE_MAX_CAPTURES", "20"))
+
+    # polling or webhook
+    BOT_MODE: str = os.getenv("BOT_MODE", "webhook" if IS_PRODUCTION and WEBHOOK_URL else "polling").lower()
 
     # Redis (optional)
     REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
 
+    # Rest timer persistence: sql (main database), redis (REDIS_URL) or memory
+    TIMER_STORE: str = os.getenv("TIMER_STORE", "sql").lower()
+
+    # Live countdown: default for new users and the global message edit budget
+    TIMER_LIVE_DEFAULT: bool = os.getenv("TIMER_LIVE_DEFAULT", "False").lower() == "true"
+    TIMER_LIVE_MAX_EDITS_PER_SECOND: float = float(os.getenv("TIMER_LIVE_MAX_EDITS_PER_SECOND", "10"))
+
     # Admin
     ADMIN_USER_IDS: list[int] = [
         int(uid.strip())
@@ -44,6 +116,11 @@ class Config:
         if uid.strip()
     ]
 
+    # Broadcast
+    BROADCAST_RATE_PER_SECOND: float = float(os.getenv("BROADCAST_RATE_PER_SECOND", "20"))
+    BROADCAST_BATCH_SIZE: int = int(os.getenv("BROADCAST_BATCH_SIZE", "100"))
+    BROADCAST_CHECKPOINT_EVERY: int = int(os.getenv("BROADCAST_CHECKPOINT_EVERY", "10"))
+
     # Feature flags
     ENABLE_NUTRITION: bool = os.getenv("ENABLE_NUTRITION", "True").lower() == "true"
     ENABLE_SOCIAL: bool = os.getenv("ENABLE_SOCIAL", "False").lower() == "true"
@@ -67,6 +144,21 @@ class Config:
         if cls.IS_PRODUCTION and not cls.WEBHOOK_URL:
             logger.warning("Running in production without webhook URL")
 
+        if cls.BOT_MODE == "webhook":
+            if not cls.WEBHOOK_URL:
+                logger.error("BOT_MODE=webhook requires WEBHOOK_URL")
+                return False
+            if not cls.WEBHOOK_SECRET_TOKEN:
+                logger.warning("WEBHOOK_SECRET_TOKEN is not set, webhook requests are not authenticated")
+
+        if cls.TIMER_STORE == "redis" and not cls.REDIS_URL:
+            logger.error("TIMER_STORE=redis requires REDIS_URL")
+            return False
+
+        if cls.RATE_LIMIT_BACKEND == "redis" and not cls.REDIS_URL:
+            logger.error("RATE_LIMIT_BACKEND=redis requires REDIS_URL")
+            return False
+
         if cls.ENABLE_NUTRITION and not cls.USDA_API_KEY:
             logger.warning("Nutrition feature enabled but USDA_API_KEY is not set")
 
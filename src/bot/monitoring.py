@@ -0,0 +1,234 @@
+"""Health and Prometheus metrics endpoints"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from aiohttp import web
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event, text
+
+from src.bot.config import config
+from src.database import connection
+from src.utils.metrics import (
+    CACHE_REQUESTS, DB_CONNECTIONS_IN_USE, EVENT_LOOP_LAG_SECONDS, EVENT_LOOP_LAG_OBSERVED, EVENT_LOOP_BLOCKS
+)
+from src.utils.profiler import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+def find_offender(stack: traceback.StackSummary) -> str:
+    """Innermost frame of our own code in a stack, else the innermost frame"""
+    for frame in reversed(stack):
+        if frame.filename.startswith(PROJECT_ROOT) and "site-packages" not in frame.filename:
+            return f"{frame.name} ({os.path.relpath(frame.filename, PROJECT_ROOT)}:{frame.lineno})"
+    frame = stack[-1]
+    return f"{frame.name} ({os.path.basename(frame.filename)}:{frame.lineno})"
+
+class LoopLagMonitor:
+    """Measures event loop lag and captures the stack of whatever blocks the loop.
+
+    A probe task wakes every ``interval`` and records how late it woke. A
+    watchdog thread follows the probe's due time; once the loop is
+    ``block_threshold`` late running it, the loop thread is stuck in
+    synchronous code, so the watchdog reads that thread's stack and counts
+    the innermost frame of our code as the offender.
+    """
+
+    def __init__(self, interval: float = 0.1, block_threshold: float = 0.1, max_offenders: int = 100):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.max_offenders = max_offenders
+        self.lag = 0.0
+        self.offenders: Dict[str, int] = {}
+        self.recent_blocks: Deque[dict] = deque(maxlen=20)
+        self._due: Optional[float] = None
+        self._thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._thread_id = threading.get_ident()
+            self._due = time.monotonic() + self.interval
+            self._task = asyncio.create_task(self._run())
+        if self.block_threshold > 0 and (self._watchdog is None or not self._watchdog.is_alive()):
+            self._stop = threading.Event()
+            self._watchdog = threading.Thread(target=self._watch, args=(self._stop,), name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._stop.set()
+
+    async def _run(self):
+        while True:
+            try:
+                self._due = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                self.lag = max(0.0, time.monotonic() - self._due)
+                EVENT_LOOP_LAG_SECONDS.set(self.lag)
+                EVENT_LOOP_LAG_OBSERVED.observe(self.lag)
+            except asyncio.CancelledError:
+                break
+
+    def _watch(self, stop: threading.Event):
+        captured_for = None
+        while not stop.wait(min(self.block_threshold / 2, 0.05)):
+            due = self._due
+            if due is None or due == captured_for:
+                continue
+            stalled = time.monotonic() - due
+            if stalled >= self.block_threshold:
+                # One capture per stall
+                captured_for = due
+                frame = sys._current_frames().get(self._thread_id)
+                if frame is not None:
+                    self._record_block(traceback.extract_stack(frame), stalled)
+
+    def _record_block(self, stack: traceback.StackSummary, stalled: float):
+        offender = find_offender(stack)
+        if offender not in self.offenders and len(self.offenders) >= self.max_offenders:
+            offender = "other"
+        self.offenders[offender] = self.offenders.get(offender, 0) + 1
+        EVENT_LOOP_BLOCKS.labels(offender).inc()
+
+        formatted = "".join(traceback.format_list(stack[-15:]))
+        self.recent_blocks.append({"at": time.time(), "offender": offender, "stalled": stalled, "stack": formatted})
+        logger.warning(f"Event loop blocked for {stalled * 1000:.0f}+ ms in {offender}\n{formatted}")
+
+    def top_offenders(self, limit: int = 5) -> List[Tuple[str, int]]:
+        return sorted(self.offenders.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+# Shared so /health, /metrics and /perf read the same probe
+loop_lag_monitor = LoopLagMonitor(block_threshold=config.LOOP_BLOCK_THRESHOLD_MS / 1000)
+
+def process_rss_bytes() -> int:
+    """Resident set size of this process"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss is the peak, in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def cache_hit_rates() -> Dict[str, Tuple[int, int]]:
+    """Hits and misses per cache since start"""
+    rates: Dict[str, List[int]] = {}
+    for metric in CACHE_REQUESTS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total"):
+                counts = rates.setdefault(sample.labels["cache"], [0, 0])
+                counts[0 if sample.labels["result"] == "hit" else 1] += int(sample.value)
+    return {cache: (hits, misses) for cache, (hits, misses) in rates.items()}
+
+class RuntimeCollector:
+    """Gauges read from the services at scrape time"""
+
+    def collect(self):
+        from src.services.timer_service import timer_manager
+        from src.services.broadcast_service import broadcast_service
+        from src.services.notification_service import notification_service
+
+        pool = connection.engine.pool if connection.engine else None
+        if pool is not None and hasattr(pool, "size"):
+            size = GaugeMetricFamily("gymbot_db_pool_size", "Database connection pool size")
+            size.add_metric([], pool.size())
+            yield size
+
+        queue = GaugeMetricFamily("gymbot_outbound_queue_depth", "Outgoing messages waiting to be sent", labels=["queue"])
+        queue.add_metric(["countdown"], timer_manager.countdown.backlog())
+        queue.add_metric(["broadcast"], broadcast_service.pending_count())
+        yield queue
+
+        lag = GaugeMetricFamily("gymbot_scheduler_lag_seconds", "How late the timer wheel ran its last tick")
+        lag.add_metric([], timer_manager.lag)
+        yield lag
+
+        timers = GaugeMetricFamily("gymbot_active_timers", "Running rest timers on this instance")
+        timers.add_metric([], len(timer_manager.timers))
+        yield timers
+
+        reminders = GaugeMetricFamily("gymbot_active_reminders", "Scheduled training reminder tasks")
+        reminders.add_metric([], sum(
+            1 for tasks in notification_service.active_tasks.values() for task in tasks if not task.done()
+        ))
+        yield reminders
+
+        rss = GaugeMetricFamily("gymbot_process_rss_bytes", "Resident memory of the bot process")
+        rss.add_metric([], process_rss_bytes())
+        yield rss
+
+REGISTRY.register(RuntimeCollector())
+
+def instrument_engine(engine):
+    """Track checked-out connections of an engine's pool"""
+    pool = engine.sync_engine.pool
+    event.listen(pool, "checkout", lambda *args: DB_CONNECTIONS_IN_USE.inc())
+    event.listen(pool, "checkin", lambda *args: DB_CONNECTIONS_IN_USE.dec())
+
+class MonitoringServer:
+    """Serves /health and /metrics, on its own port or on the webhook server"""
+
+    def __init__(self, max_loop_lag: float = 1.0, db_timeout: float = 2.0):
+        self.max_loop_lag = max_loop_lag
+        self.db_timeout = db_timeout
+        self.lag_monitor = loop_lag_monitor
+        self._runner: Optional[web.AppRunner] = None
+
+    def add_routes(self, app: web.Application):
+        app.router.add_get("/health", self.health)
+        app.router.add_get("/metrics", self.metrics)
+
+    async def _ping_database(self):
+        async with connection.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def check_database(self) -> str:
+        if not connection.engine:
+            return "not initialized"
+        try:
+            await asyncio.wait_for(self._ping_database(), timeout=self.db_timeout)
+            return "ok"
+        except Exception as e:
+            return f"error: {type(e).__name__}"
+
+    async def health(self, request: web.Request) -> web.Response:
+        """200 when the database answers and the event loop is responsive"""
+        database = await self.check_database()
+        lag = self.lag_monitor.lag
+        healthy = database == "ok" and lag <= self.max_loop_lag
+        return web.json_response(
+            {"status": "ok" if healthy else "unhealthy", "database": database, "loop_lag_seconds": round(lag, 4)},
+            status=200 if healthy else 503
+        )
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=generate_latest(REGISTRY), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+    async def start(self, host: str, port: int):
+        """Run on a separate port"""
+        app = web.Application()
+        self.add_routes(app)
+        self._runner = web.AppRunner(app, handle_signals=False, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Monitoring server listening on {host}:{port}")
+
+    async def stop(self):
+        self.lag_monitor.stop()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
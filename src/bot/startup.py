@@ -0,0 +1,104 @@
+"""Bot startup as phases with dependencies, run concurrently"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from src.utils.metrics import STARTUP_PHASE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class StartupError(Exception):
+    """A critical startup phase failed"""
+
+class StartupPhase:
+    """One step of startup and the phases it waits for"""
+
+    def __init__(self, name: str, run: Callable[[], Awaitable[None]], after: Iterable[str], critical: bool):
+        self.name = name
+        self.run = run
+        self.after = tuple(after)
+        self.critical = critical
+        self.duration: Optional[float] = None
+        self.error: Optional[BaseException] = None
+
+class StartupOrchestrator:
+    """Runs startup phases concurrently, each as soon as its dependencies are done.
+
+    Critical phases gate readiness: run() returns once all of them finished
+    and raises StartupError if one fails. Background phases keep running
+    after that; a failure is logged and skips only the phases depending on
+    it. Phases may only depend on phases added before them, and a critical
+    phase never on a background one.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, StartupPhase] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._started = 0.0
+
+    def add(self, name: str, run: Callable[[], Awaitable[None]], after: Iterable[str] = (), critical: bool = True):
+        if name in self.phases:
+            raise ValueError(f"Startup phase {name} added twice")
+        phase = StartupPhase(name, run, after, critical)
+        for dependency in phase.after:
+            if dependency not in self.phases:
+                raise ValueError(f"Startup phase {name} depends on unknown phase {dependency}")
+            if critical and not self.phases[dependency].critical:
+                raise ValueError(f"Critical startup phase {name} depends on background phase {dependency}")
+        self.phases[name] = phase
+
+    async def run(self):
+        """Start all phases, return when the critical ones are done"""
+        self._started = time.perf_counter()
+        for phase in self.phases.values():
+            self._tasks[phase.name] = asyncio.create_task(self._run_phase(phase), name=f"startup:{phase.name}")
+
+        try:
+            await asyncio.gather(*(self._tasks[p.name] for p in self.phases.values() if p.critical))
+        except BaseException:
+            await self.cancel()
+            raise
+        logger.info(f"Critical startup phases done in {time.perf_counter() - self._started:.3f}s")
+
+    async def wait(self):
+        """Wait for the background phases as well"""
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def cancel(self):
+        """Stop phases still running, e.g. on shutdown during startup"""
+        pending = [task for task in self._tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run_phase(self, phase: StartupPhase):
+        for dependency in phase.after:
+            await asyncio.wait({self._tasks[dependency]})
+        failed = [d for d in phase.after if self.phases[d].error is not None]
+        if failed:
+            phase.error = StartupError(f"skipped, {', '.join(failed)} failed")
+            logger.error(f"Startup phase {phase.name} {phase.error}")
+            if phase.critical:
+                raise phase.error
+            return
+
+        start = time.perf_counter()
+        try:
+            await phase.run()
+        except Exception as e:
+            phase.error = e
+            logger.error(f"Startup phase {phase.name} failed: {e}", exc_info=True)
+            if phase.critical:
+                raise StartupError(f"Startup phase {phase.name} failed") from e
+            return
+        finally:
+            phase.duration = time.perf_counter() - start
+            STARTUP_PHASE_SECONDS.labels(phase.name).set(phase.duration)
+
+        kind = "" if phase.critical else "background "
+        logger.info(
+            f"Startup {kind}phase {phase.name} took {phase.duration:.3f}s "
+            f"(done {time.perf_counter() - self._started:.3f}s after start)"
+        )
@@ -0,0 +1,104 @@
+"""Webhook server feeding Telegram updates to the dispatcher"""
+
+import asyncio
+import hmac
+import logging
+from typing import Optional, Set
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from pydantic import ValidationError
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+class WebhookServer:
+    """aiohttp server that acknowledges updates at once and handles them in the background.
+
+    Telegram gets a 200 as soon as an update is parsed; handling runs as a
+    task so a slow handler never holds the HTTP request. At most
+    ``max_pending`` updates are in progress, beyond that (and while draining)
+    requests get a 503 and Telegram redelivers them later.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        dp: Dispatcher,
+        path: str = "/webhook",
+        secret_token: Optional[str] = None,
+        max_pending: int = 1000
+    ):
+        self.bot = bot
+        self.dp = dp
+        self.path = path
+        self.secret_token = secret_token
+        self.max_pending = max_pending
+        self.app = web.Application()
+        self.app.router.add_post(path, self.handle)
+        self._tasks: Set[asyncio.Task] = set()
+        self._accepting = True
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def pending(self) -> int:
+        """Updates acknowledged but not handled yet"""
+        return len(self._tasks)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Validate, acknowledge and schedule one update"""
+        if self.secret_token:
+            received = request.headers.get(SECRET_HEADER, "")
+            # As bytes: compare_digest raises TypeError on str with non-ASCII characters
+            if not hmac.compare_digest(received.encode(errors="surrogateescape"), self.secret_token.encode()):
+                logger.warning(f"Rejected webhook request from {request.remote}: bad secret token")
+                return web.Response(status=401)
+
+        if not self._accepting or len(self._tasks) >= self.max_pending:
+            return web.Response(status=503)
+
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": self.bot})
+        except (ValueError, ValidationError) as e:
+            logger.warning(f"Malformed webhook update: {e}")
+            return web.Response(status=400)
+
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.Response(status=200)
+
+    async def _process(self, update: Update):
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception as e:
+            logger.error(f"Error handling update {update.update_id}: {e}")
+
+    async def start(self, host: str, port: int):
+        """Start listening"""
+        self._runner = web.AppRunner(self.app, handle_signals=False)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Webhook server listening on {host}:{port}{self.path}")
+
+    async def drain(self, timeout: float) -> int:
+        """Stop accepting updates and wait for in-flight ones, returns how many were cut off"""
+        self._accepting = False
+        if self._tasks:
+            logger.info(f"Draining {len(self._tasks)} in-flight updates")
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+        leftover = list(self._tasks)
+        for task in leftover:
+            task.cancel()
+        if leftover:
+            await asyncio.gather(*leftover, return_exceptions=True)
+            logger.warning(f"Cancelled {len(leftover)} updates still running after {timeout}s")
+        return len(leftover)
+
+    async def stop(self, drain_timeout: float):
+        """Drain in-flight updates and close the server"""
+        await self.drain(drain_timeout)
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
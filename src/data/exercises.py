@@ -1,5 +1,8 @@
 """Initial exercise dataset for the gym bot"""
 
+import hashlib
+import json
+
 INITIAL_EXERCISES = [
     # Chest exercises
     {"name": "Bench Press", "category": "Chest", "muscle_group": "Pectorals", "equipment": "Barbell"},
@@ -53,20 +56,55 @@ INITIAL_EXERCISES = [
     {"name": "Ab Wheel", "category": "Core", "muscle_group": "Abs", "equipment": "Equipment"},
 ]
 
-async def seed_exercises(session):
-    """Seed the database with initial exercises"""
-    from src.models.exercise import Exercise
+def seed_hash(rows) -> str:
+    """Hash of seed rows, independent of key order"""
+    return hashlib.sha256(json.dumps(rows, sort_keys=True).encode()).hexdigest()
+
+async def seed_exercises(session) -> int:
+    """Seed the database with initial exercises, returns the number of rows written.
+
+    The hash of INITIAL_EXERCISES is stored in seed_states; while it is
+    unchanged nothing else is read. Otherwise the added or changed exercises
+    are written in one upsert on the unique name.
+    """
+    from src.models import Exercise, SeedState
     from sqlalchemy import select
+    from sqlalchemy.dialects import postgresql, sqlite
+
+    content_hash = seed_hash(INITIAL_EXERCISES)
+    state = await session.get(SeedState, "exercises")
+    if state is not None and state.content_hash == content_hash:
+        return 0
 
-    for exercise_data in INITIAL_EXERCISES:
-        # Check if exercise already exists
-        stmt = select(Exercise).where(Exercise.name == exercise_data["name"])
-        result = await session.execute(stmt)
-        existing = result.scalar_one_or_none()
+    columns = ["name", "category", "muscle_group", "equipment"]
+    result = await session.execute(
+        select(*(getattr(Exercise, c) for c in columns))
+        .where(Exercise.name.in_([e["name"] for e in INITIAL_EXERCISES]))
+    )
+    existing = {row.name: dict(row._mapping) for row in result}
+    rows = [
+        {c: e.get(c) for c in columns} for e in INITIAL_EXERCISES
+        if existing.get(e["name"]) != {c: e.get(c) for c in columns}
+    ]
 
-        if not existing:
-            exercise = Exercise(**exercise_data)
-            session.add(exercise)
+    dialect = (await session.connection()).dialect.name
+    if rows and dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(Exercise).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Exercise.name],
+            set_={c: stmt.excluded[c] for c in columns[1:]}
+        )
+        await session.execute(stmt)
+    else:
+        for row in rows:
+            exercise = (await session.execute(select(Exercise).where(Exercise.name == row["name"]))).scalar_one_or_none()
+            if exercise is None:
+                session.add(Exercise(**row))
+            else:
+                for c in columns[1:]:
+                    setattr(exercise, c, row[c])
 
+    await session.merge(SeedState(dataset="exercises", content_hash=content_hash))
     await session.commit()
-    return len(INITIAL_EXERCISES)
\ No newline at end of file
+    return len(rows)
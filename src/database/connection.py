@@ -39,9 +39,16 @@ async def init_db():
     # Create tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_missing_indexes)
 
     logger.info("Database initialized successfully")
 
+def create_missing_indexes(connection):
+    """create_all skips indexes added to tables that already exist"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
 async def close_db():
     """Close database connection"""
     global engine
@@ -6,6 +6,7 @@ from .timer import register_timer_handlers
 from .stats import register_stats_handlers
 from .notification import register_notification_handlers
 from .nutrition import register_nutrition_handlers
+from .admin import register_admin_handlers
 
 def register_all_handlers(dp: Dispatcher):
     """Register all bot handlers"""
@@ -14,4 +15,5 @@ def register_all_handlers(dp: Dispatcher):
     register_timer_handlers(dp)
     register_stats_handlers(dp)
     register_notification_handlers(dp)
-    register_nutrition_handlers(dp)
\ No newline at end of file
+    register_nutrition_handlers(dp)
+    register_admin_handlers(dp)
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""Admin-only handlers"""
+
+import asyncio
+import html
+import logging
+from datetime import datetime
+from aiogram import Router, Dispatcher
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message, BufferedInputFile
+
+from src.bot.config import config
+from src.services.broadcast_service import broadcast_service
+from src.middlewares.metrics import handler_stats, statement_stats
+from src.bot.monitoring import loop_lag_monitor, process_rss_bytes, cache_hit_rates
+from src.services.timer_service import timer_manager
+from src.services.notification_service import notification_service
+from src.utils.profiler import profile_event_loop
+from src.middlewares.profiling import update_profiler
+
+# Bounds for /perf profile <seconds>
+PROFILE_DEFAULT_SECONDS = 10
+PROFILE_MAX_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+def is_admin(user_id: int) -> bool:
+    """Check whether a telegram user is listed in ADMIN_USER_IDS"""
+    return user_id in config.ADMIN_USER_IDS
+
+def format_handler_stats(rows: list, limit: int = 15) -> str:
+    """Render the per-handler latency summary as a fixed-width table"""
+    if not rows:
+        return "📈 No handled updates yet"
+    lines = [f"{'handler':<22}{'n':>6}{'p50':>7}{'p95':>7}{'p99':>7}{'db':>6}{'api':>6}{'err':>5}"]
+    for row in rows[:limit]:
+        lines.append(
+            f"{row['handler'][:21]:<22}{row['count']:>6}"
+            f"{row['p50'] * 1000:>7.0f}{row['p95'] * 1000:>7.0f}{row['p99'] * 1000:>7.0f}"
+            f"{row['db_mean'] * 1000:>6.0f}{row['api_mean'] * 1000:>6.0f}{row['errors']:>5}"
+        )
+    return "📈 Handler latency, ms (slowest p95 first)\n<pre>" + "\n".join(lines) + "</pre>"
+
+def format_perf_report() -> str:
+    """Runtime snapshot for /perf"""
+    latencies = handler_stats.all_latencies()
+    p50, p95, p99 = (handler_stats.percentile(latencies, q) * 1000 for q in (0.50, 0.95, 0.99))
+    reminders = sum(1 for tasks in notification_service.active_tasks.values() for task in tasks if not task.done())
+
+    lines = [
+        f"Handlers:   p50 {p50:.0f} ms, p95 {p95:.0f} ms, p99 {p99:.0f} ms (n={len(latencies)})",
+        f"Loop lag:   {loop_lag_monitor.lag * 1000:.1f} ms",
+        f"Timers:     {len(timer_manager.timers)} active, {len(timer_manager.countdown.live)} live, "
+        f"wheel lag {timer_manager.lag * 1000:.0f} ms",
+        f"Reminders:  {reminders} scheduled",
+        f"Outbound:   countdown {timer_manager.countdown.backlog()}, broadcasts {broadcast_service.pending_count()}",
+        f"Memory:     RSS {process_rss_bytes() / 2 ** 20:.1f} MB",
+    ]
+    for cache, (hits, misses) in sorted(cache_hit_rates().items()):
+        lookups = hits + misses
+        rate = 100 * hits / lookups if lookups else 0
+        lines.append(f"Cache:      {cache} {rate:.0f}% of {lookups}")
+
+    report = "⚙️ Runtime diagnostics\n<pre>" + html.escape("\n".join(lines)) + "</pre>"
+
+    offenders = loop_lag_monitor.top_offenders()
+    if offenders:
+        rows = [f"{count:>5}x {offender}" for offender, count in offenders]
+        report += "\n🧱 Loop blockers\n<pre>" + html.escape("\n".join(rows)) + "</pre>"
+
+    statements = statement_stats.top(5)
+    if statements:
+        rows = [
+            f"{row['total'] * 1000:.0f} ms total, {row['mean'] * 1000:.1f} ms mean, "
+            f"n={row['count']}: {row['statement'][:120]}"
+            for row in statements
+        ]
+        report += "\n🐢 Slowest statements\n<pre>" + html.escape("\n".join(rows)) + "</pre>"
+    return report
+
+def register_admin_handlers(dp: Dispatcher):
+    """Register admin handlers"""
+    router = Router()
+
+    @router.message(Command("broadcast"))
+    async def cmd_broadcast(message: Message, command: CommandObject):
+        """Send a message to all active users"""
+        user_id = message.from_user.id
+        if not is_admin(user_id):
+            return
+
+        if not command.args:
+            await message.answer("Usage: /broadcast <text>")
+            return
+
+        broadcast = await broadcast_service.create_broadcast(user_id, command.args)
+        await message.answer(
+            f"📣 Broadcast #{broadcast.id} started.\n"
+            f"Use /broadcast_status {broadcast.id} to check progress."
+        )
+        logger.info(f"Admin {user_id} started broadcast {broadcast.id}")
+
+    @router.message(Command("broadcast_status"))
+    async def cmd_broadcast_status(message: Message, command: CommandObject):
+        """Show broadcast delivery counters"""
+        if not is_admin(message.from_user.id):
+            return
+
+        if not command.args or not command.args.strip().isdigit():
+            await message.answer("Usage: /broadcast_status <id>")
+            return
+
+        broadcast = await broadcast_service.get_broadcast(int(command.args))
+        if not broadcast:
+            await message.answer("❌ Broadcast not found")
+            return
+
+        await message.answer(broadcast_service.format_report(broadcast))
+
+    @router.message(Command("broadcast_cancel"))
+    async def cmd_broadcast_cancel(message: Message, command: CommandObject):
+        """Cancel a running broadcast"""
+        if not is_admin(message.from_user.id):
+            return
+
+        if not command.args or not command.args.strip().isdigit():
+            await message.answer("Usage: /broadcast_cancel <id>")
+            return
+
+        if await broadcast_service.cancel(int(command.args)):
+            await message.answer("⏹ Broadcast cancelled")
+        else:
+            await message.answer("⚠️ Broadcast is not running")
+
+    @router.message(Command("handlers"))
+    async def cmd_handlers(message: Message, command: CommandObject):
+        """Show per-handler latency, DB/API time and errors"""
+        if not is_admin(message.from_user.id):
+            return
+
+        label = command.args.strip() if command.args else None
+        await message.answer(format_handler_stats(handler_stats.summary(label)))
+
+    profile_lock = asyncio.Lock()
+
+    @router.message(Command("perf"))
+    async def cmd_perf(message: Message, command: CommandObject):
+        """Show runtime diagnostics, or profile the bot with /perf profile [seconds]"""
+        user_id = message.from_user.id
+        if not is_admin(user_id):
+            return
+
+        args = command.args.split() if command.args else []
+        if not args:
+            await message.answer(format_perf_report())
+            return
+
+        if args[0] != "profile" or (len(args) > 1 and not args[1].isdigit()):
+            await message.answer("Usage: /perf or /perf profile [seconds]")
+            return
+        if profile_lock.locked():
+            await message.answer("⚠️ A profile is already running")
+            return
+
+        seconds = min(int(args[1]) if len(args) > 1 else PROFILE_DEFAULT_SECONDS, PROFILE_MAX_SECONDS)
+        async with profile_lock:
+            await message.answer(f"🔬 Profiling for {seconds}s...")
+            logger.info(f"Admin {user_id} started a {seconds}s profile")
+            profiler = await profile_event_loop(seconds)
+
+        filename = f"profile-{datetime.now():%Y%m%d-%H%M%S}.txt"
+        await message.answer_document(
+            BufferedInputFile(profiler.report().encode(), filename=filename),
+            caption=f"🔬 {profiler.samples} samples over {profiler.duration:.0f}s"
+        )
+
+    @router.message(Command("profile_arm"))
+    async def cmd_profile_arm(message: Message, command: CommandObject):
+        """Profile matching updates: /profile_arm [route=/progress] [user=ID] [seconds=600] [max=20]"""
+        user_id = message.from_user.id
+        if not is_admin(user_id):
+            return
+
+        options = {}
+        for arg in (command.args or "").split():
+            key, _, value = arg.partition("=")
+            options[key] = value
+        usage = "Usage: /profile_arm [route=/progress] [user=ID] [seconds=600] [max=20]"
+        if set(options) - {"route", "user", "seconds", "max"}:
+            await message.answer(usage)
+            return
+        try:
+            trigger = update_profiler.arm(
+                route=options.get("route") or None,
+                user_id=int(options["user"]) if options.get("user") else None,
+                seconds=int(options.get("seconds", 600)),
+                max_captures=int(options.get("max", config.PROFILE_MAX_CAPTURES))
+            )
+        except ValueError:
+            await message.answer(usage)
+            return
+
+        await message.answer(f"🔬 Profiler armed: {html.escape(trigger.describe())}")
+        logger.info(f"Admin {user_id} armed the update profiler: {trigger.describe()}")
+
+    @router.message(Command("profile_disarm"))
+    async def cmd_profile_disarm(message: Message):
+        """Stop profiling updates"""
+        if not is_admin(message.from_user.id):
+            return
+
+        update_profiler.disarm()
+        await message.answer("⏹ Profiler disarmed")
+
+    @router.message(Command("profile_status"))
+    async def cmd_profile_status(message: Message):
+        """Show the profiler trigger and the latest profile files"""
+        if not is_admin(message.from_user.id):
+            return
+
+        trigger = update_profiler.trigger
+        lines = [f"Armed: {trigger.describe()}" if trigger and not trigger.expired else "Disarmed"]
+        for path, samples, seconds in update_profiler.captures[-10:]:
+            lines.append(f"{path} ({samples} samples, {seconds:.2f}s)")
+        await message.answer("🔬 Profiler\n<pre>" + html.escape("\n".join(lines)) + "</pre>")
+
+    dp.include_router(router)
@@ -2,12 +2,16 @@
 
 import logging
 from aiogram import Router, Dispatcher
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.types import Message
 
 from src.services.user_service import UserService
 from src.services.workout_service import WorkoutService
 from src.services.analytics_service import WorkoutAnalytics as AnalyticsService
+from src.services.chart_rendering import ChartQueueFull, ChartRenderError
+from src.services.export_jobs import export_jobs, ExportLimitReached, FORMATS
+from src.services.media_registry import media_registry
+from src.services.visualization_service import AdvancedVisualization
 from src.locales.translations import i18n
 from src.database.connection import get_session
 
@@ -16,6 +20,7 @@ logger = logging.getLogger(__name__)
 def register_stats_handlers(dp: Dispatcher):
     """Register statistics and profile handlers"""
     router = Router()
+    visualization = AdvancedVisualization()
 
     @router.message(Command("stats"))
     async def cmd_stats(message: Message):
@@ -180,4 +185,53 @@ Use /settings to change preferences
 
             await message.answer(records_text)
 
-    dp.include_router(router)
\ No newline at end of file
+    @router.message(Command("progress"))
+    async def cmd_progress(message: Message):
+        """Send the progress dashboard"""
+        user_id = message.from_user.id
+        logger.info(f"User {user_id} requested progress charts")
+
+        async with get_session() as session:
+            user = await UserService().get_user(session, user_id)
+        if not user:
+            await message.answer(i18n.get("error_not_found", user_id))
+            return
+
+        try:
+            chart = await visualization.create_multi_panel_dashboard(user.id)
+        except ChartQueueFull:
+            await message.answer(i18n.get("error_busy", user_id))
+            return
+        except ChartRenderError as e:
+            logger.error(f"Progress chart for user {user_id} failed: {e}")
+            await message.answer(i18n.get("error_generic", user_id))
+            return
+
+        await media_registry.send_photo(
+            message.bot, message.chat.id, chart,
+            filename="progress.png",
+            caption=i18n.get("progress_caption", user_id)
+        )
+
+    @router.message(Command("export"))
+    async def cmd_export(message: Message, command: CommandObject):
+        """Queue an export of the last 30 days: Excel, or /export csv, /export pdf"""
+        user_id = message.from_user.id
+        fmt = (command.args or "").strip().lower()
+        if fmt not in FORMATS:
+            fmt = "xlsx"
+        logger.info(f"User {user_id} requested a {fmt} export")
+
+        async with get_session() as session:
+            user = await UserService().get_user(session, user_id)
+        if not user:
+            await message.answer(i18n.get("error_not_found", user_id))
+            return
+
+        # Replies with a progress message right away; the file follows from a worker
+        try:
+            await export_jobs.submit(user.id, user_id, message.chat.id, fmt)
+        except ExportLimitReached:
+            await message.answer(i18n.get("export_limit", user_id))
+
+    dp.include_router(router)
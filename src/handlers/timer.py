@@ -4,16 +4,32 @@ from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
 
 from src.services.timer_service import timer_manager, Timer
+from src.services.countdown import render_countdown
 from src.utils.keyboards import build_timer_keyboard
 
 logger = logging.getLogger(__name__)
 
+async def notify_timer_finished(bot, user_id: int, timer: Timer):
+    """Tell the user their rest timer is over"""
+    if timer.live and timer.message_id:
+        try:
+            await bot.edit_message_text(text=render_countdown(0), chat_id=timer.chat_id, message_id=timer.message_id)
+        except Exception as e:
+            logger.debug(f"Could not finish countdown for user {user_id}: {e}")
+    await bot.send_message(
+        timer.chat_id,
+        "✅ Таймер завершен!\n\n🔄 Хотите установить новый?",
+        reply_markup=build_timer_keyboard(user_id)
+    )
+
 def register_timer_handlers(dp: Dispatcher):
     """Register timer handlers"""
     router = Router()
+    timer_manager.set_expiry_handler(notify_timer_finished)
 
     async def refresh_config_message(callback: CallbackQuery, user_id: int):
-        """Refresh timer configuration message"""
+        """Persist settings and refresh timer configuration message"""
+        await timer_manager.save_settings(user_id)
         await callback.message.edit_text(
             "⏱ Настройте таймер отдыха:",
             reply_markup=build_timer_keyboard(user_id)
@@ -23,7 +39,7 @@ def register_timer_handlers(dp: Dispatcher):
     async def cmd_timer(message: Message):
         """Handle /timer command"""
         user_id = message.from_user.id
-        timer_manager.get_settings(user_id)  # Initialize settings
+        await timer_manager.load_settings(user_id)  # Initialize settings
         await message.answer(
             "⏱ Настройте таймер отдыха:",
             reply_markup=build_timer_keyboard(user_id)
@@ -34,7 +50,7 @@ def register_timer_handlers(dp: Dispatcher):
     @router.callback_query(F.data == "add_hour")
     async def add_hour(callback: CallbackQuery):
         user_id = callback.from_user.id
-        settings = timer_manager.get_settings(user_id)
+        settings = await timer_manager.load_settings(user_id)
         settings["hours"] += 1
         await refresh_config_message(callback, user_id)
         await callback.answer("➕ 1 час")
@@ -42,7 +58,7 @@ def register_timer_handlers(dp: Dispatcher):
     @router.callback_query(F.data == "add_minute")
     async def add_minute(callback: CallbackQuery):
         user_id = callback.from_user.id
-        settings = timer_manager.get_settings(user_id)
+        settings = await timer_manager.load_settings(user_id)
         if settings["minutes"] < 59:
             settings["minutes"] += 1
         else:
@@ -54,7 +70,7 @@ def register_timer_handlers(dp: Dispatcher):
     @router.callback_query(F.data == "add_second")
     async def add_second(callback: CallbackQuery):
         user_id = callback.from_user.id
-        settings = timer_manager.get_settings(user_id)
+        settings = await timer_manager.load_settings(user_id)
         if settings["seconds"] < 59:
             settings["seconds"] += 1
         else:
@@ -70,7 +86,7 @@ def register_timer_handlers(dp: Dispatcher):
     @router.callback_query(F.data == "sub_hour")
     async def sub_hour(callback: CallbackQuery):
         user_id = callback.from_user.id
-        settings = timer_manager.get_settings(user_id)
+        settings = await timer_manager.load_settings(user_id)
         if settings["hours"] > 0:
             settings["hours"] -= 1
         await refresh_config_message(callback, user_id)
@@ -79,7 +95,7 @@ def register_timer_handlers(dp: Dispatcher):
     @router.callback_query(F.data == "sub_minute")
     async def sub_minute(callback: CallbackQuery):
         user_id = callback.from_user.id
-        settings = timer_manager.get_settings(user_id)
+        settings = await timer_manager.load_settings(user_id)
         if settings["minutes"] > 0:
             settings["minutes"] -= 1
         elif settings["hours"] > 0:
@@ -91,7 +107,7 @@ def register_timer_handlers(dp: Dispatcher):
     @router.callback_query(F.data == "sub_second")
     async def sub_second(callback: CallbackQuery):
         user_id = callback.from_user.id
-        settings = timer_manager.get_settings(user_id)
+        settings = await timer_manager.load_settings(user_id)
         if settings["seconds"] > 0:
             settings["seconds"] -= 1
         elif settings["minutes"] > 0:
@@ -107,37 +123,26 @@ def register_timer_handlers(dp: Dispatcher):
     @router.callback_query(F.data == "start_timer")
     async def start_timer(callback: CallbackQuery):
         """Start timer"""
-        import asyncio
         user_id = callback.from_user.id
-        s = timer_manager.get_settings(user_id)
+        s = await timer_manager.load_settings(user_id)
         total_seconds = s["hours"] * 3600 + s["minutes"] * 60 + s["seconds"]
 
         if total_seconds <= 0:
             await callback.answer("⚠️ Время не установлено", show_alert=True)
             return
 
-        timer = Timer(total_seconds)
-        timer.start()
-        timer_manager.add_timer(user_id, timer)
-
-        async def notify():
-            try:
-                await asyncio.sleep(total_seconds)
-                current_timer = timer_manager.get_timer(user_id)
-                if current_timer == timer:
-                    timer_manager.remove_timer(user_id)
-                    timer_manager.settings[user_id] = {"hours": 0, "minutes": 0, "seconds": 0}
-                    await callback.message.answer(
-                        "✅ Таймер завершен!\n\n🔄 Хотите установить новый?",
-                        reply_markup=build_timer_keyboard(user_id)
-                    )
-            except asyncio.CancelledError:
-                pass
-            except Exception as e:
-                logger.error(f"Timer notification error: {e}")
-
-        timer.task = asyncio.create_task(notify())
-        await callback.message.answer(f"⏳ Таймер на {total_seconds} секунд запущен!")
+        live = s.get("live", False)
+        if live:
+            started = await callback.message.answer(render_countdown(total_seconds))
+        else:
+            started = await callback.message.answer(f"⏳ Таймер на {total_seconds} секунд запущен!")
+        await timer_manager.start_timer(
+            user_id,
+            total_seconds,
+            chat_id=callback.message.chat.id,
+            message_id=started.message_id,
+            live=live
+        )
         await callback.answer()
         logger.info(f"User {user_id} started timer for {total_seconds} seconds")
 
@@ -145,14 +150,12 @@ def register_timer_handlers(dp: Dispatcher):
     async def stop_timer(callback: CallbackQuery):
         """Stop timer"""
         user_id = callback.from_user.id
-        timer = timer_manager.get_timer(user_id)
 
-        if not timer:
+        if not await timer_manager.stop_timer(user_id):
             await callback.answer("⚠️ Нет активного таймера", show_alert=True)
             return
 
-        timer_manager.remove_timer(user_id)
-        timer_manager.settings[user_id] = {"hours": 0, "minutes": 0, "seconds": 0}
+        await timer_manager.reset_settings(user_id)
 
         await callback.message.answer(
             "⏹ Таймер остановлен.\n\n🔄 Хотите установить новый?",
@@ -161,6 +164,15 @@ def register_timer_handlers(dp: Dispatcher):
         await callback.answer()
         logger.info(f"User {user_id} stopped timer")
 
+    @router.callback_query(F.data == "toggle_live")
+    async def toggle_live(callback: CallbackQuery):
+        """Toggle live countdown in the timer message"""
+        user_id = callback.from_user.id
+        settings = await timer_manager.load_settings(user_id)
+        settings["live"] = not settings.get("live", False)
+        await refresh_config_message(callback, user_id)
+        await callback.answer()
+
     @router.callback_query(F.data == "noop")
     async def noop(callback: CallbackQuery):
         """No-op handler for display-only buttons"""
@@ -17,7 +17,7 @@ class Translations:
         "en": {
             # Welcome and help messages
             "welcome": "👋 Welcome to Gym Bot! I'm your personal workout assistant.\n\nI can help you:\n• 📝 Track workouts\n• ⏱ Set rest timers\n• 📊 Analyze progress\n• 💪 Achieve your goals\n\nUse /help to see all commands!",
-            "help": "📚 Available Commands:\n\n🏋️ Workouts:\n/log - Log a workout\n/today - Today's workouts\n/history - Workout history\n\n🥬 Nutrition:\n/nutrition - Track your nutrition\n\n⏱ Timers and notifications:\n/timer - Set rest timer\n/notification - Set a notification an hour before training\n\n📊 Progress:\n/stats - View statistics\n/progress - Progress charts\n/records - Personal records\n\n🎯 Routines:\n/routines - My routines\n/create_routine - Create routine\n\n👤 Profile:\n/profile - View profile\n/settings - Bot settings\n\n📤 Export:\n/export - Export data",
+            "help": "📚 Available Commands:\n\n🏋️ Workouts:\n/log - Log a workout\n/today - Today's workouts\n/history - Workout history\n\n🥬 Nutrition:\n/nutrition - Track your nutrition\n\n⏱ Timers and notifications:\n/timer - Set rest timer\n/notification - Set a notification an hour before training\n\n📊 Progress:\n/stats - View statistics\n/progress - Progress charts\n/records - Personal records\n\n🎯 Routines:\n/routines - My routines\n/create_routine - Create routine\n\n👤 Profile:\n/profile - View profile\n/settings - Bot settings\n\n📤 Export:\n/export - Export data (Excel, or /export csv, /export pdf)",
 
             # Workout messages
             "select_exercise": "Select an exercise or type to search:",
@@ -38,6 +38,14 @@ class Translations:
             "stats_overview": "📊 Your Statistics:\n\nTotal Workouts: {total_workouts}\nThis Week: {week_workouts}\nTotal Volume: {total_volume} kg\nFavorite Exercise: {favorite}",
             "personal_records": "🏆 Personal Records:\n\n{records}",
             "no_records": "No personal records yet. Keep training!",
+            "progress_caption": "📈 Your progress dashboard",
+            "export_caption": "📤 Your workouts for the last 30 days",
+            "export_stage_queued": "⏳ {format} export queued…",
+            "export_stage_building": "⚙️ Building your {format} file…",
+            "export_stage_uploading": "📤 Uploading your {format} file…",
+            "export_stage_done": "✅ {format} export sent",
+            "export_failed": "❌ The export failed, please try again later",
+            "export_limit": "⏳ Your earlier exports are still being prepared, please wait for them to arrive",
 
             # Routine messages
             "routines_list": "🎯 Your Routines:\n\n{routines}",
@@ -52,6 +60,7 @@ class Translations:
             "error_generic": "❌ An error occurred. Please try again.",
             "error_invalid_input": "❌ Invalid input. Please check and try again.",
             "error_not_found": "❌ Not found. Please try again.",
+            "error_busy": "⏳ Too many heavy requests right now. Please try again in a minute.",
 
             # Button labels
             "btn_add_hour": "➕ Hour",
@@ -62,6 +71,8 @@ class Translations:
             "btn_sub_second": "➖ Second",
             "btn_start": "Start ✅",
             "btn_stop": "Stop ⛔",
+            "btn_live_on": "Live countdown: on 🟢",
+            "btn_live_off": "Live countdown: off ⚪",
             "btn_back": "⬅️ Back",
             "btn_cancel": "❌ Cancel",
             "btn_finish": "✅ Finish",
@@ -185,7 +196,7 @@ class Translations:
         "ru": {
             # Welcome and help messages
             "welcome": "👋 Добро пожаловать в Gym Bot! Я ваш персональный помощник для тренировок.\n\nЯ помогу вам:\n• 📝 Вести дневник тренировок\n• ⏱ Устанавливать таймеры отдыха\n• 📊 Анализировать прогресс\n• 💪 Достигать целей\n\nИспользуйте /help для просмотра команд!",
-            "help": "📚 Доступные команды:\n\n🏋️ Тренировки:\n/log - Записать тренировку\n/today - Сегодняшние тренировки\n/history - История тренировок\n\n🥬 Питание:\n/nutrition - Отслеживать свое питание\n\n⏱ Таймеры и уведомления:\n/timer - Установить таймер\n/notification - Поставить уведомление за час до тренировки\n\n📊 Прогресс:\n/stats - Статистика\n/progress - Графики прогресса\n/records - Личные рекорды\n\n🎯 Программы:\n/routines - Мои программы\n/create_routine - Создать программу\n\n👤 Профиль:\n/profile - Мой профиль\n/settings - Настройки\n\n📤 Экспорт:\n/export - Экспорт данных",
+            "help": "📚 Доступные команды:\n\n🏋️ Тренировки:\n/log - Записать тренировку\n/today - Сегодняшние тренировки\n/history - История тренировок\n\n🥬 Питание:\n/nutrition - Отслеживать свое питание\n\n⏱ Таймеры и уведомления:\n/timer - Установить таймер\n/notification - Поставить уведомление за час до тренировки\n\n📊 Прогресс:\n/stats - Статистика\n/progress - Графики прогресса\n/records - Личные рекорды\n\n🎯 Программы:\n/routines - Мои программы\n/create_routine - Создать программу\n\n👤 Профиль:\n/profile - Мой профиль\n/settings - Настройки\n\n📤 Экспорт:\n/export - Экспорт данных (Excel, /export csv или /export pdf)",
 
             # Workout messages
             "select_exercise": "Выберите упражнение или введите для поиска:",
@@ -206,6 +217,14 @@ class Translations:
             "stats_overview": "📊 Ваша статистика:\n\nВсего тренировок: {total_workouts}\nНа этой неделе: {week_workouts}\nОбщий объём: {total_volume} кг\nЛюбимое упражнение: {favorite}",
             "personal_records": "🏆 Личные рекорды:\n\n{records}",
             "no_records": "Личных рекордов пока нет. Продолжайте тренироваться!",
+            "progress_caption": "📈 Ваш прогресс",
+            "export_caption": "📤 Ваши тренировки за последние 30 дней",
+            "export_stage_queued": "⏳ Экспорт {format} в очереди…",
+            "export_stage_building": "⚙️ Готовлю файл {format}…",
+            "export_stage_uploading": "📤 Загружаю файл {format}…",
+            "export_stage_done": "✅ Экспорт {format} отправлен",
+            "export_failed": "❌ Не удалось выполнить экспорт, попробуйте позже",
+            "export_limit": "⏳ Предыдущие экспорты ещё готовятся, дождитесь их",
 
             # Routine messages
             "routines_list": "🎯 Ваши программы:\n\n{routines}",
@@ -220,6 +239,7 @@ class Translations:
             "error_generic": "❌ Произошла ошибка. Попробуйте снова.",
             "error_invalid_input": "❌ Неверный ввод. Проверьте и попробуйте снова.",
             "error_not_found": "❌ Не найдено. Попробуйте снова.",
+            "error_busy": "⏳ Сейчас слишком много тяжёлых запросов. Попробуйте через минуту.",
 
             # Button labels
             "btn_add_hour": "➕ Час",
@@ -230,6 +250,8 @@ class Translations:
             "btn_sub_second": "➖ Секунда",
             "btn_start": "Старт ✅",
             "btn_stop": "Стоп ⛔",
+            "btn_live_on": "Живой отсчёт: вкл 🟢",
+            "btn_live_off": "Живой отсчёт: выкл ⚪",
             "btn_back": "⬅️ Назад",
             "btn_cancel": "❌ Отмена",
             "btn_finish": "✅ Завершить",
@@ -0,0 +1,37 @@
+from aiogram import Dispatcher
+
+from src.bot.config import config
+from .concurrency import ConcurrencyMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware, update_profiler
+from .throttling import ThrottlingMiddleware, create_rate_limiter
+
+def register_all_middlewares(dp: Dispatcher):
+    """Register all update middlewares"""
+    # Throttle first so dropped updates never wait for a processing slot
+    limiter = create_rate_limiter()
+    dp.shutdown.register(limiter.close)
+    dp.update.outer_middleware(ThrottlingMiddleware(
+        limiter,
+        messages_per_minute=config.RATE_LIMIT_MESSAGES_PER_MINUTE,
+        callbacks_per_minute=config.RATE_LIMIT_CALLBACKS_PER_MINUTE,
+        burst=config.RATE_LIMIT_BURST
+    ))
+    # Measured outside the concurrency limits so latency includes admission wait
+    dp.update.outer_middleware(MetricsMiddleware())
+    dp.update.outer_middleware(ConcurrencyMiddleware(
+        max_concurrent=config.MAX_CONCURRENT_USERS,
+        heavy_concurrency=config.HEAVY_CONCURRENCY,
+        heavy_queue_size=config.HEAVY_QUEUE_SIZE,
+        heavy_commands=config.HEAVY_COMMANDS,
+        heavy_callback_prefixes=config.HEAVY_CALLBACK_PREFIXES
+    ))
+    dp.update.outer_middleware(ProfilingMiddleware())
+
+    if config.PROFILE_ARM_SECONDS > 0:
+        update_profiler.arm(
+            route=config.PROFILE_ARM_ROUTE,
+            user_id=config.PROFILE_ARM_USER_ID,
+            seconds=config.PROFILE_ARM_SECONDS,
+            max_captures=config.PROFILE_MAX_CAPTURES
+        )
@@ -0,0 +1,135 @@
+"""Bounded, per-user ordered update processing"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from src.locales.translations import i18n
+from src.utils.metrics import (
+    ADMISSION_WAIT_SECONDS, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, UPDATES_IN_FLIGHT,
+    UPDATES_TOTAL, UPDATE_DURATION_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+class ConcurrencyMiddleware(BaseMiddleware):
+    """Outer update middleware enforcing backpressure.
+
+    Updates of one user run one at a time in arrival order (asyncio.Lock
+    wakes waiters FIFO), different users run in parallel. Handlers share a
+    global semaphore of ``max_concurrent`` slots, except heavy commands,
+    which wait in their own admission queue with ``heavy_concurrency`` slots
+    so charts and exports cannot starve everything else. Heavy updates beyond
+    ``heavy_queue_size`` pending (waiting or running) are turned away.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        heavy_concurrency: int,
+        heavy_queue_size: int,
+        heavy_commands: Iterable[str] = (),
+        heavy_callback_prefixes: Iterable[str] = ()
+    ):
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.heavy_slots = asyncio.Semaphore(heavy_concurrency)
+        self.heavy_queue_size = heavy_queue_size
+        self.heavy_commands = {cmd.lower() for cmd in heavy_commands}
+        self.heavy_callback_prefixes = tuple(heavy_callback_prefixes)
+        self.heavy_pending = 0
+        self._user_locks: Dict[int, asyncio.Lock] = {}
+        self._user_pending: Dict[int, int] = {}
+
+    def is_heavy(self, update: Update) -> bool:
+        """Check whether an update runs a heavy command"""
+        if update.message and update.message.text and update.message.text.startswith("/"):
+            command = update.message.text.split()[0][1:].split("@")[0].lower()
+            return command in self.heavy_commands
+        if update.callback_query and update.callback_query.data:
+            return update.callback_query.data.startswith(self.heavy_callback_prefixes)
+        return False
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        arrived = time.monotonic()
+        heavy = self.is_heavy(event)
+        if heavy:
+            if self.heavy_pending >= self.heavy_queue_size:
+                ADMISSION_REJECTED.inc()
+                await self._reject(event, data)
+                return None
+            self.heavy_pending += 1
+
+        user = data.get("event_from_user")
+        user_id: Optional[int] = user.id if user else None
+        try:
+            if user_id is None:
+                return await self._admit(handler, event, data, heavy, arrived)
+            lock = self._user_lock(user_id)
+            try:
+                async with lock:
+                    return await self._admit(handler, event, data, heavy, arrived)
+            finally:
+                self._release_user_lock(user_id)
+        finally:
+            if heavy:
+                self.heavy_pending -= 1
+
+    async def _admit(self, handler, event: Update, data: Dict[str, Any], heavy: bool, arrived: float) -> Any:
+        """Wait for a slot in the update's queue, then run the handler"""
+        queue = "heavy" if heavy else "default"
+        semaphore = self.heavy_slots if heavy else self.slots
+
+        depth = ADMISSION_QUEUE_DEPTH.labels(queue)
+        depth.inc()
+        try:
+            await semaphore.acquire()
+        finally:
+            depth.dec()
+        ADMISSION_WAIT_SECONDS.labels(queue).observe(time.monotonic() - arrived)
+
+        update_type = event.event_type
+        started = time.monotonic()
+        UPDATES_IN_FLIGHT.inc()
+        try:
+            return await handler(event, data)
+        finally:
+            UPDATES_IN_FLIGHT.dec()
+            semaphore.release()
+            UPDATES_TOTAL.labels(update_type).inc()
+            UPDATE_DURATION_SECONDS.labels(update_type).observe(time.monotonic() - started)
+
+    def _user_lock(self, user_id: int) -> asyncio.Lock:
+        lock = self._user_locks.get(user_id)
+        if lock is None:
+            lock = self._user_locks[user_id] = asyncio.Lock()
+        self._user_pending[user_id] = self._user_pending.get(user_id, 0) + 1
+        return lock
+
+    def _release_user_lock(self, user_id: int):
+        """Drop the lock once no update of the user is pending"""
+        pending = self._user_pending[user_id] - 1
+        if pending:
+            self._user_pending[user_id] = pending
+        else:
+            del self._user_pending[user_id]
+            del self._user_locks[user_id]
+
+    async def _reject(self, event: Update, data: Dict[str, Any]):
+        """Tell the user the heavy queue is full"""
+        user = data.get("event_from_user")
+        text = i18n.get("error_busy", user.id if user else 0)
+        try:
+            if event.message:
+                await event.message.answer(text)
+            elif event.callback_query:
+                await event.callback_query.answer(text, show_alert=True)
+        except Exception as e:
+            logger.error(f"Failed to notify about a rejected update: {e}")
@@ -0,0 +1,211 @@
+"""Per-handler latency, DB time, API time and error metrics"""
+
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import Update
+from sqlalchemy import event
+
+from src.utils.metrics import (
+    HANDLER_DURATION_SECONDS, HANDLER_DB_SECONDS, HANDLER_API_SECONDS, HANDLER_ERRORS, API_REQUEST_DURATION_SECONDS
+)
+
+# Distinct handler labels before new ones are folded into "other"
+MAX_LABELS = 200
+
+_LABEL_RE = re.compile(r"[a-z0-9_]{1,32}")
+_TRAILING_IDS_RE = re.compile(r"(_\d+)+$")
+
+class UpdateTimings:
+    """Time spent in the database and Telegram API while handling one update"""
+
+    __slots__ = ("db", "api")
+
+    def __init__(self):
+        self.db = 0.0
+        self.api = 0.0
+
+# Timings of the update handled in the current task
+current_timings: ContextVar[Optional[UpdateTimings]] = ContextVar("current_timings", default=None)
+
+def route_label(update: Update) -> str:
+    """Low-cardinality label: /command, cb:<callback prefix>, message or the update type"""
+    if update.message:
+        text = update.message.text or ""
+        if not text.startswith("/"):
+            return "message"
+        command = text.split()[0][1:].split("@")[0].lower()
+        return f"/{command}" if _LABEL_RE.fullmatch(command) else "/other"
+    if update.callback_query:
+        prefix = (update.callback_query.data or "").split(":")[0].lower()
+        prefix = _TRAILING_IDS_RE.sub("", prefix)
+        return f"cb:{prefix}" if _LABEL_RE.fullmatch(prefix) else "cb:other"
+    return update.event_type
+
+class HandlerStats:
+    """Recent per-handler samples for the admin summary"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.latencies: Dict[str, Deque[float]] = {}
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.db_time: Dict[str, float] = {}
+        self.api_time: Dict[str, float] = {}
+
+    def record(self, label: str, duration: float, db: float, api: float, failed: bool = False):
+        if label not in self.latencies:
+            self.latencies[label] = deque(maxlen=self.window)
+        self.latencies[label].append(duration)
+        self.counts[label] = self.counts.get(label, 0) + 1
+        self.db_time[label] = self.db_time.get(label, 0.0) + db
+        self.api_time[label] = self.api_time.get(label, 0.0) + api
+        if failed:
+            self.errors[label] = self.errors.get(label, 0) + 1
+
+    @staticmethod
+    def percentile(samples: List[float], q: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self, label: Optional[str] = None) -> List[dict]:
+        """Per-handler p50/p95/p99 and mean DB/API time, slowest p95 first"""
+        labels = [label] if label else list(self.latencies)
+        rows = []
+        for name in labels:
+            samples = list(self.latencies.get(name, ()))
+            count = self.counts.get(name, 0)
+            if not count:
+                continue
+            rows.append({
+                "handler": name,
+                "count": count,
+                "errors": self.errors.get(name, 0),
+                "p50": self.percentile(samples, 0.50),
+                "p95": self.percentile(samples, 0.95),
+                "p99": self.percentile(samples, 0.99),
+                "db_mean": self.db_time[name] / count,
+                "api_mean": self.api_time[name] / count,
+            })
+        return sorted(rows, key=lambda row: row["p95"], reverse=True)
+
+    def all_latencies(self) -> List[float]:
+        return [value for samples in self.latencies.values() for value in samples]
+
+handler_stats = HandlerStats()
+
+class StatementStats:
+    """Execution count and time per SQL statement, for the slowest-statements report"""
+
+    def __init__(self, max_statements: int = 500):
+        self.max_statements = max_statements
+        # statement -> [count, total seconds, max seconds]
+        self.statements: Dict[str, List[float]] = {}
+
+    @staticmethod
+    def normalize(statement: str) -> str:
+        return " ".join(statement.split())[:300]
+
+    def record(self, statement: str, elapsed: float):
+        key = self.normalize(statement)
+        entry = self.statements.get(key)
+        if entry is None:
+            if len(self.statements) >= self.max_statements:
+                return
+            entry = self.statements[key] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+
+    def top(self, limit: int = 5) -> List[dict]:
+        """Statements with the most total time"""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {"statement": statement, "count": int(count), "total": total, "max": worst, "mean": total / count}
+            for statement, (count, total, worst) in ranked[:limit]
+        ]
+
+statement_stats = StatementStats()
+
+class MetricsMiddleware(BaseMiddleware):
+    """Outer update middleware recording end-to-end latency, DB and API time per handler"""
+
+    def __init__(self, stats: HandlerStats = handler_stats):
+        self.stats = stats
+        self._labels = set()
+
+    def _label(self, update: Update) -> str:
+        label = route_label(update)
+        if label not in self._labels:
+            if len(self._labels) >= MAX_LABELS:
+                return "other"
+            self._labels.add(label)
+        return label
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        label = self._label(event)
+        timings = UpdateTimings()
+        token = current_timings.set(timings)
+        started = time.monotonic()
+        failed = False
+        try:
+            return await handler(event, data)
+        except Exception as e:
+            failed = True
+            HANDLER_ERRORS.labels(label, type(e).__name__).inc()
+            raise
+        finally:
+            duration = time.monotonic() - started
+            current_timings.reset(token)
+            HANDLER_DURATION_SECONDS.labels(label).observe(duration)
+            HANDLER_DB_SECONDS.labels(label).observe(timings.db)
+            HANDLER_API_SECONDS.labels(label).observe(timings.api)
+            self.stats.record(label, duration, timings.db, timings.api, failed)
+
+class ApiTimingMiddleware(BaseRequestMiddleware):
+    """Bot session middleware timing outgoing Telegram API calls"""
+
+    async def __call__(self, make_request, bot, method):
+        started = time.monotonic()
+        try:
+            return await make_request(bot, method)
+        finally:
+            elapsed = time.monotonic() - started
+            API_REQUEST_DURATION_SECONDS.labels(type(method).__name__).observe(elapsed)
+            timings = current_timings.get()
+            if timings is not None:
+                timings.api += elapsed
+
+def instrument_db_timing(engine):
+    """Add statement execution time to the current update and the statement stats"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        statement_stats.record(statement, elapsed)
+        timings = current_timings.get()
+        if timings is not None:
+            timings.db += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute; errors while fetching have no statement
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if context.statement is not None and started:
+            started.pop()
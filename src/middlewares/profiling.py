@@ -0,0 +1,35 @@
+"""Profile selected live updates on demand"""
+
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from src.bot.config import config
+from src.middlewares.metrics import route_label
+from src.utils.profiler import UpdateProfiler
+
+update_profiler = UpdateProfiler(output_dir=config.PROFILE_DIR, interval=config.PROFILE_INTERVAL_MS / 1000)
+
+class ProfilingMiddleware(BaseMiddleware):
+    """Outer update middleware sampling updates that match the armed trigger"""
+
+    def __init__(self, profiler: UpdateProfiler = update_profiler):
+        self.profiler = profiler
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        if not self.profiler.armed:
+            return await handler(event, data)
+
+        user = data.get("event_from_user")
+        user_id = user.id if user else None
+        route = route_label(event)
+        if not self.profiler.matches(route, user_id):
+            return await handler(event, data)
+
+        async with self.profiler.capture(f"{route}-{user_id}-{event.update_id}"):
+            return await handler(event, data)
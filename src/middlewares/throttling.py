@@ -0,0 +1,153 @@
+"""Per-user token-bucket rate limiting"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from src.bot.config import config
+from src.utils.metrics import THROTTLED_UPDATES
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter(ABC):
+    """Interface for token-bucket rate limiters keyed by user and update kind"""
+
+    @abstractmethod
+    async def allow(self, key: str, rate: float, capacity: float) -> bool:
+        """Take one token from the bucket, refilled at ``rate`` tokens per second"""
+
+    async def close(self) -> None:
+        pass
+
+class MemoryRateLimiter(RateLimiter):
+    """Buckets in process memory, for a single replica"""
+
+    SWEEP_EVERY = 1000
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        # key -> (tokens, updated, time the bucket is full again)
+        self.buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._calls = 0
+
+    async def allow(self, key: str, rate: float, capacity: float) -> bool:
+        now = self.clock()
+        tokens, updated, _ = self.buckets.get(key, (capacity, now, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self.buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+
+        self._calls += 1
+        if self._calls % self.SWEEP_EVERY == 0:
+            self._sweep(now)
+        return allowed
+
+    def _sweep(self, now: float):
+        """Drop buckets that have refilled completely, they equal a new bucket"""
+        self.buckets = {key: bucket for key, bucket in self.buckets.items() if bucket[2] > now}
+
+class RedisRateLimiter(RateLimiter):
+    """Buckets in Redis, shared by all replicas"""
+
+    KEY_PREFIX = "gymbot:ratelimit:"
+
+    # Refill and take a token atomically, using the server clock
+    BUCKET_SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+    return allowed
+    """
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from e
+
+        self.redis = aioredis.from_url(url, decode_responses=True)
+        self._bucket = self.redis.register_script(self.BUCKET_SCRIPT)
+
+    async def allow(self, key: str, rate: float, capacity: float) -> bool:
+        try:
+            return bool(await self._bucket(keys=[self.KEY_PREFIX + key], args=[rate, capacity]))
+        except Exception as e:
+            # Fail open, a Redis outage should not lock everyone out
+            logger.error(f"Rate limiter unavailable: {e}")
+            return True
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+def create_rate_limiter() -> RateLimiter:
+    """Create the rate limiter backend selected by RATE_LIMIT_BACKEND"""
+    if config.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimiter(config.REDIS_URL)
+    return MemoryRateLimiter()
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Outer update middleware dropping updates of users over their rate.
+
+    Messages and callback queries have separate buckets, so tapping timer
+    buttons does not eat into the message allowance. A throttled callback
+    only gets an empty ``answer()`` to stop the client spinner; no handler,
+    database or edit work is done.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        messages_per_minute: float,
+        callbacks_per_minute: float,
+        burst: float
+    ):
+        self.limiter = limiter
+        self.limits = {
+            "message": (messages_per_minute / 60, burst),
+            "callback": (callbacks_per_minute / 60, burst),
+        }
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get("event_from_user")
+        if event.callback_query:
+            kind = "callback"
+        elif event.message:
+            kind = "message"
+        else:
+            kind = None
+        if user is None or kind is None:
+            return await handler(event, data)
+
+        rate, capacity = self.limits[kind]
+        if await self.limiter.allow(f"{kind}:{user.id}", rate, capacity):
+            return await handler(event, data)
+
+        THROTTLED_UPDATES.labels(kind).inc()
+        if event.callback_query:
+            try:
+                await event.callback_query.answer()
+            except Exception as e:
+                logger.debug(f"Failed to answer throttled callback: {e}")
+        return None
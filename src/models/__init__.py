@@ -5,6 +5,12 @@ from .routine import Routine, RoutineExercise
 from .progress import ProgressRecord, PersonalRecord
 from .notification import TrainingNotification
 from .nutrition import Food, NutritionGoals, MealEntry
+from .broadcast import Broadcast
+from .timer import ActiveTimer, TimerSettings
+from .data_version import DataVersion
+from .media import MediaFile
+from .seed_state import SeedState
+from .export_job import ExportJob
 
 __all__ = [
     "User",
@@ -20,4 +26,11 @@ __all__ = [
     "Food",
     "NutritionGoals",
     "MealEntry",
+    "Broadcast",
+    "ActiveTimer",
+    "TimerSettings",
+    "DataVersion",
+    "MediaFile",
+    "SeedState",
+    "ExportJob",
 ]
\ No newline at end of file
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from datetime import datetime
+
+from src.database.connection import Base
+
+class Broadcast(Base):
+    """Admin broadcast with a resumable delivery checkpoint"""
+    __tablename__ = "broadcasts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    created_by = Column(Integer, nullable=False)  # Admin telegram_id, receives the final report
+    text = Column(Text, nullable=False)
+    # pending, running, completed, cancelled, failed
+    status = Column(String, default="pending", nullable=False, index=True)
+
+    # Keyset cursor: users.id of the last recipient included in a checkpoint
+    last_user_id = Column(Integer, default=0, nullable=False)
+
+    # Delivery counters
+    delivered = Column(Integer, default=0, nullable=False)
+    blocked = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Broadcast(id={self.id}, status={self.status}, last_user_id={self.last_user_id})>"
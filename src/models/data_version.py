@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer
+
+from src.database.connection import Base
+
+class DataVersion(Base):
+    """Counter bumped on every write to a user's workouts or progress records, used in cache keys"""
+    __tablename__ = "data_versions"
+
+    user_id = Column(Integer, primary_key=True)  # users.id
+    version = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<DataVersion(user_id={self.user_id}, version={self.version})>"
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from datetime import datetime
+
+from src.database.connection import Base
+
+class ExportJob(Base):
+    """Export built by a background worker, with the message showing its progress"""
+    __tablename__ = "export_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)  # users.id, whose workouts are exported
+    telegram_id = Column(Integer, nullable=False)  # Requester, for the message language
+    chat_id = Column(Integer, nullable=False)
+    format = Column(String(8), nullable=False)  # xlsx, csv, pdf
+    status = Column(String, default="pending", nullable=False, index=True)  # pending, running, completed, failed
+    stage = Column(String, default="queued", nullable=False)  # queued, building, uploading, done
+    message_id = Column(Integer, nullable=True)  # Progress message, edited as stages complete
+    attempts = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ExportJob(id={self.id}, format={self.format}, status={self.status}, stage={self.stage})>"
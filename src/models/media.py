@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+
+from src.database.connection import Base
+
+class MediaFile(Base):
+    """Telegram file_id of a generated image or document, by content hash"""
+    __tablename__ = "media_files"
+
+    content_hash = Column(String(64), primary_key=True)  # sha256 of the bytes
+    kind = Column(String(16), primary_key=True)  # photo or document, their file_ids are not interchangeable
+    file_id = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<MediaFile(kind={self.kind}, content_hash={self.content_hash[:12]})>"
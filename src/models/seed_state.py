@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+
+from src.database.connection import Base
+
+class SeedState(Base):
+    """Hash of the seed data last applied to the database, per dataset"""
+    __tablename__ = "seed_states"
+
+    dataset = Column(String(32), primary_key=True)
+    content_hash = Column(String(64), nullable=False)  # sha256 of the seed rows
+    applied_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SeedState(dataset={self.dataset}, content_hash={self.content_hash[:12]})>"
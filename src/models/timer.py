@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime
+from datetime import datetime
+
+from src.database.connection import Base
+
+class ActiveTimer(Base):
+    """Running rest timer, kept so it survives restarts and replica moves"""
+    __tablename__ = "active_timers"
+
+    user_id = Column(Integer, primary_key=True)  # Telegram user ID
+    chat_id = Column(Integer, nullable=False)
+    message_id = Column(Integer, nullable=True)  # "Timer started" message
+    deadline = Column(Float, nullable=False, index=True)  # Unix timestamp, compared exactly when claiming
+    duration = Column(Integer, nullable=False)
+    live = Column(Boolean, default=False, nullable=False)  # Message shows a live countdown
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ActiveTimer(user_id={self.user_id}, deadline={self.deadline})>"
+
+class TimerSettings(Base):
+    """Rest timer H/M/S settings of a user"""
+    __tablename__ = "timer_settings"
+
+    user_id = Column(Integer, primary_key=True)  # Telegram user ID
+    hours = Column(Integer, default=0, nullable=False)
+    minutes = Column(Integer, default=0, nullable=False)
+    seconds = Column(Integer, default=0, nullable=False)
+    live = Column(Boolean, default=False, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<TimerSettings(user_id={self.user_id}, {self.hours}h {self.minutes}m {self.seconds}s)>"
@@ -26,7 +26,7 @@ class WorkoutExercise(Base):
     __tablename__ = "workout_exercises"
 
     id = Column(Integer, primary_key=True, index=True)
-    workout_id = Column(Integer, ForeignKey("workouts.id"), nullable=False)
+    workout_id = Column(Integer, ForeignKey("workouts.id"), nullable=False, index=True)
     exercise_id = Column(Integer, ForeignKey("exercises.id"), nullable=False)
     order = Column(Integer, nullable=False, default=0)
     notes = Column(Text, nullable=True)
@@ -43,7 +43,7 @@ class WorkoutSet(Base):
     __tablename__ = "workout_sets"
 
     id = Column(Integer, primary_key=True, index=True)
-    workout_exercise_id = Column(Integer, ForeignKey("workout_exercises.id"), nullable=False)
+    workout_exercise_id = Column(Integer, ForeignKey("workout_exercises.id"), nullable=False, index=True)
     set_number = Column(Integer, nullable=False)
     reps = Column(Integer, nullable=False)
     weight = Column(Float, nullable=False)
@@ -1,8 +1,6 @@
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-from collections import defaultdict
-import numpy as np
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 
@@ -20,36 +18,29 @@ class WorkoutAnalytics:
         weeks: int = 12
     ) -> Dict[str, Any]:
         """Calculate weekly volume progression with trend analysis"""
+        import numpy as np
+        from src.utils import analytics_kernels as kernels
+
         async with get_session() as session:
             start_date = datetime.now() - timedelta(weeks=weeks * 7)
 
             stmt = (
-                select(Workout)
+                select(Workout.date, WorkoutSet.weight, WorkoutSet.reps)
+                .join(WorkoutExercise, Workout.id == WorkoutExercise.workout_id)
+                .join(WorkoutSet, WorkoutExercise.id == WorkoutSet.workout_exercise_id)
                 .where(
                     Workout.user_id == user_id,
                     Workout.date >= start_date
                 )
-                .options(
-                    selectinload(Workout.exercises)
-                    .selectinload(WorkoutExercise.sets)
-                )
-                .order_by(Workout.date)
             )
 
             result = await session.execute(stmt)
-            workouts = result.scalars().unique().all()
-
-            weekly_volumes = defaultdict(float)
-
-            for workout in workouts:
-                week = workout.date.isocalendar()[1]
-                year = workout.date.isocalendar()[0]
-                week_key = f"{year}-W{week:02d}"
+            rows = result.all()
+            dates, weights, reps = zip(*rows) if rows else ([], [], [])
 
-                for workout_exercise in workout.exercises:
-                    for workout_set in workout_exercise.sets:
-                        volume = workout_set.weight * workout_set.reps
-                        weekly_volumes[week_key] += volume
+            volume = np.array(weights, dtype=float) * np.array(reps, dtype=float)
+            weekly = kernels.per_week(np.array(dates, dtype="datetime64[us]"), volume)
+            weekly_volumes = dict(zip(kernels.format_week_keys(weekly["keys"]), weekly["sum"].tolist()))
 
             # Calculate trend if we have data
             if len(weekly_volumes) > 1:
@@ -241,9 +232,9 @@ class WorkoutAnalytics:
                 select(Workout)
                 .where(Workout.id == workout_id)
                 .options(
-                    selectinload(Workout.exercises)
+                    selectinload(Workout.workout_exercises)
                     .selectinload(WorkoutExercise.exercise),
-                    selectinload(Workout.exercises)
+                    selectinload(Workout.workout_exercises)
                     .selectinload(WorkoutExercise.sets)
                 )
             )
@@ -256,7 +247,7 @@ class WorkoutAnalytics:
 
             new_records = []
 
-            for workout_exercise in workout.exercises:
+            for workout_exercise in workout.workout_exercises:
                 exercise = workout_exercise.exercise
 
                 for workout_set in workout_exercise.sets:
@@ -0,0 +1,247 @@
+"""Admin broadcast service with rate-limited, resumable fan-out"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, update
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter, TelegramBadRequest
+
+from src.bot.config import config
+from src.models.broadcast import Broadcast
+from src.models.user import User
+from src.database.connection import get_session
+
+logger = logging.getLogger(__name__)
+
+class BroadcastService:
+    """Streams recipients from users with keyset pagination and sends within a rate budget"""
+
+    def __init__(self):
+        self.bot: Optional[Bot] = None
+        self.active_tasks: Dict[int, asyncio.Task] = {}
+        self.rate_per_second = config.BROADCAST_RATE_PER_SECOND
+        self.batch_size = config.BROADCAST_BATCH_SIZE
+        self.checkpoint_every = config.BROADCAST_CHECKPOINT_EVERY
+        self._next_send_at = 0.0
+
+    def set_bot(self, bot: Bot):
+        """Set bot instance for sending messages"""
+        self.bot = bot
+
+    async def create_broadcast(self, created_by: int, text: str) -> Broadcast:
+        """Create a broadcast row and start delivering it"""
+        async with get_session() as session:
+            broadcast = Broadcast(created_by=created_by, text=text, status="pending")
+            session.add(broadcast)
+            await session.commit()
+            await session.refresh(broadcast)
+
+        self.start(broadcast.id)
+        logger.info(f"Broadcast {broadcast.id} created by {created_by}")
+        return broadcast
+
+    async def get_broadcast(self, broadcast_id: int) -> Optional[Broadcast]:
+        """Get broadcast by ID"""
+        async with get_session() as session:
+            return await session.get(Broadcast, broadcast_id)
+
+    def start(self, broadcast_id: int):
+        """Start the delivery task for a broadcast"""
+        task = self.active_tasks.get(broadcast_id)
+        if task and not task.done():
+            return
+        self.active_tasks[broadcast_id] = asyncio.create_task(self._run(broadcast_id))
+
+    async def resume_pending(self) -> int:
+        """Resume broadcasts that were interrupted by a restart"""
+        async with get_session() as session:
+            stmt = select(Broadcast.id).where(Broadcast.status.in_(["pending", "running"]))
+            result = await session.execute(stmt)
+            broadcast_ids = result.scalars().all()
+
+        for broadcast_id in broadcast_ids:
+            self.start(broadcast_id)
+
+        if broadcast_ids:
+            logger.info(f"Resumed {len(broadcast_ids)} broadcasts")
+        return len(broadcast_ids)
+
+    async def cancel(self, broadcast_id: int) -> bool:
+        """Cancel a running broadcast, keeping its counters"""
+        async with get_session() as session:
+            broadcast = await session.get(Broadcast, broadcast_id)
+            if not broadcast or broadcast.status not in ("pending", "running"):
+                return False
+            broadcast.status = "cancelled"
+            broadcast.finished_at = datetime.utcnow()
+            await session.commit()
+
+        task = self.active_tasks.pop(broadcast_id, None)
+        if task and not task.done():
+            task.cancel()
+        return True
+
+    async def _fetch_batch(self, after_user_id: int) -> List[Tuple[int, int]]:
+        """Fetch the next page of recipients after the keyset cursor"""
+        async with get_session() as session:
+            stmt = (
+                select(User.id, User.telegram_id)
+                .where(User.is_active == True, User.id > after_user_id)
+                .order_by(User.id)
+                .limit(self.batch_size)
+            )
+            result = await session.execute(stmt)
+            return [tuple(row) for row in result.all()]
+
+    async def _wait_for_slot(self):
+        """Pace sends so the broadcast stays within its rate budget"""
+        interval = 1.0 / self.rate_per_second if self.rate_per_second > 0 else 0.0
+        now = time.monotonic()
+        delay = self._next_send_at - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            # Yield to interactive updates even when we are behind schedule
+            await asyncio.sleep(0)
+        self._next_send_at = max(now, self._next_send_at) + interval
+
+    async def _send(self, telegram_id: int, text: str) -> str:
+        """Send one message and classify the outcome"""
+        while True:
+            await self._wait_for_slot()
+            try:
+                # Sent verbatim: under the default HTML mode a stray "<" or "&" would fail every send
+                await self.bot.send_message(telegram_id, text, parse_mode=None)
+                return "delivered"
+            except TelegramRetryAfter as e:
+                logger.warning(f"Broadcast flood control, sleeping {e.retry_after}s")
+                self._next_send_at = time.monotonic() + e.retry_after
+            except TelegramForbiddenError:
+                return "blocked"
+            except TelegramBadRequest as e:
+                logger.debug(f"Broadcast to {telegram_id} rejected: {e}")
+                return "failed"
+            except Exception as e:
+                logger.error(f"Broadcast to {telegram_id} failed: {e}")
+                return "failed"
+
+    async def _run(self, broadcast_id: int):
+        """Deliver a broadcast, checkpointing every few sends and when interrupted"""
+        try:
+            async with get_session() as session:
+                broadcast = await session.get(Broadcast, broadcast_id)
+                if not broadcast or broadcast.status not in ("pending", "running"):
+                    return
+                broadcast.status = "running"
+                await session.commit()
+                text = broadcast.text
+                cursor = broadcast.last_user_id
+
+            # Progress since the last checkpoint
+            counts = {"delivered": 0, "blocked": 0, "failed": 0}
+            blocked_ids = []
+            try:
+                while True:
+                    batch = await self._fetch_batch(cursor)
+                    if not batch:
+                        break
+
+                    for user_id, telegram_id in batch:
+                        outcome = await self._send(telegram_id, text)
+                        counts[outcome] += 1
+                        if outcome == "blocked":
+                            blocked_ids.append(user_id)
+                        cursor = user_id
+                        if sum(counts.values()) >= self.checkpoint_every:
+                            await self._checkpoint(broadcast_id, cursor, counts, blocked_ids)
+                            counts = {"delivered": 0, "blocked": 0, "failed": 0}
+                            blocked_ids = []
+            finally:
+                # Also on cancel, so a restart does not resend to users who already got the message
+                if sum(counts.values()):
+                    await self._checkpoint(broadcast_id, cursor, counts, blocked_ids)
+
+            await self._finish(broadcast_id)
+        except asyncio.CancelledError:
+            logger.info(f"Broadcast {broadcast_id} interrupted, will resume from checkpoint")
+            raise
+        except Exception as e:
+            logger.error(f"Broadcast {broadcast_id} error: {e}", exc_info=True)
+            await self._finish(broadcast_id, status="failed")
+        finally:
+            if self.active_tasks.get(broadcast_id) is asyncio.current_task():
+                del self.active_tasks[broadcast_id]
+
+    async def _checkpoint(self, broadcast_id: int, cursor: int, counts: Dict[str, int], blocked_ids: List[int]):
+        """Persist the keyset cursor and the counters of the sends since the last checkpoint"""
+        async with get_session() as session:
+            stmt = (
+                update(Broadcast)
+                .where(Broadcast.id == broadcast_id)
+                .values(
+                    last_user_id=cursor,
+                    delivered=Broadcast.delivered + counts["delivered"],
+                    blocked=Broadcast.blocked + counts["blocked"],
+                    failed=Broadcast.failed + counts["failed"],
+                    updated_at=datetime.utcnow()
+                )
+            )
+            await session.execute(stmt)
+
+            # Users who blocked the bot are skipped by future broadcasts
+            if blocked_ids:
+                await session.execute(
+                    update(User).where(User.id.in_(blocked_ids)).values(is_active=False)
+                )
+            await session.commit()
+
+    async def _finish(self, broadcast_id: int, status: str = "completed"):
+        """Mark broadcast completed or failed and report the result to its author"""
+        try:
+            async with get_session() as session:
+                broadcast = await session.get(Broadcast, broadcast_id)
+                if broadcast.status == "cancelled":
+                    return
+                broadcast.status = status
+                broadcast.finished_at = datetime.utcnow()
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to mark broadcast {broadcast_id} {status}: {e}")
+            return
+
+        logger.info(
+            f"Broadcast {broadcast_id} {status}: delivered={broadcast.delivered}, "
+            f"blocked={broadcast.blocked}, failed={broadcast.failed}"
+        )
+        try:
+            await self.bot.send_message(broadcast.created_by, self.format_report(broadcast))
+        except Exception as e:
+            logger.error(f"Failed to send broadcast report: {e}")
+
+    @staticmethod
+    def format_report(broadcast: Broadcast) -> str:
+        """Format broadcast progress for admins"""
+        return (
+            f"📣 <b>Broadcast #{broadcast.id}</b> — {broadcast.status}\n\n"
+            f"✅ Delivered: {broadcast.delivered}\n"
+            f"🚫 Blocked: {broadcast.blocked}\n"
+            f"❌ Failed: {broadcast.failed}"
+        )
+
+    def pending_count(self) -> int:
+        """Number of broadcasts currently being delivered"""
+        return sum(1 for task in self.active_tasks.values() if not task.done())
+
+    async def shutdown(self):
+        """Stop delivery tasks and wait for their last checkpoint"""
+        tasks = list(self.active_tasks.values())
+        for task in tasks:
+            task.cancel()
+        self.active_tasks.clear()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+# Global instance
+broadcast_service = BroadcastService()
@@ -0,0 +1,160 @@
+"""Cache of rendered charts, keyed by content address"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.bot.config import config
+from src.utils.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+class ChartCache:
+    """Bounded LRU of PNG bytes in memory, optionally spilling to a directory.
+
+    Keys hash the user, chart kind, parameters and the user's data version.
+    A write bumps the version, so old charts are never served again and just
+    age out of the LRU. Concurrent requests for the same key share a single
+    render.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2 ** 20, disk_dir: Optional[str] = None, disk_max_bytes: int = 512 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.size = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._disk: Optional["OrderedDict[str, int]"] = None
+        self._disk_size = 0
+        self._disk_lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def key(user_id: int, kind: str, params: Dict[str, Any], version: int) -> str:
+        material = json.dumps([user_id, kind, params, version], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Cached PNG for a key, rendering it once if missing"""
+        png = await self.get(key)
+        if png is not None:
+            return png
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._render(key, render))
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # A cancelled request does not cancel the render others wait for
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Retrieved here in case every waiting request was cancelled
+            task.exception()
+
+    async def _render(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        png = await render()
+        await self.put(key, png)
+        return png
+
+    async def get(self, key: str) -> Optional[bytes]:
+        png = self._memory.get(key)
+        if png is not None:
+            self._memory.move_to_end(key)
+            CACHE_REQUESTS.labels("chart", "hit").inc()
+            return png
+        CACHE_REQUESTS.labels("chart", "miss").inc()
+
+        if not self.disk_dir:
+            return None
+        png = await asyncio.to_thread(self._read_disk, key)
+        CACHE_REQUESTS.labels("chart_disk", "miss" if png is None else "hit").inc()
+        if png is not None:
+            self._remember(key, png)
+        return png
+
+    async def put(self, key: str, png: bytes):
+        self._remember(key, png)
+        if self.disk_dir:
+            try:
+                await asyncio.to_thread(self._write_disk, key, png)
+            except OSError as e:
+                logger.warning(f"Could not write chart to disk cache: {e}")
+
+    def _remember(self, key: str, png: bytes):
+        if len(png) > self.max_bytes:
+            return
+        if key in self._memory:
+            self.size -= len(self._memory.pop(key))
+        self._memory[key] = png
+        self.size += len(png)
+        while self.size > self.max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self.size -= len(evicted)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.png")
+
+    def _load_disk_index(self):
+        """Index files left by earlier runs, least recently used first"""
+        entries = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if name.endswith(".png"):
+                    stat = os.stat(os.path.join(root, name))
+                    entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        self._disk = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self._disk_size = sum(self._disk.values())
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        with self._disk_lock:
+            if self._disk is None:
+                self._load_disk_index()
+            if key not in self._disk:
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    png = f.read()
+                # mtime orders the index after a restart
+                os.utime(path)
+            except OSError:
+                self._disk_size -= self._disk.pop(key)
+                return None
+            self._disk.move_to_end(key)
+            return png
+
+    def _write_disk(self, key: str, png: bytes):
+        with self._disk_lock:
+            if self._disk is None:
+                self._load_disk_index()
+            if key in self._disk:
+                return
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(png)
+            os.replace(temporary, path)
+            self._disk[key] = len(png)
+            self._disk_size += len(png)
+
+            while self._disk_size > self.disk_max_bytes and len(self._disk) > 1:
+                evicted, size = self._disk.popitem(last=False)
+                self._disk_size -= size
+                try:
+                    os.remove(self._path(evicted))
+                except OSError:
+                    pass
+
+chart_cache = ChartCache(
+    max_bytes=config.CHART_CACHE_MAX_BYTES,
+    disk_dir=config.CHART_CACHE_DIR,
+    disk_max_bytes=config.CHART_CACHE_DISK_MAX_BYTES
+)
@@ -0,0 +1,141 @@
+"""Chart rendering in a pool of worker processes, off the event loop"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from src.bot.config import config
+from src.utils.metrics import CHART_RENDER_SECONDS, CHART_RENDER_QUEUE_DEPTH, CHART_RENDER_FAILURES
+
+logger = logging.getLogger(__name__)
+
+class ChartQueueFull(Exception):
+    """Too many charts are already waiting to be rendered"""
+
+class ChartRenderError(Exception):
+    """A chart timed out or its worker died"""
+
+def render_chart(kind: str, payload: Dict[str, Any]) -> bytes:
+    """Runs in a worker process"""
+    from src.services.charts import DRAWERS
+    return DRAWERS[kind](payload)
+
+def _warm_worker():
+    """Runs in a worker process; loads the drawing stack before the first chart"""
+    importlib.import_module("src.services.charts")
+
+def _mp_context():
+    # Fork is unsafe with the logging and watchdog threads; the fork server
+    # forks recycled workers from a process that already imported matplotlib
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["src.services.chart_rendering", "src.services.charts"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+class ChartRenderPool:
+    """Renders charts in worker processes that receive plain data.
+
+    At most ``workers`` charts are handed to the processes at a time; up to
+    ``queue_size`` more wait in the event loop and anything beyond that is
+    rejected with ChartQueueFull. A chart not rendered within ``timeout``
+    seconds raises ChartRenderError and the pool is replaced, killing the
+    stuck worker; charts running on the old pool at that moment are retried
+    once. The pool is also replaced gracefully every ``max_tasks_per_worker``
+    charts per worker, so leaks in matplotlib cannot grow without bound.
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 20, timeout: float = 30.0, max_tasks_per_worker: int = 100):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.pending = 0
+        self.restarts = 0
+        self._slots = asyncio.Semaphore(workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_tasks = 0
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+            self._executor_tasks = 0
+
+    async def warm(self):
+        """Start the worker processes now instead of on the first chart"""
+        self.start()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _warm_worker) for _ in range(self.workers)))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def render(self, kind: str, payload: Dict[str, Any]) -> bytes:
+        """Render a chart from src.services.charts.DRAWERS, returns PNG bytes"""
+        if self.pending >= self.workers + self.queue_size:
+            CHART_RENDER_FAILURES.labels("rejected").inc()
+            raise ChartQueueFull(f"{self.pending} charts pending")
+
+        self.pending += 1
+        CHART_RENDER_QUEUE_DEPTH.inc()
+        try:
+            async with self._slots:
+                return await self._run(kind, payload)
+        finally:
+            self.pending -= 1
+            CHART_RENDER_QUEUE_DEPTH.dec()
+
+    async def _run(self, kind: str, payload: Dict[str, Any], retry: bool = True) -> bytes:
+        self.start()
+        executor = self._executor
+        started = time.monotonic()
+        future = executor.submit(render_chart, kind, payload)
+        self._executor_tasks += 1
+        if self._executor_tasks >= self.max_tasks_per_worker * self.workers:
+            # Running charts finish on the retired pool
+            self._replace(executor, kill=False)
+
+        try:
+            png = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            CHART_RENDER_FAILURES.labels("timeout").inc()
+            logger.warning(f"Chart {kind} not rendered within {self.timeout}s, restarting chart workers")
+            self._replace(executor, kill=True)
+            raise ChartRenderError(f"{kind} chart timed out")
+        except BrokenProcessPool:
+            if retry and executor is not self._executor:
+                # Collateral of another chart's timeout
+                return await self._run(kind, payload, retry=False)
+            CHART_RENDER_FAILURES.labels("crash").inc()
+            logger.error(f"Chart worker died rendering {kind}, restarting chart workers")
+            self._replace(executor, kill=True)
+            raise ChartRenderError(f"{kind} chart worker died")
+
+        CHART_RENDER_SECONDS.labels(kind).observe(time.monotonic() - started)
+        return png
+
+    def _replace(self, executor: ProcessPoolExecutor, kill: bool):
+        """Retire a pool; the next chart starts a fresh one"""
+        if executor is not self._executor:
+            return
+        self._executor = None
+        self.restarts += 1
+        if kill:
+            # The executor has no public way to stop a running task
+            for process in list((executor._processes or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=kill)
+
+chart_pool = ChartRenderPool(
+    workers=config.CHART_WORKERS,
+    queue_size=config.CHART_QUEUE_SIZE,
+    timeout=config.CHART_RENDER_TIMEOUT_SECONDS,
+    max_tasks_per_worker=config.CHART_WORKER_MAX_TASKS
+)
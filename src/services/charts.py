@@ -0,0 +1,272 @@
+"""Chart drawing, run inside chart worker processes on plain column lists"""
+
+from datetime import datetime
+from io import BytesIO
+from typing import Any, Dict, Optional
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+import seaborn as sns
+import numpy as np
+
+from src.utils import analytics_kernels as kernels
+
+# Set style for all plots
+plt.style.use('seaborn-v0_8-darkgrid')
+sns.set_palette("husl")
+
+def _dates(values) -> np.ndarray:
+    return np.array(values, dtype="datetime64[us]")
+
+def _floats(values) -> np.ndarray:
+    # None (NULL) becomes NaN
+    return np.array(values, dtype=float)
+
+def fig_to_bytes(fig: plt.Figure, dpi: int) -> bytes:
+    """Convert matplotlib figure to bytes"""
+    buf = BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight', dpi=dpi)
+    plt.close(fig)
+    return buf.getvalue()
+
+def _no_data(ax: plt.Axes, title: str, text: str = 'No data available', **kwargs):
+    ax.text(0.5, 0.5, text, ha='center', va='center', **kwargs)
+    ax.set_title(title)
+
+def _format_dates(ax: plt.Axes, weekly_ticks: bool = True):
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
+    if weekly_ticks:
+        ax.xaxis.set_major_locator(mdates.DayLocator(interval=7))
+    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
+
+def _plot_series(ax: plt.Axes, dates: np.ndarray, values: np.ndarray, max_points: int, *args, **kwargs):
+    """Plot a series downsampled to max_points, keeping its extremes"""
+    keep = kernels.downsample(dates, values, max_points)
+    return ax.plot(dates[keep], values[keep], *args, **kwargs)
+
+def _plot_trend(ax: plt.Axes, dates: np.ndarray, values: np.ndarray, degree: int, max_points: int, *args, **kwargs):
+    """Plot a polynomial fit over the full series, evaluated at up to max_points dates"""
+    x = np.arange(len(dates))
+    p = np.poly1d(np.polyfit(x, values, degree))
+    at = np.unique(np.linspace(0, len(dates) - 1, min(len(dates), max_points)).astype(np.intp))
+    ax.plot(dates[at], p(at), *args, **kwargs)
+
+def plot_weight_progression(ax: plt.Axes, data: Dict[str, np.ndarray], max_points: int):
+    """Plot weight progression with polynomial fit"""
+    dates = data["dates"]
+    if not len(dates):
+        _no_data(ax, 'Weight Progression')
+        return
+
+    # Plot actual data
+    _plot_series(ax, dates, data["max_weight"], max_points, 'o-', label='Max Weight', linewidth=2, markersize=8)
+    _plot_series(ax, dates, data["avg_weight"], max_points, 's-', label='Avg Weight', linewidth=2, markersize=6, alpha=0.7)
+
+    # Add polynomial trend line if enough data
+    if len(dates) > 3:
+        _plot_trend(ax, dates, data["max_weight"], 2, max_points, '--', label='Trend', linewidth=2, alpha=0.5)
+
+    ax.set_title('Weight Progression Over Time', fontweight='bold')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Weight (kg)')
+    ax.legend(loc='best')
+    ax.grid(True, alpha=0.3)
+    _format_dates(ax)
+
+def plot_volume_heatmap(ax: plt.Axes, data: Dict[str, np.ndarray]):
+    """Plot weekly volume heatmap"""
+    if not len(data["dates"]):
+        _no_data(ax, 'Volume Heatmap')
+        return
+
+    weeks, grid = kernels.week_day_grid(data["dates"], data["volume"])
+
+    # Create heatmap
+    sns.heatmap(
+        grid,
+        ax=ax,
+        cmap='YlOrRd',
+        annot=False,
+        fmt='.0f',
+        cbar_kws={'label': 'Volume (kg)'},
+        linewidths=0.5,
+        xticklabels=['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+        yticklabels=weeks % 100
+    )
+
+    ax.set_title('Weekly Training Volume Heatmap', fontweight='bold')
+    ax.set_xlabel('Day of Week')
+    ax.set_ylabel('Week Number')
+
+def plot_1rm_progression(ax: plt.Axes, data: Dict[str, np.ndarray], max_points: int):
+    """Plot estimated 1RM progression with confidence intervals"""
+    if not len(data["dates"]):
+        _no_data(ax, '1RM Progression')
+        return
+
+    # Estimated 1RM of each set (Brzycki), averaged per workout
+    one_rms = kernels.estimate_1rm(data["weight"], data["reps"])
+    valid = ~np.isnan(one_rms)
+    if not valid.any():
+        _no_data(ax, '1RM Progression', 'Insufficient data for 1RM calculation')
+        return
+
+    stats = kernels.group_stats(data["dates"][valid], one_rms[valid])
+    keep = kernels.downsample(stats["keys"], stats["mean"], max_points)
+    dates, mean_1rms, std_1rms = stats["keys"][keep], stats["mean"][keep], stats["std"][keep]
+
+    # Plot with confidence intervals
+    ax.plot(dates, mean_1rms, 'o-', linewidth=2, markersize=8, label='Estimated 1RM')
+    ax.fill_between(dates, mean_1rms - std_1rms, mean_1rms + std_1rms, alpha=0.3, label='Confidence Interval')
+
+    ax.set_title('Estimated 1RM Progression', fontweight='bold')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('1RM (kg)')
+    ax.legend(loc='best')
+    ax.grid(True, alpha=0.3)
+    _format_dates(ax)
+
+def plot_muscle_distribution(ax: plt.Axes, data: Dict[str, Any]):
+    """Plot muscle group volume distribution"""
+    if not len(data["groups"]):
+        _no_data(ax, 'Muscle Group Distribution')
+        return
+
+    muscle_groups = list(data["groups"][:8])  # Top 8 muscle groups
+    volumes = data["volume"][:8]
+
+    # Create pie chart
+    colors = sns.color_palette('husl', len(muscle_groups))
+    wedges, texts, autotexts = ax.pie(
+        volumes,
+        labels=muscle_groups,
+        autopct='%1.1f%%',
+        colors=colors,
+        startangle=90
+    )
+
+    # Beautify the plot
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+        autotext.set_fontsize(10)
+
+    ax.set_title('Training Volume by Muscle Group', fontweight='bold')
+
+def dashboard_panels(sets: Dict[str, list], exercise_id: Optional[int], heatmap_since: datetime) -> Dict[str, Dict[str, Any]]:
+    """Derive the data of all four dashboard panels from the user's set-level rows"""
+    dates, weight, reps = _dates(sets["date"]), _floats(sets["weight"]), _floats(sets["reps"])
+    volume = weight * reps
+    selected = np.array(sets["exercise_id"]) == exercise_id if exercise_id else np.ones(len(dates), dtype=bool)
+
+    weights = kernels.group_stats(dates[selected], weight[selected])
+    recent = dates >= np.datetime64(heatmap_since, "us")
+    recent_volume = kernels.group_stats(dates[recent], volume[recent])
+    # Without an exercise the 1RM panel shows the first 100 sets
+    sets_1rm = selected if exercise_id else np.arange(len(dates)) < 100
+    muscles = kernels.group_stats(np.array(sets["muscle_group"], dtype=object), volume)
+    by_volume = np.argsort(-muscles["sum"], kind="stable")
+
+    return {
+        "weight": {"dates": weights["keys"], "max_weight": weights["max"], "avg_weight": weights["mean"]},
+        "volume": {"dates": recent_volume["keys"], "volume": recent_volume["sum"]},
+        "one_rm": {"dates": dates[sets_1rm], "weight": weight[sets_1rm], "reps": reps[sets_1rm]},
+        "muscles": {"groups": list(muscles["keys"][by_volume]), "volume": muscles["sum"][by_volume]},
+    }
+
+def draw_dashboard(payload: Dict[str, Any]) -> bytes:
+    """Comprehensive 4-panel progress dashboard"""
+    panels = dashboard_panels(payload["sets"], payload["exercise_id"], payload["heatmap_since"])
+    fig, axes = plt.subplots(2, 2, figsize=payload["figsize"], dpi=payload["dpi"])
+    fig.suptitle('Workout Progress Dashboard', fontsize=16, fontweight='bold')
+
+    plot_weight_progression(axes[0, 0], panels["weight"], payload["max_points"])
+    plot_volume_heatmap(axes[0, 1], panels["volume"])
+    plot_1rm_progression(axes[1, 0], panels["one_rm"], payload["max_points"])
+    plot_muscle_distribution(axes[1, 1], panels["muscles"])
+
+    plt.tight_layout()
+    return fig_to_bytes(fig, payload["dpi"])
+
+def draw_progress_chart(payload: Dict[str, Any]) -> bytes:
+    """Max weight and volume of one exercise on two axes"""
+    fig, ax = plt.subplots(figsize=(10, 6), dpi=payload["dpi"])
+    dates, max_points = _dates(payload["dates"]), payload["max_points"]
+
+    if not len(dates):
+        _no_data(ax, 'Progress Chart', fontsize=14)
+    else:
+        weights, volume = _floats(payload["max_weight"]), _floats(payload["volume"])
+
+        # Create dual axis
+        ax2 = ax.twinx()
+
+        # Plot weight on primary axis
+        line1 = _plot_series(ax, dates, weights, max_points, 'b-o', linewidth=2, markersize=8, label='Max Weight')
+        ax.set_xlabel('Date', fontsize=12)
+        ax.set_ylabel('Weight (kg)', color='b', fontsize=12)
+        ax.tick_params(axis='y', labelcolor='b')
+
+        # Plot volume on secondary axis
+        line2 = _plot_series(ax2, dates, volume, max_points, 'r-s', linewidth=2, markersize=6, label='Total Volume', alpha=0.7)
+        ax2.set_ylabel('Volume (kg)', color='r', fontsize=12)
+        ax2.tick_params(axis='y', labelcolor='r')
+
+        # Add trend line
+        if len(dates) > 2:
+            _plot_trend(ax, dates, weights, 1, max_points, 'b--', alpha=0.5, linewidth=1)
+
+        ax.set_title(f'{payload["exercise_name"]} Progress Chart', fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        _format_dates(ax, weekly_ticks=False)
+
+        # Add legend
+        lines = line1 + line2
+        ax.legend(lines, [l.get_label() for l in lines], loc='upper left')
+
+    plt.tight_layout()
+    return fig_to_bytes(fig, payload["dpi"])
+
+def draw_body_composition_chart(payload: Dict[str, Any]) -> bytes:
+    """Body weight and body fat over time"""
+    fig, axes = plt.subplots(2, 1, figsize=(10, 8), dpi=payload["dpi"])
+    weight, body_fat, max_points = payload["weight"], payload["body_fat"], payload["max_points"]
+    weight = {"dates": _dates(weight["dates"]), "values": _floats(weight["values"])}
+    body_fat = {"dates": _dates(body_fat["dates"]), "values": _floats(body_fat["values"])}
+
+    if not len(weight["dates"]) and not len(body_fat["dates"]):
+        for ax in axes:
+            _no_data(ax, 'Body Composition', 'No body composition data available')
+    else:
+        # Plot body weight
+        if len(weight["dates"]):
+            _plot_series(axes[0], weight["dates"], weight["values"], max_points, 'g-o', linewidth=2, markersize=8)
+            axes[0].set_title('Body Weight Tracking', fontweight='bold')
+            axes[0].set_ylabel('Weight (kg)')
+            axes[0].grid(True, alpha=0.3)
+
+            # Add trend line
+            if len(weight["dates"]) > 2:
+                _plot_trend(axes[0], weight["dates"], weight["values"], 1, max_points, 'g--', alpha=0.5)
+
+        # Plot body fat percentage
+        if len(body_fat["dates"]):
+            _plot_series(axes[1], body_fat["dates"], body_fat["values"], max_points, 'orange', marker='o', linewidth=2, markersize=8)
+            axes[1].set_title('Body Fat Percentage', fontweight='bold')
+            axes[1].set_ylabel('Body Fat (%)')
+            axes[1].set_xlabel('Date')
+            axes[1].grid(True, alpha=0.3)
+
+        # Format x-axis for both plots
+        for ax in axes:
+            _format_dates(ax, weekly_ticks=False)
+
+    plt.tight_layout()
+    return fig_to_bytes(fig, payload["dpi"])
+
+DRAWERS = {
+    "dashboard": draw_dashboard,
+    "progress": draw_progress_chart,
+    "body_composition": draw_body_composition_chart,
+}
@@ -0,0 +1,155 @@
+"""Live countdown rendering for rest timers with coalesced message edits"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from aiogram.exceptions import TelegramRetryAfter, TelegramBadRequest
+
+logger = logging.getLogger(__name__)
+
+def render_countdown(remaining_seconds: float, step: int = 1) -> str:
+    """Render remaining time, rounded up to the update step so it never under-reports"""
+    remaining = max(0, math.ceil(remaining_seconds / step) * step)
+    hours, rest = divmod(remaining, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"⏳ Осталось {hours}:{minutes:02d}:{seconds:02d}"
+    return f"⏳ Осталось {minutes}:{seconds:02d}"
+
+class CountdownTicker:
+    """Central ticker that edits live countdown messages within an edit budget.
+
+    The update interval adapts to load: it is the smallest of ``intervals``
+    at which all live timers fit into ``max_edits_per_second``. Due edits are
+    taken oldest-first from a heap; edits beyond the budget wait for the next
+    tick and only their latest text is sent, and edits whose rendered text did
+    not change are skipped without spending budget.
+    """
+
+    def __init__(
+        self,
+        max_edits_per_second: float = 10,
+        intervals: Sequence[int] = (1, 5, 15),
+        tick_seconds: float = 1.0
+    ):
+        self.max_edits_per_second = max_edits_per_second
+        self.intervals = tuple(intervals)
+        self.tick_seconds = tick_seconds
+        self.bot = None
+        self.live: Dict[int, object] = {}
+        self.last_text: Dict[int, str] = {}
+        self._heap: List[Tuple[float, int, int, object]] = []
+        self._seq = itertools.count()
+        self._budget = 0.0
+        self._last_tick: Optional[float] = None
+        self._paused_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.edits_sent = 0
+        self.edits_skipped = 0
+
+    def set_bot(self, bot):
+        self.bot = bot
+
+    @property
+    def interval(self) -> int:
+        """Current update interval for the number of live timers"""
+        for interval in self.intervals:
+            if len(self.live) / interval <= self.max_edits_per_second:
+                return interval
+        return self.intervals[-1]
+
+    def track(self, user_id: int, timer, now: Optional[float] = None):
+        """Start live updates for a timer shown in timer.message_id"""
+        now = time.monotonic() if now is None else now
+        self.live[user_id] = timer
+        self.last_text.pop(user_id, None)
+        heapq.heappush(self._heap, (now + self.interval, next(self._seq), user_id, timer))
+
+    def untrack(self, user_id: int):
+        """Stop live updates; stale heap entries are dropped lazily"""
+        self.live.pop(user_id, None)
+        self.last_text.pop(user_id, None)
+
+    def backlog(self, now: Optional[float] = None) -> int:
+        """Live timers whose edit is due but not sent yet"""
+        now = time.monotonic() if now is None else now
+        return sum(
+            1 for due, _, user_id, timer in self._heap
+            if due <= now and self.live.get(user_id) is timer
+        )
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self.live.clear()
+        self.last_text.clear()
+        self._heap.clear()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.sleep(self.tick_seconds)
+                if self.live:
+                    await self.tick(time.monotonic())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in countdown ticker: {e}")
+
+    async def tick(self, now: float) -> int:
+        """Send the edits that are due and fit the budget, returns edits sent"""
+        elapsed = self.tick_seconds if self._last_tick is None else now - self._last_tick
+        self._last_tick = now
+        # Unused budget does not pile up beyond one tick
+        self._budget = min(self._budget + elapsed * self.max_edits_per_second, self.max_edits_per_second * self.tick_seconds)
+        if now < self._paused_until:
+            return 0
+
+        interval = self.interval
+        edits = []
+        while self._heap and self._heap[0][0] <= now:
+            due, _, user_id, timer = self._heap[0]
+            if self.live.get(user_id) is not timer:
+                heapq.heappop(self._heap)
+                continue
+
+            text = render_countdown(timer.deadline - time.time(), interval)
+            if text == self.last_text.get(user_id):
+                heapq.heapreplace(self._heap, (now + interval, next(self._seq), user_id, timer))
+                self.edits_skipped += 1
+                continue
+
+            if self._budget < 1:
+                break
+            self._budget -= 1
+            heapq.heapreplace(self._heap, (now + interval, next(self._seq), user_id, timer))
+            self.last_text[user_id] = text
+            edits.append(self._edit(user_id, timer, text))
+
+        if edits:
+            await asyncio.gather(*edits)
+        return len(edits)
+
+    async def _edit(self, user_id: int, timer, text: str):
+        try:
+            await self.bot.edit_message_text(text=text, chat_id=timer.chat_id, message_id=timer.message_id)
+            self.edits_sent += 1
+        except TelegramRetryAfter as e:
+            logger.warning(f"Countdown edits throttled for {e.retry_after}s")
+            self._paused_until = time.monotonic() + e.retry_after
+            self.last_text.pop(user_id, None)
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e):
+                # Message deleted or too old to edit
+                self.untrack(user_id)
+        except Exception as e:
+            logger.error(f"Countdown edit failed for user {user_id}: {e}")
+            self.last_text.pop(user_id, None)
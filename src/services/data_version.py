@@ -0,0 +1,70 @@
+"""Per-user data versions, bumped in the same transaction as the write"""
+
+import logging
+from typing import Set
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.models import Workout, WorkoutExercise, WorkoutSet, ProgressRecord, DataVersion
+from src.database.connection import get_session
+
+logger = logging.getLogger(__name__)
+
+def changed_users(session: Session) -> Set[int]:
+    """Users whose workouts or progress records are written by a flush"""
+    users, workout_ids, workout_exercise_ids = set(), set(), set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Workout, ProgressRecord)):
+            users.add(obj.user_id)
+        elif isinstance(obj, WorkoutExercise):
+            workout_ids.add(obj.workout_id)
+        elif isinstance(obj, WorkoutSet):
+            workout_exercise_ids.add(obj.workout_exercise_id)
+
+    workout_ids.discard(None)
+    workout_exercise_ids.discard(None)
+    if workout_ids or workout_exercise_ids:
+        stmt = (
+            select(Workout.user_id)
+            .join(WorkoutExercise, Workout.id == WorkoutExercise.workout_id, isouter=True)
+            .where(Workout.id.in_(workout_ids) | WorkoutExercise.id.in_(workout_exercise_ids))
+        )
+        users.update(session.connection().execute(stmt).scalars())
+    users.discard(None)
+    return users
+
+def bump_versions(connection, user_ids: Set[int]):
+    """Increment the data version of users, creating missing rows"""
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(DataVersion).values([{"user_id": user_id, "version": 1} for user_id in sorted(user_ids)])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DataVersion.user_id],
+            set_={"version": DataVersion.version + 1}
+        )
+        connection.execute(stmt)
+        return
+
+    for user_id in user_ids:
+        result = connection.execute(
+            update(DataVersion).where(DataVersion.user_id == user_id).values(version=DataVersion.version + 1)
+        )
+        if not result.rowcount:
+            connection.execute(DataVersion.__table__.insert().values(user_id=user_id, version=1))
+
+def _after_flush(session: Session, flush_context):
+    user_ids = changed_users(session)
+    if user_ids:
+        bump_versions(session.connection(), user_ids)
+
+def track_writes():
+    """Bump data versions on every ORM flush that writes training data"""
+    if not event.contains(Session, "after_flush", _after_flush):
+        event.listen(Session, "after_flush", _after_flush)
+
+async def get_version(user_id: int) -> int:
+    async with get_session() as session:
+        result = await session.execute(select(DataVersion.version).where(DataVersion.user_id == user_id))
+        return result.scalar() or 0
@@ -0,0 +1,249 @@
+"""Exports built by background workers, reported through an edited progress message"""
+
+import asyncio
+import logging
+import time
+from datetime import date, datetime
+from typing import Awaitable, BinaryIO, Callable, List, Optional, Set, Union
+from sqlalchemy import func, select, update
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+
+from src.bot.config import config
+from src.models import ExportJob
+from src.database.connection import get_session
+from src.locales.translations import i18n
+from src.services.data_version import get_version
+from src.services.export_service import ExportService
+from src.services.media_registry import media_registry
+from src.utils.metrics import EXPORT_JOB_SECONDS, EXPORT_JOBS, EXPORT_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+# Format: (ExportService method, file extension)
+FORMATS = {
+    "xlsx": ("export_to_excel_file", "xlsx"),
+    "csv": ("export_to_csv_file", "csv.gz"),
+    "pdf": ("export_to_pdf", "pdf"),
+}
+
+class ExportLimitReached(Exception):
+    """The user already has the maximum number of exports queued or running"""
+
+class CachedExportRejected(Exception):
+    """Telegram rejected the stored file_id of an unchanged export"""
+
+class ExportJobService:
+    """Builds exports in ``workers`` background tasks instead of the handler.
+
+    submit() records a job row, sends a progress message and returns; the
+    message is edited as the job moves through its stages. Jobs survive
+    restarts: resume_pending() queues the unfinished ones again, up to
+    ``max_attempts`` runs per job. A user may have ``max_per_user`` jobs
+    queued or running. Finished files are sent through the media registry
+    keyed by the user's data version, so asking again before the data
+    changes resends the earlier upload without queueing a job.
+    """
+
+    def __init__(self, workers: int = 2, max_per_user: int = 2, max_attempts: int = 3):
+        self.bot: Optional[Bot] = None
+        self.workers = workers
+        self.max_per_user = max_per_user
+        self.max_attempts = max_attempts
+        self.exports = ExportService()
+        self.queue: "asyncio.Queue[int]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._queued: Set[int] = set()
+        self._submit_lock = asyncio.Lock()
+
+    def set_bot(self, bot: Bot):
+        """Set bot instance for sending messages"""
+        self.bot = bot
+
+    def start(self):
+        """Start the worker tasks"""
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker(), name=f"export-worker-{len(self._tasks)}"))
+
+    async def resume_pending(self) -> int:
+        """Queue jobs that were interrupted by a restart"""
+        async with get_session() as session:
+            result = await session.execute(
+                select(ExportJob.id).where(ExportJob.status.in_(["pending", "running"])).order_by(ExportJob.id)
+            )
+            job_ids = result.scalars().all()
+
+        for job_id in job_ids:
+            self._enqueue(job_id)
+        if job_ids:
+            logger.info(f"Resumed {len(job_ids)} export jobs")
+        return len(job_ids)
+
+    async def submit(self, user_id: int, telegram_id: int, chat_id: int, fmt: str) -> Optional[ExportJob]:
+        """Queue an export; returns None when an unchanged earlier export was sent right away"""
+        key = await self._cache_key(user_id, fmt)
+        if await media_registry.lookup(media_registry.content_hash(key.encode()), "document"):
+            try:
+                await self._send(user_id, telegram_id, chat_id, fmt, key, self._no_inline_build)
+                EXPORT_JOBS.labels(fmt, "cached").inc()
+                return None
+            except CachedExportRejected:
+                # The registry forgot the file_id; build it again in a job, within the per-user cap
+                logger.info(f"Cached {fmt} export of user {user_id} rejected, queueing a job")
+
+        async with self._submit_lock:
+            async with get_session() as session:
+                active = await session.scalar(
+                    select(func.count(ExportJob.id))
+                    .where(ExportJob.user_id == user_id, ExportJob.status.in_(["pending", "running"]))
+                )
+                if active >= self.max_per_user:
+                    EXPORT_JOBS.labels(fmt, "rejected").inc()
+                    raise ExportLimitReached(f"{active} exports in progress")
+                job = ExportJob(user_id=user_id, telegram_id=telegram_id, chat_id=chat_id, format=fmt)
+                session.add(job)
+                await session.commit()
+                await session.refresh(job)
+
+        try:
+            message = await self.bot.send_message(chat_id, self.render(job))
+            await self._update(job.id, message_id=message.message_id)
+            job.message_id = message.message_id
+        finally:
+            # Queued even without a progress message, or the pending row would count toward the cap until a restart
+            EXPORT_JOBS.labels(fmt, "queued").inc()
+            self._enqueue(job.id)
+            logger.info(f"Export job {job.id} ({fmt}) queued for user {user_id}")
+        return job
+
+    def _enqueue(self, job_id: int):
+        # A job resumed at startup may also have just been submitted
+        if job_id in self._queued:
+            return
+        self._queued.add(job_id)
+        self.queue.put_nowait(job_id)
+        EXPORT_QUEUE_DEPTH.set(self.queue.qsize())
+
+    async def _worker(self):
+        while True:
+            job_id = await self.queue.get()
+            EXPORT_QUEUE_DEPTH.set(self.queue.qsize())
+            try:
+                await self._run(job_id)
+            finally:
+                self._queued.discard(job_id)
+                self.queue.task_done()
+
+    async def _run(self, job_id: int):
+        """Build and send one export, editing its progress message at every stage"""
+        async with get_session() as session:
+            job = await session.get(ExportJob, job_id)
+            if not job or job.status not in ("pending", "running"):
+                return
+            if job.attempts >= self.max_attempts:
+                job.status, job.error, job.finished_at = "failed", "too many attempts", datetime.utcnow()
+                await session.commit()
+                await self._edit(job)
+                return
+            job.status, job.stage, job.attempts = "running", "building", job.attempts + 1
+            await session.commit()
+
+        await self._edit(job)
+        started = time.monotonic()
+        try:
+            build = self._builder(job.user_id, job.format)
+
+            async def build_then_upload():
+                data = await build()
+                await self._set_stage(job, "uploading")
+                return data
+
+            key = await self._cache_key(job.user_id, job.format)
+            await self._send(job.user_id, job.telegram_id, job.chat_id, job.format, key, build_then_upload)
+        except asyncio.CancelledError:
+            logger.info(f"Export job {job_id} interrupted, will run again after restart")
+            raise
+        except Exception as e:
+            logger.error(f"Export job {job_id} failed: {e}", exc_info=True)
+            EXPORT_JOBS.labels(job.format, "failed").inc()
+            await self._update(job_id, status="failed", error=str(e), finished_at=datetime.utcnow())
+            job.status = "failed"
+            await self._edit(job)
+            return
+
+        EXPORT_JOB_SECONDS.labels(job.format).observe(time.monotonic() - started)
+        EXPORT_JOBS.labels(job.format, "completed").inc()
+        job.status = "completed"
+        await self._set_stage(job, "done", status="completed", finished_at=datetime.utcnow())
+
+    @staticmethod
+    async def _no_inline_build():
+        # Handlers never build exports themselves, only workers do
+        raise CachedExportRejected()
+
+    def _builder(self, user_id: int, fmt: str) -> Callable[[], Awaitable[Union[bytes, BinaryIO]]]:
+        method, _ = FORMATS[fmt]
+        return lambda: getattr(self.exports, method)(user_id)
+
+    @staticmethod
+    async def _cache_key(user_id: int, fmt: str) -> str:
+        # Exports cover the last 30 days, so the date is part of the content
+        return f"export:{fmt}:{user_id}:{date.today()}:{await get_version(user_id)}"
+
+    async def _send(self, user_id: int, telegram_id: int, chat_id: int, fmt: str, key: str, build):
+        _, extension = FORMATS[fmt]
+        await media_registry.send_document(
+            self.bot, chat_id, build,
+            filename=f"workouts_{date.today():%Y-%m-%d}.{extension}",
+            key=key,
+            caption=i18n.get("export_caption", telegram_id)
+        )
+
+    async def _set_stage(self, job: ExportJob, stage: str, **values):
+        job.stage = stage
+        await self._update(job.id, stage=stage, **values)
+        await self._edit(job)
+
+    @staticmethod
+    async def _update(job_id: int, **values):
+        async with get_session() as session:
+            await session.execute(update(ExportJob).where(ExportJob.id == job_id).values(**values))
+
+    @staticmethod
+    def render(job: ExportJob) -> str:
+        """Progress message text of a job"""
+        if job.status == "failed":
+            return i18n.get("export_failed", job.telegram_id)
+        return i18n.get(f"export_stage_{job.stage}", job.telegram_id, format=job.format.upper())
+
+    async def _edit(self, job: ExportJob):
+        if job.message_id is None:
+            return
+        try:
+            await self.bot.edit_message_text(text=self.render(job), chat_id=job.chat_id, message_id=job.message_id)
+        except TelegramBadRequest as e:
+            # Not modified, or the user deleted the message; the file is still sent
+            logger.debug(f"Export job {job.id} progress not edited: {e}")
+        except Exception as e:
+            logger.warning(f"Export job {job.id} progress not edited: {e}")
+
+    def pending_count(self) -> int:
+        """Jobs queued or being built"""
+        return len(self._queued)
+
+    def shutdown(self):
+        """Stop the workers; unfinished jobs stay in the database and are resumed"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        self._queued.clear()
+        self.queue = asyncio.Queue()
+        EXPORT_QUEUE_DEPTH.set(0)
+
+# Global instance
+export_jobs = ExportJobService(
+    workers=config.EXPORT_WORKERS,
+    max_per_user=config.EXPORT_MAX_JOBS_PER_USER,
+    max_attempts=config.EXPORT_JOB_MAX_ATTEMPTS
+)
@@ -1,26 +1,124 @@
+import asyncio
+import csv
+import gzip
 import logging
+import tempfile
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
-from io import BytesIO
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils import get_column_letter
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from sqlalchemy import select
+from typing import Dict, Any, AsyncIterator, List, Optional, BinaryIO
+from io import BytesIO, TextIOWrapper
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import selectinload
 
 from src.models import Workout, WorkoutExercise, WorkoutSet, Exercise, User, Routine, ProgressRecord
+from src.bot.config import config
 from src.database.connection import get_session
 
 logger = logging.getLogger(__name__)
 
+class ExcelWorkbookWriter:
+    """Builds the write-only workbook of an Excel export.
+
+    Appending a row to a write-only sheet serializes it to XML right away,
+    so filling the sheets costs far more CPU than saving them. Every method
+    is meant to run in a worker thread, one call at a time.
+    """
+
+    def __init__(self):
+        from openpyxl import Workbook
+
+        self.wb = Workbook(write_only=True)
+        self.wb.add_named_style(self._header_style())
+        self.summary = self.wb.create_sheet("Workout Summary")
+        self.detail = self.wb.create_sheet("Detailed Workouts")
+        self.stats = self.wb.create_sheet("Statistics")
+        self.records = self.wb.create_sheet("Personal Records")
+        self._start_sheet(
+            self.summary, ["Date", "Exercise", "Sets", "Total Reps", "Total Volume", "Max Weight", "Notes"], 15
+        )
+        self._start_sheet(self.detail, ["Date", "Exercise", "Set", "Reps", "Weight", "RPE", "Rest (sec)", "Notes"], 12)
+        self._current = None
+        self._row: Optional[list] = None  # Summary of the current exercise of a workout
+
+    @staticmethod
+    def _header_style():
+        """Shared by every header cell instead of a style object per cell"""
+        from openpyxl.styles import Font, PatternFill, Alignment, NamedStyle
+
+        return NamedStyle(
+            name="header",
+            font=Font(color="FFFFFF", bold=True),
+            fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+            alignment=Alignment(horizontal="center")
+        )
+
+    @staticmethod
+    def _start_sheet(ws, headers: List[str], width: float):
+        """Column widths and the header row; in write-only mode both precede the data"""
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
+
+        for col in range(1, len(headers) + 1):
+            ws.column_dimensions[get_column_letter(col)].width = width
+        row = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.style = "header"
+            row.append(cell)
+        ws.append(row)
+
+    def write_sets(self, rows: list):
+        """Append a chunk of sets to the detail sheet, one summary row per exercise of a workout"""
+        for date, workout_exercise_id, exercise_notes, name, set_number, reps, weight, rpe, rest, notes in rows:
+            day = date.strftime("%Y-%m-%d")
+            if workout_exercise_id != self._current:
+                self._flush_summary()
+                self._current = workout_exercise_id
+                self._row = [day, name, 0, 0, 0.0, 0, exercise_notes or ""]
+            if set_number is None:
+                continue
+            summary = self._row
+            summary[2] += 1
+            summary[3] += reps
+            summary[4] += reps * weight
+            summary[5] = max(summary[5], weight)
+            self.detail.append([day, name, set_number, reps, weight, rpe or "", rest or "", notes or ""])
+
+    def _flush_summary(self):
+        if self._row:
+            self._row[4] = round(self._row[4], 2)
+            self.summary.append(self._row)
+            self._row = None
+
+    def finish(self, stats: List[tuple], records: List[list], output: BinaryIO):
+        """Write the statistics and personal records sheets and save the workbook"""
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+
+        self._flush_summary()
+
+        self.stats.column_dimensions["A"].width = 20
+        self.stats.column_dimensions["B"].width = 20
+        headers = []
+        for header in ("Statistic", "Value"):
+            cell = WriteOnlyCell(self.stats, value=header)
+            cell.font = Font(bold=True)
+            headers.append(cell)
+        self.stats.append(headers)
+        for label, value in stats:
+            self.stats.append([label, value])
+
+        self._start_sheet(self.records, ["Exercise", "Record Type", "Value", "Date Achieved"], 15)
+        for record in records:
+            self.records.append(record)
+
+        self.wb.save(output)
+
 class ExportService:
-    """Service for exporting workout data in various formats"""
+    """Service for exporting workout data in various formats.
+
+    openpyxl and reportlab are imported by the methods that use them,
+    keeping them off the bot's startup path.
+    """
 
     async def export_to_excel(
         self,
@@ -29,139 +127,73 @@ class ExportService:
         end_date: Optional[datetime] = None
     ) -> bytes:
         """Export workout data to Excel format"""
+        with await self.export_to_excel_file(user_id, start_date, end_date) as excel_file:
+            return excel_file.read()
+
+    async def export_to_excel_file(
+        self,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> BinaryIO:
+        """Export workout data to Excel format as a rewound temporary file.
+
+        Sets are streamed from the database in chunks of EXPORT_CHUNK_ROWS
+        and each chunk is handed to an ExcelWorkbookWriter in a worker
+        thread, which also saves the workbook, so the event loop only runs
+        the queries. Write-only sheets and a file kept in memory up to
+        EXPORT_SPOOL_MAX_BYTES keep memory from growing with the number of
+        sets. The caller closes the file.
+        """
         if not start_date:
             start_date = datetime.now() - timedelta(days=30)
         if not end_date:
             end_date = datetime.now()
 
-        async with get_session() as session:
-            # Get workouts
-            stmt = (
-                select(Workout)
-                .where(
-                    Workout.user_id == user_id,
-                    Workout.date >= start_date,
-                    Workout.date <= end_date
-                )
-                .options(
-                    selectinload(Workout.exercises)
-                    .selectinload(WorkoutExercise.exercise),
-                    selectinload(Workout.exercises)
-                    .selectinload(WorkoutExercise.sets)
-                )
-                .order_by(Workout.date.desc())
+        writer = await asyncio.to_thread(ExcelWorkbookWriter)
+        async for rows in self._workout_rows(user_id, start_date, end_date):
+            await asyncio.to_thread(writer.write_sets, rows)
+
+        stats = await self._stats_rows(user_id)
+        records = await self._pr_rows(user_id)
+        excel_file = tempfile.SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_MAX_BYTES)
+        await asyncio.to_thread(writer.finish, stats, records, excel_file)
+        excel_file.seek(0)
+        return excel_file
+
+    async def _workout_rows(self, user_id: int, start_date: datetime, end_date: datetime) -> AsyncIterator[list]:
+        """Sets with their workout and exercise, in chunks of EXPORT_CHUNK_ROWS"""
+        stmt = (
+            select(
+                Workout.date, WorkoutExercise.id, WorkoutExercise.notes, Exercise.name,
+                WorkoutSet.set_number, WorkoutSet.reps, WorkoutSet.weight,
+                WorkoutSet.rpe, WorkoutSet.rest_seconds, WorkoutSet.notes
             )
+            .join(WorkoutExercise, WorkoutExercise.workout_id == Workout.id)
+            .join(Exercise, Exercise.id == WorkoutExercise.exercise_id)
+            .outerjoin(WorkoutSet, WorkoutSet.workout_exercise_id == WorkoutExercise.id)
+            .where(
+                Workout.user_id == user_id,
+                Workout.date >= start_date,
+                Workout.date <= end_date
+            )
+            .order_by(Workout.date.desc(), Workout.id, WorkoutExercise.order, WorkoutExercise.id, WorkoutSet.id)
+            .execution_options(yield_per=config.EXPORT_CHUNK_ROWS)
+        )
 
-            result = await session.execute(stmt)
-            workouts = result.scalars().unique().all()
-
-            # Create workbook
-            wb = Workbook()
-
-            # Workout Summary Sheet
-            ws_summary = wb.active
-            ws_summary.title = "Workout Summary"
-            self._create_summary_sheet(ws_summary, workouts)
-
-            # Detailed Workouts Sheet
-            ws_detail = wb.create_sheet("Detailed Workouts")
-            self._create_detail_sheet(ws_detail, workouts)
-
-            # Statistics Sheet
-            ws_stats = wb.create_sheet("Statistics")
-            await self._create_stats_sheet(ws_stats, user_id, session)
-
-            # Personal Records Sheet
-            ws_pr = wb.create_sheet("Personal Records")
-            await self._create_pr_sheet(ws_pr, user_id, session)
-
-            # Save to bytes
-            excel_file = BytesIO()
-            wb.save(excel_file)
-            excel_file.seek(0)
-
-            return excel_file.getvalue()
+        async with get_session() as session:
+            result = await session.stream(stmt)
+            async for rows in result.partitions():
+                yield rows
 
-    def _create_summary_sheet(self, ws, workouts):
-        """Create summary sheet in Excel"""
-        # Headers
-        headers = ["Date", "Exercise", "Sets", "Total Reps", "Total Volume", "Max Weight", "Notes"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            cell.font = Font(color="FFFFFF", bold=True)
-            cell.alignment = Alignment(horizontal="center")
-
-        # Data
-        row = 2
-        for workout in workouts:
-            for workout_exercise in workout.exercises:
-                exercise = workout_exercise.exercise
-                total_reps = sum(s.reps for s in workout_exercise.sets)
-                total_volume = sum(s.reps * s.weight for s in workout_exercise.sets)
-                max_weight = max((s.weight for s in workout_exercise.sets), default=0)
-
-                ws.cell(row=row, column=1, value=workout.date.strftime("%Y-%m-%d"))
-                ws.cell(row=row, column=2, value=exercise.name)
-                ws.cell(row=row, column=3, value=len(workout_exercise.sets))
-                ws.cell(row=row, column=4, value=total_reps)
-                ws.cell(row=row, column=5, value=round(total_volume, 2))
-                ws.cell(row=row, column=6, value=max_weight)
-                ws.cell(row=row, column=7, value=workout_exercise.notes or "")
-
-                row += 1
-
-        # Auto-adjust column widths
-        for col in range(1, 8):
-            ws.column_dimensions[get_column_letter(col)].width = 15
-
-    def _create_detail_sheet(self, ws, workouts):
-        """Create detailed workout sheet in Excel"""
-        headers = ["Date", "Exercise", "Set", "Reps", "Weight", "RPE", "Rest (sec)", "Notes"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            cell.font = Font(color="FFFFFF", bold=True)
-
-        row = 2
-        for workout in workouts:
-            for workout_exercise in workout.exercises:
-                exercise = workout_exercise.exercise
-                for workout_set in workout_exercise.sets:
-                    ws.cell(row=row, column=1, value=workout.date.strftime("%Y-%m-%d"))
-                    ws.cell(row=row, column=2, value=exercise.name)
-                    ws.cell(row=row, column=3, value=workout_set.set_number)
-                    ws.cell(row=row, column=4, value=workout_set.reps)
-                    ws.cell(row=row, column=5, value=workout_set.weight)
-                    ws.cell(row=row, column=6, value=workout_set.rpe or "")
-                    ws.cell(row=row, column=7, value=workout_set.rest_seconds or "")
-                    ws.cell(row=row, column=8, value=workout_set.notes or "")
-                    row += 1
-
-        # Auto-adjust column widths
-        for col in range(1, 9):
-            ws.column_dimensions[get_column_letter(col)].width = 12
-
-    async def _create_stats_sheet(self, ws, user_id, session):
-        """Create statistics sheet in Excel"""
+    async def _stats_rows(self, user_id: int) -> List[tuple]:
+        """(label, value) rows of the statistics sheet"""
         from src.services.workout_service import WorkoutService
         from src.services.analytics_service import WorkoutAnalytics
 
-        workout_service = WorkoutService()
-        analytics = WorkoutAnalytics()
-
-        # Get statistics
-        stats = await workout_service.get_user_statistics(user_id)
-        volume_data = await analytics.calculate_volume_progression(user_id, weeks=12)
-
-        # Add headers
-        ws.cell(row=1, column=1, value="Statistic").font = Font(bold=True)
-        ws.cell(row=1, column=2, value="Value").font = Font(bold=True)
-
-        # Add statistics
-        stats_data = [
+        stats = await WorkoutService().get_user_statistics(user_id)
+        volume_data = await WorkoutAnalytics().calculate_volume_progression(user_id, weeks=12)
+        return [
             ("Total Workouts", stats["total_workouts"]),
             ("This Week", stats["week_workouts"]),
             ("Total Volume (kg)", stats["total_volume"]),
@@ -169,39 +201,15 @@ class ExportService:
             ("Weekly Trend", f"{volume_data.get('trend', 0):.2f} kg/week"),
         ]
 
-        for i, (label, value) in enumerate(stats_data, 2):
-            ws.cell(row=i, column=1, value=label)
-            ws.cell(row=i, column=2, value=value)
-
-        # Auto-adjust column widths
-        ws.column_dimensions["A"].width = 20
-        ws.column_dimensions["B"].width = 20
-
-    async def _create_pr_sheet(self, ws, user_id, session):
-        """Create personal records sheet in Excel"""
+    async def _pr_rows(self, user_id: int) -> List[list]:
+        """Rows of the personal records sheet"""
         from src.services.analytics_service import WorkoutAnalytics
 
-        analytics = WorkoutAnalytics()
-        records = await analytics.get_personal_records(user_id)
-
-        # Headers
-        headers = ["Exercise", "Record Type", "Value", "Date Achieved"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            cell.font = Font(color="FFFFFF", bold=True)
-
-        # Data
-        for i, record in enumerate(records, 2):
-            ws.cell(row=i, column=1, value=record["exercise"])
-            ws.cell(row=i, column=2, value=record["type"])
-            ws.cell(row=i, column=3, value=record["value"])
-            ws.cell(row=i, column=4, value=record["date"].strftime("%Y-%m-%d"))
-
-        # Auto-adjust column widths
-        for col in range(1, 5):
-            ws.column_dimensions[get_column_letter(col)].width = 15
+        records = await WorkoutAnalytics().get_personal_records(user_id)
+        return [
+            [record["exercise"], record["type"], record["value"], record["date"].strftime("%Y-%m-%d")]
+            for record in records
+        ]
 
     async def export_to_pdf(
         self,
@@ -210,6 +218,12 @@ class ExportService:
         end_date: Optional[datetime] = None
     ) -> bytes:
         """Export workout data to PDF format"""
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+
         if not start_date:
             start_date = datetime.now() - timedelta(days=30)
         if not end_date:
@@ -230,12 +244,14 @@ class ExportService:
                     Workout.date <= end_date
                 )
                 .options(
-                    selectinload(Workout.exercises)
+                    selectinload(Workout.workout_exercises)
                     .selectinload(WorkoutExercise.exercise),
-                    selectinload(Workout.exercises)
+                    selectinload(Workout.workout_exercises)
                     .selectinload(WorkoutExercise.sets)
                 )
                 .order_by(Workout.date.desc())
+                # Only the 20 most recent workouts are listed; loading the rest would block the loop for nothing
+                .limit(20)
             )
 
             result = await session.execute(stmt)
@@ -301,13 +317,13 @@ class ExportService:
             elements.append(Paragraph("<b>Workout Details</b>", styles['Heading2']))
             elements.append(Spacer(1, 12))
 
-            for workout in workouts[:20]:  # Limit to 20 most recent workouts
+            for workout in workouts:
                 # Workout date header
                 date_str = workout.date.strftime("%A, %B %d, %Y")
                 elements.append(Paragraph(f"<b>{date_str}</b>", styles['Heading3']))
 
                 # Exercise data
-                for workout_exercise in workout.exercises:
+                for workout_exercise in workout.workout_exercises:
                     exercise = workout_exercise.exercise
                     exercise_data = []
 
@@ -346,12 +362,17 @@ class ExportService:
 
                 elements.append(Spacer(1, 20))
 
-            # Build PDF
-            doc.build(elements)
+            # Build PDF; layout is CPU-bound, keep it off the event loop
+            await asyncio.to_thread(doc.build, elements)
             pdf_file.seek(0)
 
             return pdf_file.getvalue()
 
+    CSV_HEADER = [
+        "Date", "Exercise", "Category", "Muscle Group", "Set", "Reps",
+        "Weight (kg)", "Volume (kg)", "RPE", "Rest (sec)", "Notes"
+    ]
+
     async def export_to_csv(
         self,
         user_id: int,
@@ -359,61 +380,111 @@ class ExportService:
         end_date: Optional[datetime] = None
     ) -> bytes:
         """Export workout data to CSV format"""
+        csv_file = BytesIO()
+        await self.write_csv(csv_file, user_id, start_date, end_date)
+        return csv_file.getvalue()
+
+    async def export_to_csv_file(
+        self,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> BinaryIO:
+        """Export workout data as gzipped CSV in a rewound temporary file, closed by the caller"""
+        csv_file = tempfile.SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_MAX_BYTES)
+        # mtime=0 keeps the output reproducible
+        with gzip.GzipFile(fileobj=csv_file, mode="wb", mtime=0) as compressed:
+            await self.write_csv(compressed, user_id, start_date, end_date)
+        csv_file.seek(0)
+        return csv_file
+
+    async def write_csv(
+        self,
+        file: BinaryIO,
+        user_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ):
+        """Write the sets of a date range as UTF-8 CSV, a page of rows at a time"""
         if not start_date:
             start_date = datetime.now() - timedelta(days=30)
         if not end_date:
             end_date = datetime.now()
 
-        async with get_session() as session:
-            stmt = (
-                select(Workout)
-                .where(
-                    Workout.user_id == user_id,
-                    Workout.date >= start_date,
-                    Workout.date <= end_date
-                )
-                .options(
-                    selectinload(Workout.exercises)
-                    .selectinload(WorkoutExercise.exercise),
-                    selectinload(Workout.exercises)
-                    .selectinload(WorkoutExercise.sets)
-                )
-                .order_by(Workout.date.desc())
+        text = TextIOWrapper(file, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        writer.writerow(self.CSV_HEADER)
+        async for rows in self._csv_pages(user_id, start_date, end_date):
+            writer.writerows(rows)
+        text.flush()
+        # Leave the binary file open for the caller
+        text.detach()
+
+    async def _csv_pages(self, user_id: int, start_date: datetime, end_date: datetime) -> AsyncIterator[List[tuple]]:
+        """CSV rows, EXPORT_CHUNK_ROWS at a time.
+
+        Plain column tuples instead of ORM objects; each page is a separate
+        query resuming after the last row of the previous one (keyset
+        pagination), so no page has to skip over the rows before it and no
+        cursor stays open between pages.
+        """
+        stmt = (
+            select(
+                Workout.date, Workout.id, WorkoutSet.id,
+                Exercise.name, Exercise.category, Exercise.muscle_group,
+                WorkoutSet.set_number, WorkoutSet.reps, WorkoutSet.weight,
+                WorkoutSet.rpe, WorkoutSet.rest_seconds, WorkoutSet.notes
             )
+            .join(WorkoutExercise, WorkoutExercise.workout_id == Workout.id)
+            .join(Exercise, Exercise.id == WorkoutExercise.exercise_id)
+            .join(WorkoutSet, WorkoutSet.workout_exercise_id == WorkoutExercise.id)
+            .where(
+                Workout.user_id == user_id,
+                Workout.date >= start_date,
+                Workout.date <= end_date
+            )
+            # Newest workout first, its sets in the order they were logged
+            .order_by(Workout.date.desc(), Workout.id.desc(), WorkoutSet.id)
+            .limit(config.EXPORT_CHUNK_ROWS)
+        )
+
+        page = stmt
+        while True:
+            async with get_session() as session:
+                connection = await session.connection()
+                rows = (await connection.execute(page)).all()
+            if not rows:
+                return
+
+            # A workout's sets share its date
+            days: Dict[datetime, str] = {}
+            yield [
+                (
+                    days.get(workout_date) or days.setdefault(workout_date, workout_date.strftime("%Y-%m-%d")),
+                    name, category, muscle_group,
+                    set_number, reps, weight, reps * weight, rpe or "", rest or "", notes or ""
+                )
+                for workout_date, _, _, name, category, muscle_group, set_number, reps, weight, rpe, rest, notes in rows
+            ]
 
-            result = await session.execute(stmt)
-            workouts = result.scalars().unique().all()
-
-            # Create data for CSV
-            data = []
-            for workout in workouts:
-                for workout_exercise in workout.exercises:
-                    exercise = workout_exercise.exercise
-                    for workout_set in workout_exercise.sets:
-                        data.append({
-                            'Date': workout.date.strftime('%Y-%m-%d'),
-                            'Exercise': exercise.name,
-                            'Category': exercise.category,
-                            'Muscle Group': exercise.muscle_group,
-                            'Set': workout_set.set_number,
-                            'Reps': workout_set.reps,
-                            'Weight (kg)': workout_set.weight,
-                            'Volume (kg)': workout_set.reps * workout_set.weight,
-                            'RPE': workout_set.rpe or '',
-                            'Rest (sec)': workout_set.rest_seconds or '',
-                            'Notes': workout_set.notes or ''
-                        })
-
-            # Create DataFrame and export to CSV
-            df = pd.DataFrame(data)
-            csv_file = BytesIO()
-            df.to_csv(csv_file, index=False, encoding='utf-8')
-            csv_file.seek(0)
-
-            return csv_file.getvalue()
+            if len(rows) < config.EXPORT_CHUNK_ROWS:
+                return
+            last_date, last_workout, last_set = rows[-1][:3]
+            # The plain bound lets the database seek on the date index instead of
+            # filtering every newer row again
+            page = stmt.where(Workout.date <= last_date, or_(
+                Workout.date < last_date,
+                and_(Workout.date == last_date, Workout.id < last_workout),
+                and_(Workout.date == last_date, Workout.id == last_workout, WorkoutSet.id > last_set)
+            ))
 
     async def export_routine_to_pdf(self, routine_id: int) -> bytes:
         """Export a workout routine to PDF"""
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib.units import inch
         from src.services.routine_service import RoutineService
 
         routine_service = RoutineService()
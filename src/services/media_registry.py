@@ -0,0 +1,132 @@
+"""Reuse Telegram file_ids of generated images and documents"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import AsyncGenerator, Awaitable, BinaryIO, Callable, Optional, Tuple, Union
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, InputFile, Message
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from src.models import MediaFile
+from src.database.connection import get_session
+from src.utils.metrics import CACHE_REQUESTS, MEDIA_UPLOAD_BYTES
+
+logger = logging.getLogger(__name__)
+
+class StreamInputFile(InputFile):
+    """Uploads an open binary file in chunks instead of reading it into memory"""
+
+    def __init__(self, file: BinaryIO, filename: str):
+        super().__init__(filename=filename)
+        self.file = file
+
+    async def read(self, bot) -> AsyncGenerator[bytes, None]:
+        self.file.seek(0)
+        while chunk := self.file.read(self.chunk_size):
+            yield chunk
+
+class MediaRegistry:
+    """Sends generated files by file_id when the same bytes were uploaded before.
+
+    The first send of some content uploads it and records the file_id
+    Telegram returns under the sha256 of the bytes; later sends of identical
+    bytes to any chat reference that file_id. A file_id Telegram no longer
+    accepts is dropped and the file uploaded again.
+
+    Files that are not byte-for-byte reproducible (xlsx embeds timestamps)
+    are registered under a caller-chosen ``key`` describing their inputs
+    instead; ``data`` may then be a coroutine function, called only when
+    the file has to be uploaded, and may return an open binary file, which
+    is uploaded in chunks and closed.
+    """
+
+    def __init__(self, memory_size: int = 4096):
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    async def send_photo(self, bot, chat_id: int, data: bytes, filename: str, key: Optional[str] = None, **kwargs) -> Message:
+        return await self._send(bot, "photo", chat_id, data, filename, key, **kwargs)
+
+    async def send_document(
+        self,
+        bot,
+        chat_id: int,
+        data: Union[bytes, Callable[[], Awaitable[Union[bytes, BinaryIO]]]],
+        filename: str,
+        key: Optional[str] = None,
+        **kwargs
+    ) -> Message:
+        return await self._send(bot, "document", chat_id, data, filename, key, **kwargs)
+
+    async def _send(self, bot, kind: str, chat_id: int, data, filename: str, key: Optional[str], **kwargs) -> Message:
+        send = bot.send_photo if kind == "photo" else bot.send_document
+        content_hash = self.content_hash(key.encode() if key else data)
+
+        file_id = await self.lookup(content_hash, kind)
+        if file_id:
+            try:
+                return await send(chat_id, file_id, **kwargs)
+            except TelegramBadRequest as e:
+                logger.warning(f"Stored {kind} file_id rejected, uploading again: {e}")
+                await self.forget(content_hash, kind)
+
+        if callable(data):
+            data = await data()
+        if isinstance(data, bytes):
+            size = len(data)
+            message = await send(chat_id, BufferedInputFile(data, filename=filename), **kwargs)
+        else:
+            with data:
+                size = data.seek(0, 2)
+                message = await send(chat_id, StreamInputFile(data, filename=filename), **kwargs)
+        MEDIA_UPLOAD_BYTES.labels(kind).inc(size)
+        sent = message.photo[-1].file_id if kind == "photo" else message.document.file_id
+        await self.remember(content_hash, kind, sent, size)
+        return message
+
+    async def lookup(self, content_hash: str, kind: str) -> Optional[str]:
+        key = (content_hash, kind)
+        file_id = self._memory.get(key)
+        if file_id is None:
+            async with get_session() as session:
+                result = await session.execute(
+                    select(MediaFile.file_id).where(MediaFile.content_hash == content_hash, MediaFile.kind == kind)
+                )
+                file_id = result.scalar()
+            if file_id is not None:
+                self._cache(key, file_id)
+        else:
+            self._memory.move_to_end(key)
+        CACHE_REQUESTS.labels("media", "miss" if file_id is None else "hit").inc()
+        return file_id
+
+    async def remember(self, content_hash: str, kind: str, file_id: str, size: int):
+        self._cache((content_hash, kind), file_id)
+        try:
+            async with get_session() as session:
+                await session.merge(MediaFile(content_hash=content_hash, kind=kind, file_id=file_id, size=size))
+        except IntegrityError:
+            # Another replica uploaded the same bytes at the same time; either file_id works
+            pass
+
+    async def forget(self, content_hash: str, kind: str):
+        self._memory.pop((content_hash, kind), None)
+        async with get_session() as session:
+            media = await session.get(MediaFile, (content_hash, kind))
+            if media:
+                await session.delete(media)
+
+    def _cache(self, key: Tuple[str, str], file_id: str):
+        self._memory[key] = file_id
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+# Global media registry instance
+media_registry = MediaRegistry()
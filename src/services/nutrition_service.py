@@ -11,6 +11,7 @@ from sqlalchemy.orm import selectinload
 
 from src.models.nutrition import Food, NutritionGoals, MealEntry
 from src.models.user import User
+from src.utils.metrics import CACHE_REQUESTS
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +68,9 @@ class NutritionService:
         cached_food = result.scalar_one_or_none()
 
         if cached_food:
+            CACHE_REQUESTS.labels("food", "hit").inc()
             return cached_food
+        CACHE_REQUESTS.labels("food", "miss").inc()
 
         # If not cached, fetch from API
         if not self.session:
@@ -1,66 +1,256 @@
 import asyncio
-import weakref
+import math
+import time
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Awaitable, Callable, Dict, Optional, Set
 import logging
 
+from src.bot.config import config
+from src.utils.timing_wheel import TimingWheel, WheelEntry
+from src.services.countdown import CountdownTicker
+from src.utils.metrics import CACHE_REQUESTS
+from src.services.timer_store import TimerStore, MemoryTimerStore
+
 logger = logging.getLogger(__name__)
 
+# Timer wheel resolution in seconds
+TICK_SECONDS = 0.25
+
+# Called with (bot, user_id, timer) when a timer finishes
+ExpiryHandler = Callable[[object, int, "Timer"], Awaitable[None]]
+
+# Expiry callbacks run per loop iteration before yielding to other updates
+EXPIRY_BATCH = 256
+
+# Settings of users without a running timer are dropped after this idle period
+SETTINGS_IDLE_SECONDS = 3600
+
 class Timer:
-    def __init__(self, duration_seconds: int):
+    def __init__(
+        self,
+        duration_seconds: int,
+        chat_id: Optional[int] = None,
+        message_id: Optional[int] = None,
+        live: bool = False
+    ):
         self.duration = duration_seconds
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.live = live  # message_id shows a live countdown
         self.start_time = None
-        self.task: Optional[asyncio.Task] = None
+        self.deadline: Optional[float] = None  # Unix timestamp, persisted
+        self.persisted = True  # False if saving to the timer store failed
+        self.entry: Optional[WheelEntry] = None
 
     def start(self):
         self.start_time = datetime.now()
+        self.deadline = time.time() + self.duration
 
     def remaining_seconds(self) -> int:
-        if not self.start_time:
+        if self.deadline is None:
             return self.duration
-        elapsed = (datetime.now() - self.start_time).total_seconds()
-        return max(0, self.duration - int(elapsed))
+        return max(0, math.ceil(self.deadline - time.time()))
 
-    def cancel(self):
-        """Cancel the timer and cleanup resources"""
-        if self.task and not self.task.done():
-            self.task.cancel()
-            self.task = None
+    def to_record(self, user_id: int) -> dict:
+        """Serialize for the timer store"""
+        return {
+            "user_id": user_id,
+            "chat_id": self.chat_id,
+            "message_id": self.message_id,
+            "deadline": self.deadline,
+            "duration": self.duration,
+            "live": self.live,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> "Timer":
+        """Rebuild a running timer from the timer store"""
+        timer = cls(
+            record["duration"],
+            chat_id=record["chat_id"],
+            message_id=record.get("message_id"),
+            live=bool(record.get("live"))
+        )
+        timer.deadline = record["deadline"]
+        timer.start_time = datetime.fromtimestamp(record["deadline"] - record["duration"])
+        return timer
 
 class TimerManager:
-    """Manages timers with automatic cleanup and memory management"""
+    """Drives all rest timers from a single hierarchical timing wheel"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        tick_seconds: float = TICK_SECONDS,
+        settings_idle_seconds: float = SETTINGS_IDLE_SECONDS,
+        live_default: bool = False
+    ):
         self.timers: Dict[int, Timer] = {}
         self.settings: Dict[int, dict] = {}
-        self._cleanup_task = None
+        self.tick_seconds = tick_seconds
+        self.settings_idle_seconds = settings_idle_seconds
+        self.live_default = live_default
+        self.wheel = TimingWheel()
+        self.store: TimerStore = MemoryTimerStore()
+        self.bot = None
+        self.on_expire: Optional[ExpiryHandler] = None
+        self.countdown = CountdownTicker(max_edits_per_second=config.TIMER_LIVE_MAX_EDITS_PER_SECOND)
+        self._settings_entries: Dict[int, WheelEntry] = {}
+        self._origin = time.monotonic()
+        self._wakeup = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._fire_tasks: Set[asyncio.Task] = set()  # Notifications in flight
+        self.lag = 0.0  # How late the last wheel tick ran, in seconds
+
+    def set_bot(self, bot):
+        """Set bot instance for expiry notifications and countdown edits"""
+        self.bot = bot
+        self.countdown.set_bot(bot)
+
+    def set_store(self, store: TimerStore):
+        """Set the persistence backend for timers and settings"""
+        self.store = store
+
+    def set_expiry_handler(self, handler: ExpiryHandler):
+        """Set the coroutine that notifies a user when their timer finishes"""
+        self.on_expire = handler
 
-    def start_cleanup_task(self):
-        """Start periodic cleanup of expired timers"""
-        if self._cleanup_task is None or self._cleanup_task.done():
-            self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
+    def _now_tick(self) -> int:
+        return int((time.monotonic() - self._origin) / self.tick_seconds)
 
-    async def _periodic_cleanup(self):
-        """Periodically clean up expired timers and settings"""
+    def _tick_for(self, delay_seconds: float) -> int:
+        """Tick at which something due after delay_seconds should fire"""
+        return math.ceil((time.monotonic() - self._origin + delay_seconds) / self.tick_seconds)
+
+    def start(self):
+        """Start the timer wheel loop and the countdown ticker"""
+        if self._loop_task is None or self._loop_task.done():
+            self._wakeup = asyncio.Event()
+            self.wheel.current = max(self.wheel.current, self._now_tick())
+            self._loop_task = asyncio.create_task(self._run())
+        self.countdown.start()
+
+    async def _run(self):
+        """Advance the wheel once per tick while there is anything scheduled"""
         while True:
             try:
-                await asyncio.sleep(300)  # Cleanup every 5 minutes
-                self.cleanup_expired()
+                if not len(self.wheel):
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+
+                next_tick = self.wheel.current
+                delay = self._origin + next_tick * self.tick_seconds - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.lag = max(0.0, time.monotonic() - self._origin - next_tick * self.tick_seconds)
+
+                expired = self.wheel.advance(self._now_tick())
+                for i, entry in enumerate(expired, 1):
+                    try:
+                        entry.callback(entry.payload)
+                    except Exception as e:
+                        logger.error(f"Error in timer callback: {e}")
+                    if i % EXPIRY_BATCH == 0:
+                        await asyncio.sleep(0)
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in timer cleanup: {e}")
+                logger.error(f"Error in timer loop: {e}")
 
-    def cleanup_expired(self):
-        """Remove expired timers and old settings"""
-        expired_users = []
-        for user_id, timer in self.timers.items():
-            if timer.task and timer.task.done():
-                expired_users.append(user_id)
+    def _schedule(self, delay_seconds: float, callback: Callable, payload=None) -> WheelEntry:
+        if not len(self.wheel):
+            # The loop skips ticks while idle, catch the wheel up first
+            self.wheel.current = max(self.wheel.current, self._now_tick())
+        entry = self.wheel.schedule(self._tick_for(delay_seconds), callback, payload)
+        self._wakeup.set()
+        return entry
 
-        for user_id in expired_users:
-            self.remove_timer(user_id)
-            logger.debug(f"Cleaned up expired timer for user {user_id}")
+    async def start_timer(
+        self,
+        user_id: int,
+        duration_seconds: int,
+        chat_id: int,
+        message_id: Optional[int] = None,
+        live: bool = False
+    ) -> Timer:
+        """Start and persist a rest timer for a user, replacing any running one"""
+        timer = Timer(duration_seconds, chat_id=chat_id, message_id=message_id, live=live)
+        timer.start()
+        # Persist before arming, so a short timer cannot fire before its record exists
+        try:
+            await self.store.save_timer(timer.to_record(user_id))
+        except Exception as e:
+            logger.error(f"Failed to persist timer for user {user_id}: {e}")
+            timer.persisted = False
+        self._arm(user_id, timer)
+        return timer
+
+    def _arm(self, user_id: int, timer: Timer):
+        """Put a timer on the wheel"""
+        self.add_timer(user_id, timer)
+        timer.entry = self._schedule(timer.deadline - time.time(), self._expire, (user_id, timer))
+        if timer.live and timer.message_id:
+            self.countdown.track(user_id, timer)
+
+    async def restore(self) -> int:
+        """Re-arm persisted timers; ones that expired while we were down fire now"""
+        records = await self.store.load_timers()
+        for record in records:
+            self._arm(record["user_id"], Timer.from_record(record))
+        if records:
+            logger.info(f"Restored {len(records)} rest timers")
+        return len(records)
+
+    async def stop_timer(self, user_id: int) -> bool:
+        """Stop a user's timer, whichever replica armed it"""
+        had_local = user_id in self.timers
+        self.remove_timer(user_id)
+        try:
+            return await self.store.delete_timer(user_id) or had_local
+        except Exception as e:
+            logger.error(f"Failed to delete timer for user {user_id}: {e}")
+            return had_local
+
+    async def has_timer(self, user_id: int) -> bool:
+        """Check for a running timer, including ones armed by another replica"""
+        if user_id in self.timers:
+            return True
+        try:
+            return await self.store.get_timer(user_id) is not None
+        except Exception as e:
+            logger.error(f"Failed to load timer for user {user_id}: {e}")
+            return False
+
+    def _expire(self, payload):
+        """Wheel callback: drop the timer and run its notification"""
+        user_id, timer = payload
+        if self.timers.get(user_id) is timer:
+            del self.timers[user_id]
+            self.countdown.untrack(user_id)
+        timer.entry = None
+        # The loop only keeps weak references to tasks
+        task = asyncio.create_task(self._fire(user_id, timer))
+        self._fire_tasks.add(task)
+        task.add_done_callback(self._fire_tasks.discard)
+
+    async def _fire(self, user_id: int, timer: Timer):
+        """Claim the timer in the store and notify the user"""
+        try:
+            # No other replica knows about a timer that was never saved
+            claimed = not timer.persisted or await self.store.claim_timer(user_id, timer.deadline)
+        except Exception as e:
+            # Better a duplicate notification than a lost one
+            logger.error(f"Failed to claim timer for user {user_id}: {e}")
+            claimed = True
+        if not claimed:
+            # Stopped, replaced or already fired by another replica
+            return
+
+        try:
+            await self.reset_settings(user_id)
+            if self.on_expire:
+                await self.on_expire(self.bot, user_id, timer)
+        except Exception as e:
+            logger.error(f"Timer notification error: {e}")
 
     def add_timer(self, user_id: int, timer: Timer) -> None:
         """Add a timer for a user"""
@@ -75,21 +265,72 @@ class TimerManager:
 
     def remove_timer(self, user_id: int) -> None:
         """Remove and cleanup timer for a user"""
-        if user_id in self.timers:
-            timer = self.timers[user_id]
-            timer.cancel()
-            del self.timers[user_id]
+        timer = self.timers.pop(user_id, None)
+        self.countdown.untrack(user_id)
+        if timer and timer.entry:
+            self.wheel.cancel(timer.entry)
+            timer.entry = None
 
     def get_settings(self, user_id: int) -> dict:
         """Get or create settings for a user"""
         if user_id not in self.settings:
-            self.settings[user_id] = {"hours": 0, "minutes": 0, "seconds": 0}
+            self.settings[user_id] = {"hours": 0, "minutes": 0, "seconds": 0, "live": self.live_default}
+        self._touch_settings(user_id)
         return self.settings[user_id]
 
+    async def load_settings(self, user_id: int) -> dict:
+        """Get settings for a user, loading them from the store if not cached"""
+        if user_id in self.settings:
+            CACHE_REQUESTS.labels("timer_settings", "hit").inc()
+        else:
+            CACHE_REQUESTS.labels("timer_settings", "miss").inc()
+            try:
+                stored = await self.store.load_settings(user_id)
+            except Exception as e:
+                logger.error(f"Failed to load timer settings for user {user_id}: {e}")
+                stored = None
+            if stored:
+                stored.setdefault("live", self.live_default)
+                self.settings[user_id] = stored
+        return self.get_settings(user_id)
+
+    async def save_settings(self, user_id: int) -> None:
+        """Persist the cached settings of a user"""
+        try:
+            await self.store.save_settings(user_id, self.get_settings(user_id))
+        except Exception as e:
+            logger.error(f"Failed to persist timer settings for user {user_id}: {e}")
+
+    async def reset_settings(self, user_id: int) -> None:
+        """Reset the duration of a user to zero, keeping their live countdown choice"""
+        live = self.settings.get(user_id, {}).get("live", self.live_default)
+        self.settings[user_id] = {"hours": 0, "minutes": 0, "seconds": 0, "live": live}
+        await self.save_settings(user_id)
+
+    def _touch_settings(self, user_id: int) -> None:
+        """Push back the idle expiry of a user's settings"""
+        entry = self._settings_entries.get(user_id)
+        if entry:
+            self.wheel.cancel(entry)
+        self._settings_entries[user_id] = self._schedule(
+            self.settings_idle_seconds, self._expire_settings, user_id
+        )
+
+    def _expire_settings(self, user_id: int):
+        """Wheel callback: drop settings of an idle user"""
+        self._settings_entries.pop(user_id, None)
+        if user_id in self.timers:
+            # Keep settings while a timer is running, check again later
+            self._touch_settings(user_id)
+            return
+        self.settings.pop(user_id, None)
+
     def clear_settings(self, user_id: int) -> None:
         """Clear settings for a user"""
-        if user_id in self.settings:
-            del self.settings[user_id]
+        self.settings.pop(user_id, None)
+        entry = self._settings_entries.pop(user_id, None)
+        if entry:
+            self.wheel.cancel(entry)
 
     def shutdown(self):
         """Cleanup all resources on shutdown"""
@@ -97,14 +338,20 @@ class TimerManager:
         for user_id in list(self.timers.keys()):
             self.remove_timer(user_id)
 
-        # Cancel cleanup task
-        if self._cleanup_task and not self._cleanup_task.done():
-            self._cleanup_task.cancel()
+        # Stop the wheel loop and countdown edits
+        if self._loop_task and not self._loop_task.done():
+            self._loop_task.cancel()
+        for task in self._fire_tasks:
+            task.cancel()
+        self._fire_tasks.clear()
+        self.countdown.stop()
 
         # Clear all data
         self.timers.clear()
         self.settings.clear()
+        self._settings_entries.clear()
+        self.wheel = TimingWheel()
         logger.info("Timer manager shutdown complete")
 
 # Create global timer manager instance
-timer_manager = TimerManager()
\ No newline at end of file
+timer_manager = TimerManager(live_default=config.TIMER_LIVE_DEFAULT)
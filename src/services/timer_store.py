@@ -0,0 +1,203 @@
+"""Pluggable persistence for rest timers and their settings"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from sqlalchemy import select, delete
+
+from src.bot.config import config
+from src.database.connection import get_session
+from src.models.timer import ActiveTimer, TimerSettings
+
+logger = logging.getLogger(__name__)
+
+TIMER_FIELDS = ("user_id", "chat_id", "message_id", "deadline", "duration", "live")
+
+class TimerStore(ABC):
+    """Interface for timer persistence.
+
+    Timer records are dicts with ``TIMER_FIELDS``; ``deadline`` is a unix
+    timestamp. ``claim_timer`` deletes a record only if its deadline still
+    matches, so exactly one replica fires a timer that several have armed.
+    """
+
+    @abstractmethod
+    async def save_timer(self, record: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def get_timer(self, user_id: int) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def delete_timer(self, user_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def claim_timer(self, user_id: int, deadline: float) -> bool:
+        ...
+
+    @abstractmethod
+    async def load_timers(self) -> List[dict]:
+        ...
+
+    @abstractmethod
+    async def save_settings(self, user_id: int, settings: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def load_settings(self, user_id: int) -> Optional[dict]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+class MemoryTimerStore(TimerStore):
+    """In-process store, used in tests and single-instance development"""
+
+    def __init__(self):
+        self.timers: Dict[int, dict] = {}
+        self.settings: Dict[int, dict] = {}
+
+    async def save_timer(self, record: dict) -> None:
+        self.timers[record["user_id"]] = dict(record)
+
+    async def get_timer(self, user_id: int) -> Optional[dict]:
+        record = self.timers.get(user_id)
+        return dict(record) if record else None
+
+    async def delete_timer(self, user_id: int) -> bool:
+        return self.timers.pop(user_id, None) is not None
+
+    async def claim_timer(self, user_id: int, deadline: float) -> bool:
+        record = self.timers.get(user_id)
+        if not record or record["deadline"] != deadline:
+            return False
+        del self.timers[user_id]
+        return True
+
+    async def load_timers(self) -> List[dict]:
+        return [dict(record) for record in self.timers.values()]
+
+    async def save_settings(self, user_id: int, settings: dict) -> None:
+        self.settings[user_id] = dict(settings)
+
+    async def load_settings(self, user_id: int) -> Optional[dict]:
+        settings = self.settings.get(user_id)
+        return dict(settings) if settings else None
+
+class SqlTimerStore(TimerStore):
+    """Store timers in the main database (SQLite by default)"""
+
+    @staticmethod
+    def _to_record(timer: ActiveTimer) -> dict:
+        return {field: getattr(timer, field) for field in TIMER_FIELDS}
+
+    async def save_timer(self, record: dict) -> None:
+        async with get_session() as session:
+            values = {field: record.get(field) for field in TIMER_FIELDS}
+            values["live"] = bool(values["live"])
+            await session.merge(ActiveTimer(**values))
+            await session.commit()
+
+    async def get_timer(self, user_id: int) -> Optional[dict]:
+        async with get_session() as session:
+            timer = await session.get(ActiveTimer, user_id)
+            return self._to_record(timer) if timer else None
+
+    async def delete_timer(self, user_id: int) -> bool:
+        async with get_session() as session:
+            result = await session.execute(delete(ActiveTimer).where(ActiveTimer.user_id == user_id))
+            await session.commit()
+            return result.rowcount > 0
+
+    async def claim_timer(self, user_id: int, deadline: float) -> bool:
+        async with get_session() as session:
+            result = await session.execute(
+                delete(ActiveTimer).where(ActiveTimer.user_id == user_id, ActiveTimer.deadline == deadline)
+            )
+            await session.commit()
+            return result.rowcount > 0
+
+    async def load_timers(self) -> List[dict]:
+        async with get_session() as session:
+            result = await session.execute(select(ActiveTimer))
+            return [self._to_record(timer) for timer in result.scalars().all()]
+
+    async def save_settings(self, user_id: int, settings: dict) -> None:
+        async with get_session() as session:
+            await session.merge(TimerSettings(
+                user_id=user_id,
+                hours=settings["hours"],
+                minutes=settings["minutes"],
+                seconds=settings["seconds"],
+                live=bool(settings.get("live"))
+            ))
+            await session.commit()
+
+    async def load_settings(self, user_id: int) -> Optional[dict]:
+        async with get_session() as session:
+            row = await session.get(TimerSettings, user_id)
+            if not row:
+                return None
+            return {"hours": row.hours, "minutes": row.minutes, "seconds": row.seconds, "live": row.live}
+
+class RedisTimerStore(TimerStore):
+    """Store timers in Redis so all replicas share them"""
+
+    TIMERS_KEY = "gymbot:timers"
+    SETTINGS_KEY = "gymbot:timer_settings"
+
+    # Delete the timer only if its deadline is unchanged (atomic on the server)
+    CLAIM_SCRIPT = """
+    local raw = redis.call('HGET', KEYS[1], ARGV[1])
+    if not raw then return 0 end
+    if cjson.decode(raw)['deadline'] ~= tonumber(ARGV[2]) then return 0 end
+    return redis.call('HDEL', KEYS[1], ARGV[1])
+    """
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("TIMER_STORE=redis requires the 'redis' package") from e
+
+        self.redis = aioredis.from_url(url, decode_responses=True)
+        self._claim = self.redis.register_script(self.CLAIM_SCRIPT)
+
+    async def save_timer(self, record: dict) -> None:
+        data = {field: record.get(field) for field in TIMER_FIELDS}
+        await self.redis.hset(self.TIMERS_KEY, str(record["user_id"]), json.dumps(data))
+
+    async def get_timer(self, user_id: int) -> Optional[dict]:
+        raw = await self.redis.hget(self.TIMERS_KEY, str(user_id))
+        return json.loads(raw) if raw else None
+
+    async def delete_timer(self, user_id: int) -> bool:
+        return bool(await self.redis.hdel(self.TIMERS_KEY, str(user_id)))
+
+    async def claim_timer(self, user_id: int, deadline: float) -> bool:
+        return bool(await self._claim(keys=[self.TIMERS_KEY], args=[str(user_id), repr(deadline)]))
+
+    async def load_timers(self) -> List[dict]:
+        raw = await self.redis.hgetall(self.TIMERS_KEY)
+        return [json.loads(value) for value in raw.values()]
+
+    async def save_settings(self, user_id: int, settings: dict) -> None:
+        await self.redis.hset(self.SETTINGS_KEY, str(user_id), json.dumps(settings))
+
+    async def load_settings(self, user_id: int) -> Optional[dict]:
+        raw = await self.redis.hget(self.SETTINGS_KEY, str(user_id))
+        return json.loads(raw) if raw else None
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+def create_timer_store() -> TimerStore:
+    """Create the timer store selected by TIMER_STORE"""
+    if config.TIMER_STORE == "redis":
+        return RedisTimerStore(config.REDIS_URL)
+    if config.TIMER_STORE == "memory":
+        return MemoryTimerStore()
+    return SqlTimerStore()
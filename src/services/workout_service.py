@@ -358,6 +358,8 @@ class WorkoutService:
         exercise_id: int
     ) -> float:
         """Calculate estimated one-rep max using Brzycki formula"""
+        from src.utils import analytics_kernels as kernels
+
         stats = await self.get_exercise_stats(user_id, exercise_id)
 
         if stats["max_weight"] == 0:
@@ -381,8 +383,8 @@ class WorkoutService:
             result = await session.execute(stmt)
             max_set = result.scalar_one_or_none()
 
-            if not max_set or max_set.reps >= 37:
+            if not max_set or not 0 < max_set.reps < 37:
                 return stats["max_weight"]
 
-            one_rm = max_set.weight * (36 / (37 - max_set.reps))
-            return round(one_rm, 2)
\ No newline at end of file
+            one_rm = kernels.estimate_1rm(max_set.weight, max_set.reps, "brzycki")
+            return round(float(one_rm), 2)
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""Vectorized NumPy kernels shared by analytics and chart drawing.
+
+All functions take and return arrays; no Python loop runs per set.
+Dates are datetime64 arrays, keys may be any sortable dtype.
+"""
+
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+
+# weight, reps -> estimated one-rep max
+FORMULAS: Dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "brzycki": lambda w, r: w * 36 / (37 - r),
+    "epley": lambda w, r: w * (1 + r / 30),
+    "lander": lambda w, r: 100 * w / (101.3 - 2.67123 * r),
+    "lombardi": lambda w, r: w * r ** 0.10,
+    "mayhew": lambda w, r: 100 * w / (52.2 + 41.9 * np.exp(-0.055 * r)),
+    "oconner": lambda w, r: w * (1 + r / 40),
+    "wathan": lambda w, r: 100 * w / (48.8 + 53.8 * np.exp(-0.075 * r)),
+}
+
+# Reps beyond which a formula stops being meaningful (Brzycki and Lander divide by zero)
+MAX_REPS = {"brzycki": 36, "lander": 37}
+
+def estimate_1rm(weight: np.ndarray, reps: np.ndarray, formula: str = "brzycki") -> np.ndarray:
+    """Estimated one-rep max per set; NaN where the formula does not apply"""
+    weight = np.asarray(weight, dtype=float)
+    reps = np.asarray(reps, dtype=float)
+    valid = (reps > 0) & (reps <= MAX_REPS.get(formula, np.inf))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(valid, FORMULAS[formula](weight, reps), np.nan)
+
+def estimate_1rm_all(weight: np.ndarray, reps: np.ndarray) -> Dict[str, np.ndarray]:
+    """Estimated one-rep max per set for every formula"""
+    return {name: estimate_1rm(weight, reps, name) for name in FORMULAS}
+
+def days(dates: np.ndarray) -> np.ndarray:
+    """Truncate datetimes to calendar days"""
+    return np.asarray(dates).astype("datetime64[D]")
+
+def weekdays(dates: np.ndarray) -> np.ndarray:
+    """Day of week, Monday = 0"""
+    # 1970-01-01 was a Thursday
+    return (days(dates).astype(np.int64) + 3) % 7
+
+def _iso_weeks(d: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # The ISO year of a week is the year its Thursday falls in
+    thursday = d - weekdays(d) + 3
+    year_start = thursday.astype("datetime64[Y]")
+    year = year_start.astype(np.int64) + 1970
+    week = (thursday - year_start.astype("datetime64[D]")).astype(np.int64) // 7 + 1
+    return year, week
+
+def iso_weeks(dates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ISO 8601 (year, week) of each date"""
+    d = days(dates)
+    if not len(d):
+        return _iso_weeks(d)
+    # Calendar arithmetic once per day in range, then a table lookup per date
+    first = d.min()
+    span = np.arange(first, d.max() + 1)
+    if len(span) > len(d):
+        return _iso_weeks(d)
+    year, week = _iso_weeks(span)
+    index = (d - first).astype(np.int64)
+    return year[index], week[index]
+
+def iso_week_keys(dates: np.ndarray) -> np.ndarray:
+    """Sortable week bucket per date, year * 100 + week"""
+    year, week = iso_weeks(dates)
+    return year * 100 + week
+
+def format_week_keys(keys: np.ndarray) -> list:
+    """Week bucket -> "YYYY-Www" """
+    return [f"{key // 100}-W{key % 100:02d}" for key in np.asarray(keys).tolist()]
+
+def _run_order(keys: np.ndarray) -> Optional[np.ndarray]:
+    """Stable sort order of keys, None when they are already sorted"""
+    if keys.dtype.kind in "iuM":
+        ints = keys.view(np.int64) if keys.dtype.kind == "M" else keys.astype(np.int64)
+        # Rows usually come ordered by date from the database
+        if (ints[1:] >= ints[:-1]).all():
+            return None
+        low = ints.min()
+        # Day and week keys span a small range: numpy radix-sorts 16-bit ints in O(n)
+        if ints.max() - low < 2 ** 16:
+            return np.argsort((ints - low).astype(np.uint16), kind="stable")
+    return np.argsort(keys, kind="stable")
+
+def _runs(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Keys and values sorted so each key is one contiguous run, and the run starts"""
+    order = _run_order(keys)
+    if order is not None:
+        keys, values = keys[order], values[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys, values, starts
+
+def group_sum(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum of values per distinct key, keys sorted; NaN counts as 0"""
+    keys = np.asarray(keys)
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+    if not len(keys):
+        return keys, np.array([])
+    keys, values, starts = _runs(keys, values)
+    return keys[starts], np.add.reduceat(values, starts)
+
+def group_stats(keys: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Count, sum, mean, population std, min and max of values per distinct key, keys sorted.
+
+    NaN values are left out of every statistic; keys with only NaN values
+    get a count of 0 and NaN for the rest.
+    """
+    keys = np.asarray(keys)
+    values = np.asarray(values, dtype=float)
+    if not len(keys):
+        empty = np.array([])
+        return {"keys": keys, "count": empty.astype(np.int64), "sum": empty, "mean": empty, "std": empty, "min": empty, "max": empty}
+
+    # One sort makes each key a contiguous run; every statistic is then a reduction over runs
+    keys, values, starts = _runs(keys, values)
+    run = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(keys)]))
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+
+    count = np.add.reduceat(present.astype(np.int64), starts)
+    total = np.add.reduceat(filled, starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        # Deviations from the run mean rather than a sum of squares, which cancels badly
+        deviation = np.where(present, values - mean[run], 0.0)
+        std = np.sqrt(np.add.reduceat(deviation ** 2, starts) / count)
+
+    return {
+        "keys": keys[starts],
+        "count": count,
+        "sum": total,
+        "mean": mean,
+        "std": std,
+        # fmax/fmin skip NaN
+        "min": np.fmin.reduceat(values, starts),
+        "max": np.fmax.reduceat(values, starts),
+    }
+
+def per_day(dates: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """group_stats bucketed by calendar day"""
+    return group_stats(days(dates), values)
+
+def week_day_grid(dates: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum of values per ISO week (rows, keys as in iso_week_keys) and weekday (columns, Monday first)"""
+    cells, sums = group_sum(iso_week_keys(dates) * 7 + weekdays(dates), values)
+    weeks, row = np.unique(cells // 7, return_inverse=True)
+    grid = np.zeros((len(weeks), 7))
+    grid[row, cells % 7] = sums
+    return weeks, grid
+
+def per_week(dates: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """group_stats bucketed by ISO week (keys as in iso_week_keys)"""
+    return group_stats(iso_week_keys(dates), values)
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` values; NaN until the window fills"""
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return out
+    # Centre before summing so long series keep their precision
+    offset = values.mean()
+    csum = np.cumsum(np.concatenate(([0.0], values - offset)))
+    out[window - 1:] = (csum[window:] - csum[:-window]) / window + offset
+    return out
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing population std over `window` values; NaN until the window fills"""
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return out
+    centred = values - values.mean()
+    csum = np.cumsum(np.concatenate(([0.0], centred)))
+    csq = np.cumsum(np.concatenate(([0.0], centred ** 2)))
+    mean = (csum[window:] - csum[:-window]) / window
+    out[window - 1:] = np.sqrt(np.maximum((csq[window:] - csq[:-window]) / window - mean ** 2, 0.0))
+    return out
+
+def lttb(x: np.ndarray, y: np.ndarray, budget: int) -> np.ndarray:
+    """Indices of at most `budget` points that keep the shape of (x, y), in order.
+
+    Largest-Triangle-Three-Buckets: the first and last points stay, every
+    bucket in between keeps the point spanning the largest triangle with
+    the previous pick and the next bucket's average. The loop runs per
+    bucket, not per point.
+    """
+    n = len(y)
+    if budget >= n or budget < 3:
+        return np.arange(n)
+    x = np.asarray(x).astype(np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.intp)
+    picked = np.empty(budget, dtype=np.intp)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(budget - 2):
+        lo, hi = edges[i], edges[i + 1]
+        after = slice(hi, edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[after].mean(), y[after].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+def downsample(x: np.ndarray, y: np.ndarray, budget: int) -> np.ndarray:
+    """At most `budget` lttb indices, including the minimum and maximum of y so records survive"""
+    if budget >= len(y) or budget < 5 or np.isnan(y).all():
+        return lttb(x, y, budget)
+    # Two slots are kept for the extremes
+    return np.union1d(lttb(x, y, budget - 2), [np.nanargmin(y), np.nanargmax(y)])
@@ -7,6 +7,7 @@ def build_timer_keyboard(user_id: int) -> InlineKeyboardMarkup:
     """Build timer configuration keyboard"""
     s = timer_manager.get_settings(user_id)
     text = f"⏱ {s['hours']}h {s['minutes']}m {s['seconds']}s"
+    live_key = "live_on" if s.get("live") else "live_off"
 
     return InlineKeyboardMarkup(inline_keyboard=[
         [
@@ -21,6 +22,7 @@ def build_timer_keyboard(user_id: int) -> InlineKeyboardMarkup:
         ],
         [InlineKeyboardButton(text=i18n.get_button("start", user_id), callback_data="start_timer")],
         [InlineKeyboardButton(text=i18n.get_button("stop", user_id), callback_data="stop_timer")],
+        [InlineKeyboardButton(text=i18n.get_button(live_key, user_id), callback_data="toggle_live")],
         [InlineKeyboardButton(text=text, callback_data="noop")],
     ])
 
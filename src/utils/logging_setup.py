@@ -0,0 +1,191 @@
+"""Non-blocking logging: records are queued on the event loop thread and written by a listener thread"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+class SizeTimedRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """Rotates when the file reaches ``max_bytes`` or every ``interval_seconds``, whichever comes first.
+
+    A file may end one record past ``max_bytes``. Rotated files get a
+    timestamp suffix and only the newest ``backup_count`` are kept.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 10 * 2 ** 20,
+        interval_seconds: float = 86400,
+        backup_count: int = 14,
+        encoding: str = "utf-8"
+    ):
+        directory = os.path.dirname(os.path.abspath(filename))
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(filename, "a", encoding=encoding)
+        self.max_bytes = max_bytes
+        self.interval_seconds = interval_seconds
+        self.backup_count = backup_count
+        self.rollover_at = time.time() + interval_seconds
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if time.time() >= self.rollover_at:
+            return True
+        # Checked against what is already written, so records are formatted once
+        return self.max_bytes > 0 and self.stream is not None and self.stream.tell() >= self.max_bytes
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        destination = f"{self.baseFilename}.{datetime.now():%Y%m%d-%H%M%S}"
+        suffix = 1
+        while os.path.exists(destination):
+            destination = f"{self.baseFilename}.{datetime.now():%Y%m%d-%H%M%S}.{suffix}"
+            suffix += 1
+        if os.path.exists(self.baseFilename):
+            self.rotate(self.baseFilename, destination)
+        self._purge()
+
+        self.stream = self._open()
+        self.rollover_at = time.time() + self.interval_seconds
+
+    def _purge(self):
+        directory, base = os.path.split(self.baseFilename)
+        rotated = sorted(
+            (name for name in os.listdir(directory) if name.startswith(base + ".")),
+            key=lambda name: os.path.getmtime(os.path.join(directory, name))
+        )
+        for name in rotated[:max(0, len(rotated) - self.backup_count)]:
+            os.remove(os.path.join(directory, name))
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Already formatted by DroppingQueueHandler.prepare
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of below-WARNING records of chatty loggers.
+
+    ``rates`` maps logger name prefixes to the fraction kept (0..1); the
+    longest matching prefix wins. Sampling is deterministic: a rate of 0.1
+    keeps every 10th record of that logger.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(sorted(rates.items(), key=lambda item: len(item[0]), reverse=True))
+        self._counters: Dict[str, int] = {}
+
+    def _rate(self, name: str) -> float:
+        for prefix, rate in self.rates.items():
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        count = self._counters.get(record.name, 0)
+        self._counters[record.name] = count + 1
+        return count % round(1 / rate) == 0
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """Parse "logger=rate,logger=rate" """
+    rates = {}
+    for item in spec.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: records are dropped if the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve what may change or not pickle later; the listener does the formatting
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogListener(logging.handlers.QueueListener):
+    """Queue listener whose stop waits for room in a full queue instead of failing"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+def setup_logging(
+    level: int = logging.INFO,
+    log_file: Optional[str] = "logs/bot.log",
+    json_format: bool = False,
+    max_bytes: int = 10 * 2 ** 20,
+    rotate_hours: float = 24,
+    backup_count: int = 14,
+    sampling: Optional[Dict[str, float]] = None,
+    queue_size: int = 10000
+) -> LogListener:
+    """Route all logging through a queue to console and rotating file handlers on a listener thread"""
+    formatter = JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(SizeTimedRotatingFileHandler(
+            log_file,
+            max_bytes=max_bytes,
+            interval_seconds=rotate_hours * 3600,
+            backup_count=backup_count
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    if sampling:
+        queue_handler.addFilter(SamplingFilter(sampling))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = LogListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
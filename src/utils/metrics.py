@@ -0,0 +1,175 @@
+"""Prometheus metrics shared across the bot"""
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Time an update waited for a processing slot, by admission queue
+ADMISSION_WAIT_SECONDS = Histogram(
+    "gymbot_admission_wait_seconds",
+    "Time updates wait for a processing slot",
+    ["queue"],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+
+# Updates waiting for a slot, by admission queue
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "gymbot_admission_queue_depth",
+    "Updates waiting for a processing slot",
+    ["queue"]
+)
+
+# Updates currently being handled
+UPDATES_IN_FLIGHT = Gauge(
+    "gymbot_updates_in_flight",
+    "Updates currently being handled"
+)
+
+# Updates turned away because the heavy queue was full
+ADMISSION_REJECTED = Counter(
+    "gymbot_admission_rejected_total",
+    "Heavy updates rejected because the queue was full"
+)
+
+# Updates dropped by the rate limiter, by update kind
+THROTTLED_UPDATES = Counter(
+    "gymbot_throttled_updates_total",
+    "Updates dropped by the per-user rate limiter",
+    ["kind"]
+)
+
+# Handled updates, by update type
+UPDATES_TOTAL = Counter(
+    "gymbot_updates_total",
+    "Updates handled",
+    ["type"]
+)
+
+# Handler time from admission to completion, by update type
+UPDATE_DURATION_SECONDS = Histogram(
+    "gymbot_update_duration_seconds",
+    "Time spent handling an update",
+    ["type"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+# Cache lookups, by cache and hit/miss
+CACHE_REQUESTS = Counter(
+    "gymbot_cache_requests_total",
+    "Cache lookups",
+    ["cache", "result"]
+)
+
+# Database connections checked out of the pool
+DB_CONNECTIONS_IN_USE = Gauge(
+    "gymbot_db_connections_in_use",
+    "Database connections currently checked out"
+)
+
+# Event loop lag measured by the monitoring task
+EVENT_LOOP_LAG_SECONDS = Gauge(
+    "gymbot_event_loop_lag_seconds",
+    "How late the event loop woke up the lag probe"
+)
+
+# Per-handler metrics, labelled by /command, cb:<callback prefix> or update type
+HANDLER_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HANDLER_DURATION_SECONDS = Histogram(
+    "gymbot_handler_duration_seconds",
+    "End-to-end time to handle an update, including admission wait",
+    ["handler"],
+    buckets=HANDLER_BUCKETS
+)
+
+HANDLER_DB_SECONDS = Histogram(
+    "gymbot_handler_db_seconds",
+    "Database statement time per handled update",
+    ["handler"],
+    buckets=HANDLER_BUCKETS
+)
+
+HANDLER_API_SECONDS = Histogram(
+    "gymbot_handler_api_seconds",
+    "Telegram API call time per handled update",
+    ["handler"],
+    buckets=HANDLER_BUCKETS
+)
+
+HANDLER_ERRORS = Counter(
+    "gymbot_handler_errors_total",
+    "Handler exceptions",
+    ["handler", "exception"]
+)
+
+# Outgoing Telegram API calls, by method
+API_REQUEST_DURATION_SECONDS = Histogram(
+    "gymbot_api_request_duration_seconds",
+    "Telegram Bot API request time",
+    ["method"],
+    buckets=HANDLER_BUCKETS
+)
+
+# Every probe of the loop lag monitor, for percentiles
+EVENT_LOOP_LAG_OBSERVED = Histogram(
+    "gymbot_event_loop_lag_observed_seconds",
+    "Distribution of event loop lag",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+# Loop stalls caught by the watchdog, by innermost project frame
+EVENT_LOOP_BLOCKS = Counter(
+    "gymbot_event_loop_blocks_total",
+    "Event loop stalls over the block threshold",
+    ["offender"]
+)
+
+# Chart rendering in worker processes
+CHART_RENDER_SECONDS = Histogram(
+    "gymbot_chart_render_seconds",
+    "Time a worker process took to render a chart",
+    ["chart"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+CHART_RENDER_QUEUE_DEPTH = Gauge(
+    "gymbot_chart_render_queue_depth",
+    "Charts waiting for or being rendered"
+)
+
+CHART_RENDER_FAILURES = Counter(
+    "gymbot_chart_render_failures_total",
+    "Charts not rendered, by reason (rejected, timeout, crash)",
+    ["reason"]
+)
+
+# Bytes of generated files uploaded to Telegram (repeat sends reuse file_ids)
+MEDIA_UPLOAD_BYTES = Counter(
+    "gymbot_media_upload_bytes_total",
+    "Bytes of generated photos and documents uploaded to Telegram",
+    ["kind"]
+)
+
+# Startup phases (src.bot.startup)
+STARTUP_PHASE_SECONDS = Gauge(
+    "gymbot_startup_phase_seconds",
+    "Time the last startup spent in each phase",
+    ["phase"]
+)
+
+# Export jobs built by background workers
+EXPORT_JOB_SECONDS = Histogram(
+    "gymbot_export_job_seconds",
+    "Time from picking up an export job to sending the file",
+    ["format"],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+
+EXPORT_JOBS = Counter(
+    "gymbot_export_jobs_total",
+    "Export requests by outcome (queued, cached, rejected, completed, failed)",
+    ["format", "outcome"]
+)
+
+EXPORT_QUEUE_DEPTH = Gauge(
+    "gymbot_export_queue_depth",
+    "Export jobs waiting for a worker"
+)
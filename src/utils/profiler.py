@@ -0,0 +1,261 @@
+"""Low-overhead sampling profiler for the running event loop"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def frame_label(code) -> str:
+    """function (path:line) with paths shortened to the project or site-packages"""
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+def collapse_stack(frame, labels: Dict[object, str]) -> Tuple[str, ...]:
+    """Root-first tuple of frame labels, caching labels per code object"""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        label = labels.get(code)
+        if label is None:
+            label = labels[code] = frame_label(code)
+        stack.append(label)
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+def format_collapsed(stacks: Dict[Tuple[str, ...], int]) -> str:
+    """One "frame;frame;frame count" line per stack, most samples first"""
+    return "\n".join(
+        f"{';'.join(stack)} {count}"
+        for stack, count in sorted(stacks.items(), key=lambda item: item[1], reverse=True)
+    )
+
+class SamplingProfiler:
+    """Samples the stack of one thread from a background thread.
+
+    Every ``interval`` seconds the target thread's current frame is read via
+    ``sys._current_frames`` and counted as a root-first collapsed stack, the
+    format flame graph tools read. The target thread is never interrupted, so
+    it is safe to run against production traffic for a bounded time.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Dict[Tuple[str, ...], int] = {}
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[object, str] = {}
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.monotonic() - self.started_at
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                key = collapse_stack(frame, self._labels)
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+                self.samples += 1
+
+    def top_functions(self, limit: int = 30) -> List[Tuple[str, int, int]]:
+        """(function, self samples, total samples), most total time first"""
+        own: Dict[str, int] = {}
+        total: Dict[str, int] = {}
+        for stack, count in self.stacks.items():
+            own[stack[-1]] = own.get(stack[-1], 0) + count
+            for label in set(stack):
+                total[label] = total.get(label, 0) + count
+        ranked = sorted(total.items(), key=lambda item: item[1], reverse=True)
+        return [(label, own.get(label, 0), count) for label, count in ranked[:limit]]
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one "frame;frame;frame count" line each"""
+        return format_collapsed(self.stacks)
+
+    def report(self) -> str:
+        """Human-readable summary followed by the collapsed stacks"""
+        lines = [
+            f"Sampling profile: {self.samples} samples over {self.duration:.1f}s "
+            f"(every {self.interval * 1000:.0f} ms)",
+            "Samples in the selector are idle time.",
+            "",
+            f"{'total%':>7} {'self%':>7}  function",
+        ]
+        for label, own, count in self.top_functions():
+            lines.append(f"{100 * count / max(self.samples, 1):>6.1f}% {100 * own / max(self.samples, 1):>6.1f}%  {label}")
+        lines += ["", "# Collapsed stacks (flamegraph.pl / speedscope)", self.collapsed()]
+        return "\n".join(lines)
+
+async def profile_event_loop(seconds: float, interval: float = 0.005) -> SamplingProfiler:
+    """Sample the thread running the current event loop for a number of seconds"""
+    profiler = SamplingProfiler(interval=interval)
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    return profiler
+
+class ProfileTrigger:
+    """Which updates to profile and for how long"""
+
+    def __init__(
+        self,
+        route: Optional[str] = None,
+        user_id: Optional[int] = None,
+        seconds: float = 600,
+        max_captures: int = 20
+    ):
+        self.route = route
+        self.user_id = user_id
+        self.until = time.monotonic() + seconds
+        self.max_captures = max_captures
+        self.captured = 0
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.until or self.captured >= self.max_captures
+
+    def matches(self, route: str, user_id: Optional[int]) -> bool:
+        return (self.route is None or self.route == route) and (self.user_id is None or self.user_id == user_id)
+
+    def describe(self) -> str:
+        remaining = max(0, self.until - time.monotonic())
+        return (
+            f"route={self.route or 'any'} user={self.user_id or 'any'} "
+            f"captured={self.captured}/{self.max_captures} remaining={remaining:.0f}s"
+        )
+
+class UpdateProfiler:
+    """Samples the event loop thread only while selected updates are running.
+
+    While armed, each matching update registers its asyncio task; a helper
+    thread samples the loop thread's stack and counts it for that update
+    only when the loop is running that task, so concurrent handlers do not
+    pollute each other's profiles. Every capture is written as a collapsed
+    stack file under ``output_dir``. Disarmed, the cost is one attribute check.
+    """
+
+    def __init__(self, output_dir: str = "logs/profiles", interval: float = 0.002):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.trigger: Optional[ProfileTrigger] = None
+        self.captures: List[Tuple[str, int, float]] = []  # (path, samples, seconds)
+        self._targets: Dict[object, Dict[Tuple[str, ...], int]] = {}
+        self._labels: Dict[object, str] = {}
+        self._loop = None
+        self._thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def armed(self) -> bool:
+        return self.trigger is not None
+
+    def arm(
+        self,
+        route: Optional[str] = None,
+        user_id: Optional[int] = None,
+        seconds: float = 600,
+        max_captures: int = 20
+    ) -> ProfileTrigger:
+        self.trigger = ProfileTrigger(route, user_id, seconds, max_captures)
+        return self.trigger
+
+    def disarm(self):
+        self.trigger = None
+
+    def matches(self, route: str, user_id: Optional[int]) -> bool:
+        """Check an update against the trigger, counting it as a capture if it matches"""
+        trigger = self.trigger
+        if trigger is None:
+            return False
+        if trigger.expired:
+            self.trigger = None
+            return False
+        if not trigger.matches(route, user_id):
+            return False
+        trigger.captured += 1
+        return True
+
+    @asynccontextmanager
+    async def capture(self, name: str):
+        """Profile the current task for the duration of the block"""
+        task = asyncio.current_task()
+        stacks: Dict[Tuple[str, ...], int] = {}
+        self._targets[task] = stacks
+        self._ensure_sampler()
+        started = time.monotonic()
+        try:
+            yield stacks
+        finally:
+            del self._targets[task]
+            if not self._targets:
+                self._stop.set()
+            await self._write(name, stacks, time.monotonic() - started)
+
+    def _ensure_sampler(self):
+        if self._thread and self._thread.is_alive() and not self._stop.is_set():
+            return
+        if self._thread:
+            self._thread.join()
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), name="update-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self, stop: threading.Event):
+        loop = self._loop
+        while not stop.wait(self.interval):
+            stacks = self._targets.get(asyncio.current_task(loop))
+            if stacks is None:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                key = collapse_stack(frame, self._labels)
+                stacks[key] = stacks.get(key, 0) + 1
+
+    async def _write(self, name: str, stacks: Dict[Tuple[str, ...], int], seconds: float):
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+        path = os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_name}.collapsed")
+        try:
+            await asyncio.to_thread(self._write_file, path, format_collapsed(stacks))
+        except OSError as e:
+            logger.error(f"Failed to write profile {path}: {e}")
+            return
+        samples = sum(stacks.values())
+        self.captures.append((path, samples, seconds))
+        del self.captures[:-50]
+        logger.info(f"Profile written to {path} ({samples} samples, {seconds:.2f}s)")
+
+    def _write_file(self, path: str, collapsed: str):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(collapsed + "\n")
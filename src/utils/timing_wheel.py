@@ -0,0 +1,117 @@
+"""Hierarchical timing wheel for scheduling large numbers of timers"""
+
+from typing import Any, Callable, List, Optional, Set
+
+class WheelEntry:
+    """A scheduled entry; keep the handle to cancel it"""
+
+    __slots__ = ("deadline", "callback", "payload", "_slot")
+
+    def __init__(self, deadline: int, callback: Callable, payload: Any = None):
+        self.deadline = deadline
+        self.callback = callback
+        self.payload = payload
+        self._slot: Optional[Set["WheelEntry"]] = None
+
+    @property
+    def active(self) -> bool:
+        return self._slot is not None
+
+class TimingWheel:
+    """Hierarchical timing wheel working in integer ticks.
+
+    Level 0 has one slot per tick, each higher level has slots that are
+    ``slots`` times wider. Entries are placed in the lowest level that can hold
+    them and cascade down when the lower wheel wraps around, so schedule,
+    cancel and per-entry expiry are O(1) (amortized over at most ``levels``
+    cascades per entry). Entries further out than the wheel span are parked in
+    the top level and re-placed until they are in range.
+    """
+
+    def __init__(self, slots_bits: int = 6, levels: int = 4):
+        self.bits = slots_bits
+        self.slots = 1 << slots_bits
+        self.mask = self.slots - 1
+        self.levels = levels
+        self.span = 1 << (slots_bits * levels)
+        self.wheels: List[List[Set[WheelEntry]]] = [
+            [set() for _ in range(self.slots)] for _ in range(levels)
+        ]
+        self.current = 0  # Next tick to be processed
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def schedule(self, deadline: int, callback: Callable, payload: Any = None) -> WheelEntry:
+        """Schedule callback to expire at the given absolute tick"""
+        entry = WheelEntry(deadline, callback, payload)
+        self._place(entry)
+        self._size += 1
+        return entry
+
+    def cancel(self, entry: WheelEntry) -> bool:
+        """Cancel a scheduled entry"""
+        if entry._slot is None:
+            return False
+        entry._slot.discard(entry)
+        entry._slot = None
+        self._size -= 1
+        return True
+
+    def _place(self, entry: WheelEntry):
+        """Put an entry into the slot matching its distance from the current tick"""
+        deadline = max(entry.deadline, self.current)
+        delta = deadline - self.current
+        if delta >= self.span:
+            deadline = self.current + self.span - 1
+            delta = self.span - 1
+
+        level = 0
+        while delta >= (1 << (self.bits * (level + 1))):
+            level += 1
+
+        slot = self.wheels[level][(deadline >> (self.bits * level)) & self.mask]
+        slot.add(entry)
+        entry._slot = slot
+
+    def _cascade(self, level: int):
+        """Move entries of the current higher-level slot down into lower levels"""
+        index = (self.current >> (self.bits * level)) & self.mask
+        slot = self.wheels[level][index]
+        if not slot:
+            return
+        self.wheels[level][index] = set()
+        for entry in slot:
+            self._place(entry)
+
+    def advance(self, now: int) -> List[WheelEntry]:
+        """Process all ticks up to and including ``now`` and return expired entries"""
+        expired: List[WheelEntry] = []
+        while self.current <= now:
+            if self._size == 0:
+                self.current = now + 1
+                break
+
+            if (self.current & self.mask) == 0:
+                level = 1
+                while level < self.levels:
+                    self._cascade(level)
+                    if (self.current >> (self.bits * level)) & self.mask:
+                        break
+                    level += 1
+
+            index = self.current & self.mask
+            slot = self.wheels[0][index]
+            if slot:
+                self.wheels[0][index] = set()
+                for entry in slot:
+                    if entry.deadline > self.current:
+                        # Parked beyond the wheel span, not due yet
+                        self._place(entry)
+                        continue
+                    entry._slot = None
+                    self._size -= 1
+                    expired.append(entry)
+            self.current += 1
+        return expired
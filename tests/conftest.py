@@ -1,6 +1,7 @@
 """Pytest configuration and fixtures"""
 
 import pytest
+import pytest_asyncio
 import asyncio
 from typing import AsyncGenerator
 from datetime import datetime
@@ -34,6 +35,19 @@ async def test_db():
 
     await engine.dispose()
 
+@pytest_asyncio.fixture
+async def app_db(tmp_path, monkeypatch):
+    """Point the global database connection at a temporary SQLite file"""
+    from src.database import connection
+
+    monkeypatch.setattr(connection.config, "DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(connection.config, "IS_DEVELOPMENT", False)
+    await connection.init_db()
+    yield connection
+    await connection.close_db()
+    connection.engine = None
+    connection.SessionLocal = None
+
 @pytest.fixture
 async def test_user(test_db: AsyncSession) -> User:
     """Create a test user"""
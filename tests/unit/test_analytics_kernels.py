@@ -0,0 +1,120 @@
+"""Unit tests for the vectorized analytics kernels"""
+
+import numpy as np
+import pytest
+from datetime import date, datetime, timedelta
+
+from src.models import User, Exercise, Workout, WorkoutExercise, WorkoutSet
+from src.services.analytics_service import WorkoutAnalytics
+from src.utils import analytics_kernels as kernels
+
+class TestKernels:
+    """Kernels agree with the per-row Python they replace"""
+
+    def test_iso_weeks_match_isocalendar(self):
+        dates = np.arange("2019-12-20", "2027-01-10", dtype="datetime64[D]")
+        year, week = kernels.iso_weeks(dates)
+        expected = [d.isocalendar()[:2] for d in dates.astype(object)]
+        assert list(zip(year.tolist(), week.tolist())) == expected
+        assert kernels.weekdays(dates).tolist() == [d.weekday() for d in dates.astype(object)]
+
+        # Sparse dates skip the lookup table
+        sparse = np.array(["2020-12-31", "2021-01-03", "2026-12-28"], dtype="datetime64[us]")
+        assert kernels.format_week_keys(kernels.iso_week_keys(sparse)) == ["2020-W53", "2020-W53", "2026-W53"]
+
+    def test_group_stats_skip_nan(self):
+        keys = np.array([3, 1, 3, 1, 2, 2])
+        values = np.array([1.0, 4.0, 3.0, np.nan, np.nan, np.nan])
+        stats = kernels.group_stats(keys, values)
+
+        assert stats["keys"].tolist() == [1, 2, 3]
+        assert stats["count"].tolist() == [1, 0, 2]
+        assert stats["sum"].tolist() == [4.0, 0.0, 4.0]
+        assert stats["mean"][2] == 2.0 and stats["std"][2] == 1.0
+        assert stats["max"][0] == 4.0 and np.isnan(stats["max"][1])
+        assert kernels.group_stats(np.array([]), np.array([]))["keys"].size == 0
+
+    def test_group_stats_of_strings_and_datetimes(self):
+        groups = kernels.group_stats(np.array(["Legs", "Chest", "Legs"], dtype=object), np.array([1.0, 2.0, 3.0]))
+        assert list(groups["keys"]) == ["Chest", "Legs"] and groups["sum"].tolist() == [2.0, 4.0]
+
+        dates = np.array(["2024-01-02T18:00", "2024-01-01T08:00", "2024-01-02T07:00"], dtype="datetime64[us]")
+        daily = kernels.per_day(dates, np.array([1.0, 2.0, 3.0]))
+        assert daily["keys"].tolist() == [date(2024, 1, 1), date(2024, 1, 2)]
+        assert daily["sum"].tolist() == [2.0, 4.0]
+
+    def test_estimate_1rm(self):
+        one_rm = kernels.estimate_1rm([100, 100, 100], [1, 10, 40])
+        assert one_rm[0] == pytest.approx(100)
+        assert one_rm[1] == pytest.approx(100 * 36 / 27)
+        assert np.isnan(one_rm[2])
+
+        all_formulas = kernels.estimate_1rm_all(np.array([100.0]), np.array([5.0]))
+        assert set(all_formulas) == set(kernels.FORMULAS)
+        assert all(105 < value[0] < 125 for value in all_formulas.values())
+
+    def test_rolling_stats(self):
+        values = np.array([1.0, 2.0, 3.0, 4.0, 10.0])
+        assert np.isnan(kernels.rolling_mean(values, 3)[:2]).all()
+        assert kernels.rolling_mean(values, 3)[2:].tolist() == pytest.approx([2.0, 3.0, 17 / 3])
+        assert kernels.rolling_std(values, 2)[1:].tolist() == pytest.approx([0.5, 0.5, 0.5, 3.0])
+        assert np.isnan(kernels.rolling_mean(values, 10)).all()
+
+class TestDownsample:
+    """LTTB keeps the shape and the records of long series"""
+
+    def test_budget_endpoints_and_peaks(self):
+        dates = np.arange("2015-01-01", "2025-01-01", dtype="datetime64[D]")
+        values = np.sin(np.arange(len(dates)) / 200) * 20 + 100
+        values[1234] = 250
+        values[2345] = 1
+
+        keep = kernels.downsample(dates, values, 100)
+        assert len(keep) <= 100
+        assert keep[0] == 0 and keep[-1] == len(dates) - 1
+        assert {1234, 2345} <= set(keep.tolist())
+        assert (np.diff(keep) > 0).all()
+
+    def test_extremes_fit_in_budget(self):
+        values = np.zeros(3000)
+        # The maximum shares its bucket with a deeper dip, so lttb alone drops it
+        values[1001], values[1003] = 10, -40
+        values[2000], values[2002] = -50, 5
+        assert 1001 not in kernels.lttb(np.arange(3000), values, 50)
+
+        keep = kernels.downsample(np.arange(3000), values, 50)
+        assert len(keep) <= 50
+        assert {1001, 2000} <= set(keep.tolist())
+
+    def test_short_series_are_untouched(self):
+        assert kernels.downsample(np.arange(10), np.arange(10.0), 100).tolist() == list(range(10))
+        assert kernels.lttb(np.arange(10), np.arange(10.0), 4).tolist() == [0, 1, 5, 9]
+
+@pytest.mark.asyncio
+class TestVolumeProgression:
+    """Weekly volume comes from one columnar query"""
+
+    async def test_weekly_volumes(self, app_db):
+        async with app_db.get_session() as session:
+            user = User(telegram_id=1, created_at=datetime.now(), last_active=datetime.now())
+            exercise = Exercise(name="Squat", category="legs", muscle_group="Quadriceps")
+            session.add_all([user, exercise])
+            await session.flush()
+
+            monday = datetime.combine(date.today() - timedelta(days=date.today().weekday() + 14), datetime.min.time())
+            for offset, weight in ((0, 100), (2, 110), (7, 120)):
+                workout = Workout(user_id=user.id, date=monday + timedelta(days=offset))
+                workout_exercise = WorkoutExercise(exercise_id=exercise.id, order=0)
+                workout_exercise.sets = [WorkoutSet(set_number=n, reps=5, weight=weight) for n in range(2)]
+                workout.workout_exercises = [workout_exercise]
+                session.add(workout)
+            await session.flush()
+            user_id = user.id
+
+        result = await WorkoutAnalytics().calculate_volume_progression(user_id)
+        first, second = (monday + timedelta(days=d) for d in (0, 7))
+        assert result["weekly_volumes"] == {
+            f"{first.isocalendar()[0]}-W{first.isocalendar()[1]:02d}": 2100.0,
+            f"{second.isocalendar()[0]}-W{second.isocalendar()[1]:02d}": 1200.0,
+        }
+        assert result["trend"] < 0
@@ -0,0 +1,158 @@
+"""Unit tests for BroadcastService"""
+
+import asyncio
+import pytest
+from datetime import datetime
+from aiogram.exceptions import TelegramForbiddenError, TelegramBadRequest
+from aiogram.methods import SendMessage
+
+from src.services.broadcast_service import BroadcastService
+from src.models import User, Broadcast
+
+class FakeBot:
+    """Records sent messages and simulates blocked or invalid chats"""
+
+    def __init__(self, blocked=(), invalid=(), hang=()):
+        self.sent = []
+        self.hang = set(hang)  # Sends to these chats never return
+        self.hanging = asyncio.Event()
+        self.parse_modes = {}
+        self.blocked = set(blocked)
+        self.invalid = set(invalid)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        method = SendMessage(chat_id=chat_id, text=text)
+        if chat_id in self.hang:
+            self.hanging.set()
+            await asyncio.Event().wait()
+        if chat_id in self.blocked:
+            raise TelegramForbiddenError(method=method, message="bot was blocked by the user")
+        if chat_id in self.invalid:
+            raise TelegramBadRequest(method=method, message="chat not found")
+        self.sent.append((chat_id, text))
+        # Unset means the bot's default HTML mode
+        self.parse_modes[chat_id] = kwargs.get("parse_mode", "HTML")
+
+async def create_users(app_db, count):
+    async with app_db.get_session() as session:
+        for i in range(1, count + 1):
+            session.add(User(telegram_id=1000 + i, created_at=datetime.now(), last_active=datetime.now()))
+        await session.commit()
+
+def make_service(bot, batch_size=3, checkpoint_every=10):
+    service = BroadcastService()
+    service.set_bot(bot)
+    service.rate_per_second = 10000
+    service.batch_size = batch_size
+    service.checkpoint_every = checkpoint_every
+    return service
+
+@pytest.mark.asyncio
+class TestBroadcastService:
+    """Test broadcast fan-out and checkpointing"""
+
+    async def test_broadcast_counts_outcomes(self, app_db):
+        """Delivered, blocked and failed recipients are counted separately"""
+        await create_users(app_db, 7)
+        bot = FakeBot(blocked={1002}, invalid={1005})
+        service = make_service(bot)
+
+        broadcast = await service.create_broadcast(created_by=1, text="Hello")
+        await service.active_tasks[broadcast.id]
+
+        result = await service.get_broadcast(broadcast.id)
+        assert result.status == "completed"
+        assert result.delivered == 5
+        assert result.blocked == 1
+        assert result.failed == 1
+
+        # Final report goes to the admin
+        assert bot.sent[-1][0] == 1
+
+    async def test_blocked_users_are_deactivated(self, app_db):
+        """Users who blocked the bot are skipped by later broadcasts"""
+        await create_users(app_db, 3)
+        service = make_service(FakeBot(blocked={1001}))
+
+        broadcast = await service.create_broadcast(created_by=1, text="First")
+        await service.active_tasks[broadcast.id]
+
+        bot = FakeBot()
+        service.set_bot(bot)
+        broadcast = await service.create_broadcast(created_by=1, text="Second")
+        await service.active_tasks[broadcast.id]
+
+        recipients = [chat_id for chat_id, text in bot.sent if text == "Second"]
+        assert recipients == [1002, 1003]
+
+    async def test_resume_from_checkpoint(self, app_db):
+        """A restarted broadcast continues after the last checkpointed user"""
+        await create_users(app_db, 6)
+        async with app_db.get_session() as session:
+            broadcast = Broadcast(created_by=1, text="Resume", status="running", last_user_id=4, delivered=4)
+            session.add(broadcast)
+            await session.commit()
+            await session.refresh(broadcast)
+
+        bot = FakeBot()
+        service = make_service(bot)
+        assert await service.resume_pending() == 1
+        await service.active_tasks[broadcast.id]
+
+        recipients = [chat_id for chat_id, text in bot.sent if text == "Resume"]
+        assert recipients == [1005, 1006]
+
+        result = await service.get_broadcast(broadcast.id)
+        assert result.delivered == 6
+        assert result.last_user_id == 6
+
+    async def test_text_is_sent_without_markup(self, app_db):
+        """Admin text with "<" or "&" is delivered as is instead of failing HTML parsing"""
+        await create_users(app_db, 2)
+        bot = FakeBot()
+        service = make_service(bot)
+
+        broadcast = await service.create_broadcast(created_by=1, text="Squats < deadlifts & bench")
+        await service.active_tasks[broadcast.id]
+
+        result = await service.get_broadcast(broadcast.id)
+        assert result.delivered == 2
+        assert bot.parse_modes[1001] is None and bot.parse_modes[1002] is None
+
+    async def test_restart_mid_batch_does_not_resend(self, app_db):
+        """Sends made before an interruption are checkpointed even inside a batch"""
+        await create_users(app_db, 5)
+        bot = FakeBot(hang={1004})
+        service = make_service(bot, batch_size=100, checkpoint_every=2)
+
+        broadcast = await service.create_broadcast(created_by=1, text="Once")
+        await bot.hanging.wait()
+        await service.shutdown()
+
+        result = await service.get_broadcast(broadcast.id)
+        assert (result.status, result.last_user_id, result.delivered) == ("running", 3, 3)
+
+        bot = FakeBot()
+        service = make_service(bot, batch_size=100, checkpoint_every=2)
+        assert await service.resume_pending() == 1
+        await service.active_tasks[broadcast.id]
+
+        recipients = [chat_id for chat_id, text in bot.sent if text == "Once"]
+        assert recipients == [1004, 1005]
+        assert (await service.get_broadcast(broadcast.id)).delivered == 5
+
+    async def test_error_marks_broadcast_failed_and_reports(self, app_db):
+        """An unexpected error ends the broadcast as failed and tells its author"""
+        await create_users(app_db, 2)
+        bot = FakeBot()
+        service = make_service(bot)
+
+        async def broken_batch(after_user_id):
+            raise RuntimeError("database is locked")
+
+        service._fetch_batch = broken_batch
+        broadcast = await service.create_broadcast(created_by=1, text="Hello")
+        await service.active_tasks[broadcast.id]
+
+        assert (await service.get_broadcast(broadcast.id)).status == "failed"
+        assert bot.sent[-1][0] == 1 and "failed" in bot.sent[-1][1]
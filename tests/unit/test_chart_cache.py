@@ -0,0 +1,118 @@
+"""Unit tests for the chart cache and data versions"""
+
+import asyncio
+import pytest
+from datetime import datetime
+
+from src.models import User, Exercise, Workout, WorkoutExercise, WorkoutSet, ProgressRecord
+from src.services.chart_cache import ChartCache
+from src.services.data_version import get_version, track_writes
+from src.services.visualization_service import AdvancedVisualization
+
+class FakePool:
+    """Counts renders instead of drawing"""
+
+    def __init__(self):
+        self.rendered = []
+
+    async def render(self, kind, payload):
+        self.rendered.append(kind)
+        return f"{kind}-{len(self.rendered)}".encode()
+
+async def create_users(app_db):
+    async with app_db.get_session() as session:
+        users = [User(telegram_id=n, created_at=datetime.now(), last_active=datetime.now()) for n in (1, 2)]
+        exercise = Exercise(name="Squat", category="legs", muscle_group="Quadriceps")
+        session.add_all([*users, exercise])
+        await session.flush()
+        return [user.id for user in users], exercise.id
+
+async def log_workout(app_db, user_id, exercise_id):
+    async with app_db.get_session() as session:
+        workout = Workout(user_id=user_id, date=datetime.now())
+        session.add(workout)
+        await session.flush()
+        workout_exercise = WorkoutExercise(workout_id=workout.id, exercise_id=exercise_id, order=0)
+        session.add(workout_exercise)
+        await session.flush()
+        return workout_exercise.id
+
+@pytest.mark.asyncio
+class TestDataVersions:
+    """Writes to training data bump the owner's version"""
+
+    async def test_writes_bump_only_their_user(self, app_db):
+        track_writes()
+        (first, second), exercise_id = await create_users(app_db)
+        assert await get_version(first) == 0
+
+        workout_exercise_id = await log_workout(app_db, first, exercise_id)
+        after_workout = await get_version(first)
+        assert after_workout > 0
+        assert await get_version(second) == 0
+
+        # A set added later is traced to its workout's user
+        async with app_db.get_session() as session:
+            session.add(WorkoutSet(workout_exercise_id=workout_exercise_id, set_number=1, reps=5, weight=100))
+        assert await get_version(first) == after_workout + 1
+
+        async with app_db.get_session() as session:
+            session.add(ProgressRecord(user_id=second, body_weight=80))
+        assert await get_version(second) == 1
+
+@pytest.mark.asyncio
+class TestChartCache:
+    """LRU bounds, disk spill and shared renders"""
+
+    async def test_memory_lru_is_bounded_by_bytes(self):
+        cache = ChartCache(max_bytes=10)
+        await cache.put("a", b"12345")
+        await cache.put("b", b"12345")
+        await cache.get("a")
+        await cache.put("c", b"12345")
+
+        assert await cache.get("a") == b"12345"
+        assert await cache.get("b") is None
+        assert cache.size == 10
+
+    async def test_disk_survives_restart_and_is_bounded(self, tmp_path):
+        cache = ChartCache(max_bytes=100, disk_dir=str(tmp_path), disk_max_bytes=20)
+        for key in ("k1", "k2", "k3"):
+            await cache.put(key, key.encode() * 4)
+
+        restarted = ChartCache(max_bytes=100, disk_dir=str(tmp_path), disk_max_bytes=20)
+        assert await restarted.get("k1") is None
+        assert await restarted.get("k3") == b"k3" * 4
+
+    async def test_concurrent_requests_share_a_render(self):
+        cache = ChartCache()
+        renders = 0
+
+        async def render():
+            nonlocal renders
+            renders += 1
+            await asyncio.sleep(0.01)
+            return b"png"
+
+        results = await asyncio.gather(*[cache.get_or_render("key", render) for _ in range(5)])
+        assert results == [b"png"] * 5
+        assert renders == 1
+
+    async def test_charts_rerender_only_after_writes(self, app_db, monkeypatch):
+        track_writes()
+        pool = FakePool()
+        monkeypatch.setattr("src.services.visualization_service.chart_pool", pool)
+        monkeypatch.setattr("src.services.visualization_service.chart_cache", ChartCache())
+        (user_id, other), exercise_id = await create_users(app_db)
+        visualization = AdvancedVisualization()
+
+        first = await visualization.create_multi_panel_dashboard(user_id)
+        assert await visualization.create_multi_panel_dashboard(user_id) == first
+        assert pool.rendered == ["dashboard"]
+
+        # Another user's workout leaves the chart valid, the user's own does not
+        await log_workout(app_db, other, exercise_id)
+        assert await visualization.create_multi_panel_dashboard(user_id) == first
+        await log_workout(app_db, user_id, exercise_id)
+        assert await visualization.create_multi_panel_dashboard(user_id) != first
+        assert pool.rendered == ["dashboard", "dashboard"]
@@ -0,0 +1,147 @@
+"""Unit tests for chart rendering in worker processes"""
+
+import asyncio
+import time
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+from src.models import User, Exercise, Workout, WorkoutExercise, WorkoutSet, ProgressRecord
+from src.services import chart_rendering
+from src.services.charts import dashboard_panels, plot_weight_progression
+from src.services.chart_rendering import ChartRenderPool, ChartQueueFull, ChartRenderError
+from src.services.visualization_service import AdvancedVisualization
+
+PNG_HEADER = b"\x89PNG"
+
+def slow_render(kind, payload):
+    """Stands in for render_chart in the worker"""
+    time.sleep(payload["sleep"])
+    return kind.encode()
+
+async def create_history(app_db, days=20):
+    async with app_db.get_session() as session:
+        user = User(telegram_id=1, created_at=datetime.now(), last_active=datetime.now())
+        exercise = Exercise(name="Bench Press", category="chest", muscle_group="Chest")
+        session.add_all([user, exercise])
+        await session.flush()
+
+        start = datetime.now() - timedelta(days=days * 2)
+        for day in range(days):
+            date = start + timedelta(days=day * 2)
+            workout = Workout(user_id=user.id, date=date)
+            workout_exercise = WorkoutExercise(exercise_id=exercise.id, order=0)
+            workout_exercise.sets = [
+                WorkoutSet(set_number=n, reps=8 - n, weight=60 + day + n * 2.5) for n in range(3)
+            ]
+            workout.workout_exercises = [workout_exercise]
+            session.add(workout)
+            session.add(ProgressRecord(user_id=user.id, date=date, body_weight=80 - day * 0.1, body_fat_percentage=18.0))
+        await session.commit()
+        return user.id, exercise.id
+
+@pytest.mark.asyncio
+class TestChartRendering:
+    """Charts are drawn in worker processes from plain arrays"""
+
+    async def test_charts_render_in_workers(self, app_db, monkeypatch):
+        user_id, exercise_id = await create_history(app_db)
+        pool = ChartRenderPool(workers=2)
+        monkeypatch.setattr("src.services.visualization_service.chart_pool", pool)
+        visualization = AdvancedVisualization()
+        try:
+            charts = await asyncio.gather(
+                visualization.create_multi_panel_dashboard(user_id),
+                visualization.create_progress_chart(user_id, exercise_id),
+                visualization.create_body_composition_chart(user_id),
+                # No data
+                visualization.create_progress_chart(user_id + 1, exercise_id),
+            )
+        finally:
+            pool.shutdown()
+
+        assert all(chart.startswith(PNG_HEADER) for chart in charts)
+
+    async def test_dashboard_costs_one_query(self, app_db, monkeypatch):
+        user_id, exercise_id = await create_history(app_db)
+        payloads = []
+
+        async def capture(kind, payload):
+            payloads.append(payload)
+            return b""
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        monkeypatch.setattr("src.services.visualization_service.chart_pool.render", capture)
+        event.listen(app_db.engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            await AdvancedVisualization()._render_dashboard(user_id, exercise_id)
+        finally:
+            event.remove(app_db.engine.sync_engine, "before_cursor_execute", listener)
+
+        assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+        payload = payloads[0]
+        panels = dashboard_panels(payload["sets"], payload["exercise_id"], payload["heatmap_since"])
+        assert len(panels["weight"]["dates"]) == 20
+        assert panels["weight"]["max_weight"][0] == 65
+        # All 40 days of history fall inside the 12-week heatmap
+        assert len(panels["volume"]["dates"]) == 20
+        assert len(panels["one_rm"]["dates"]) == 60
+        assert panels["muscles"]["groups"] == ["Chest"]
+        assert np.isclose(panels["muscles"]["volume"][0], np.dot(payload["sets"]["weight"], payload["sets"]["reps"]))
+
+    async def test_queue_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(chart_rendering, "render_chart", slow_render)
+        pool = ChartRenderPool(workers=1, queue_size=1)
+        try:
+            first = asyncio.create_task(pool.render("a", {"sleep": 0.5}))
+            second = asyncio.create_task(pool.render("b", {"sleep": 0}))
+            await asyncio.sleep(0)
+            with pytest.raises(ChartQueueFull):
+                await pool.render("c", {"sleep": 0})
+            assert await first == b"a"
+            assert await second == b"b"
+        finally:
+            pool.shutdown()
+
+    async def test_timeout_replaces_stuck_worker(self, monkeypatch):
+        monkeypatch.setattr(chart_rendering, "render_chart", slow_render)
+        pool = ChartRenderPool(workers=1, timeout=3)
+        try:
+            with pytest.raises(ChartRenderError):
+                await pool.render("stuck", {"sleep": 30})
+            assert pool.restarts == 1
+            # A fresh worker takes the next chart
+            assert await pool.render("next", {"sleep": 0}) == b"next"
+        finally:
+            pool.shutdown()
+
+    async def test_workers_are_recycled(self, monkeypatch):
+        monkeypatch.setattr(chart_rendering, "render_chart", slow_render)
+        pool = ChartRenderPool(workers=1, max_tasks_per_worker=2)
+        try:
+            results = [await pool.render(str(i), {"sleep": 0}) for i in range(5)]
+        finally:
+            pool.shutdown()
+
+        assert results == [b"0", b"1", b"2", b"3", b"4"]
+        assert pool.restarts == 2
+
+class TestDownsampling:
+    """Long histories are plotted within the point budget"""
+
+    def test_weight_progression_is_capped(self):
+        import matplotlib.pyplot as plt
+
+        dates = np.arange("2016-01-01", "2026-01-01", dtype="datetime64[D]").astype("datetime64[us]")
+        max_weight = np.linspace(60, 140, len(dates))
+        max_weight[-500] = 200
+        fig, ax = plt.subplots()
+        try:
+            plot_weight_progression(ax, {"dates": dates, "max_weight": max_weight, "avg_weight": max_weight - 10}, max_points=50)
+            lines = ax.get_lines()
+            assert all(len(line.get_xdata()) <= 52 for line in lines)
+            assert 200 in lines[0].get_ydata()
+        finally:
+            plt.close(fig)
@@ -0,0 +1,97 @@
+"""Unit tests for update backpressure"""
+
+import asyncio
+import pytest
+from aiogram.types import Update, User
+
+from src.middlewares.concurrency import ConcurrencyMiddleware
+
+def make_update(update_id: int, user_id: int, text: str) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    })
+
+def data_for(user_id: int) -> dict:
+    return {"event_from_user": User(id=user_id, is_bot=False, first_name="Test")}
+
+def test_heavy_detection():
+    middleware = ConcurrencyMiddleware(10, 1, 5, heavy_commands=["progress"], heavy_callback_prefixes=["export:"])
+    assert middleware.is_heavy(make_update(1, 1, "/progress@GymBot week"))
+    assert not middleware.is_heavy(make_update(2, 1, "/stats"))
+    assert not middleware.is_heavy(make_update(3, 1, "progress"))
+
+@pytest.mark.asyncio
+async def test_same_user_in_order_other_users_parallel():
+    middleware = ConcurrencyMiddleware(10, 1, 5)
+    events = []
+
+    async def handler(update, data):
+        events.append(("start", update.update_id))
+        await asyncio.sleep(0.02)
+        events.append(("end", update.update_id))
+
+    await asyncio.gather(
+        middleware(handler, make_update(1, 1, "a"), data_for(1)),
+        middleware(handler, make_update(2, 1, "b"), data_for(1)),
+        middleware(handler, make_update(3, 2, "c"), data_for(2)),
+    )
+
+    # User 1's updates never overlap, user 2 ran alongside the first one
+    assert events.index(("end", 1)) < events.index(("start", 2))
+    assert events.index(("start", 3)) < events.index(("end", 1))
+    assert middleware._user_locks == {}
+
+@pytest.mark.asyncio
+async def test_global_slots_bound_concurrency():
+    middleware = ConcurrencyMiddleware(2, 1, 5)
+    running = peak = 0
+
+    async def handler(update, data):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    await asyncio.gather(*[
+        middleware(handler, make_update(i, i, "x"), data_for(i)) for i in range(10)
+    ])
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_heavy_queue_is_separate_and_bounded():
+    middleware = ConcurrencyMiddleware(10, 1, 2, heavy_commands=["export"])
+    release = asyncio.Event()
+    handled = []
+
+    async def handler(update, data):
+        handled.append(update.update_id)
+        if update.message.text == "/export":
+            await release.wait()
+
+    async def reject(event, data):
+        handled.append(-event.update_id)
+
+    middleware._reject = reject
+    heavy = [
+        asyncio.create_task(middleware(handler, make_update(i, i, "/export"), data_for(i)))
+        for i in (1, 2)
+    ]
+    await asyncio.sleep(0)
+
+    # A light update is not held up by the busy heavy queue; a third export is rejected
+    await middleware(handler, make_update(3, 3, "/today"), data_for(3))
+    await middleware(handler, make_update(4, 4, "/export"), data_for(4))
+    assert handled == [1, 3, -4]
+
+    release.set()
+    await asyncio.gather(*heavy)
+    assert handled[-1] == 2
+    assert middleware.heavy_pending == 0
@@ -0,0 +1,93 @@
+"""Unit tests for live countdown edits"""
+
+import time
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+
+from src.services.countdown import CountdownTicker, render_countdown
+from src.services.timer_service import Timer, TimerManager
+
+class FakeBot:
+    def __init__(self, fail_for=()):
+        self.edits = []
+        self.fail_for = set(fail_for)
+
+    async def edit_message_text(self, text, chat_id, message_id):
+        if chat_id in self.fail_for:
+            raise TelegramBadRequest(method=None, message="message to edit not found")
+        self.edits.append((chat_id, text))
+
+def make_timer(user_id: int, seconds: float) -> Timer:
+    timer = Timer(int(seconds), chat_id=user_id, message_id=1, live=True)
+    timer.deadline = time.time() + seconds
+    return timer
+
+def test_render_countdown_rounds_up_to_step():
+    assert render_countdown(65) == "⏳ Осталось 1:05"
+    assert render_countdown(61, step=5) == "⏳ Осталось 1:05"
+    assert render_countdown(3725) == "⏳ Осталось 1:02:05"
+    assert render_countdown(-3) == "⏳ Осталось 0:00"
+
+def test_interval_adapts_to_load():
+    ticker = CountdownTicker(max_edits_per_second=10)
+    for user_id in range(10):
+        ticker.track(user_id, make_timer(user_id, 600), now=0)
+    assert ticker.interval == 1
+
+    for user_id in range(10, 40):
+        ticker.track(user_id, make_timer(user_id, 600), now=0)
+    assert ticker.interval == 5
+
+    for user_id in range(40, 1000):
+        ticker.track(user_id, make_timer(user_id, 600), now=0)
+    assert ticker.interval == 15
+
+@pytest.mark.asyncio
+async def test_edits_stay_within_budget():
+    """However many timers are live, a tick never exceeds the edit budget"""
+    ticker = CountdownTicker(max_edits_per_second=10)
+    ticker.set_bot(FakeBot())
+    for user_id in range(1000):
+        ticker.track(user_id, make_timer(user_id, 600), now=0)
+
+    sent = [await ticker.tick(now) for now in range(15, 30)]
+    assert max(sent) <= 10
+    # Every timer got its turn in order once the backlog drained
+    assert len({chat_id for chat_id, _ in ticker.bot.edits}) == sum(sent)
+
+@pytest.mark.asyncio
+async def test_unchanged_text_is_not_sent():
+    ticker = CountdownTicker(max_edits_per_second=10, intervals=(5,))
+    ticker.set_bot(FakeBot())
+    ticker.track(1, make_timer(1, 62), now=0)
+
+    assert await ticker.tick(5) == 1
+    # Re-armed for the same message, but the rendered text is still the same
+    ticker._heap[0] = (0, 0, 1, ticker.live[1])
+    assert await ticker.tick(6) == 0
+    assert ticker.edits_skipped == 1
+
+@pytest.mark.asyncio
+async def test_deleted_message_stops_updates():
+    ticker = CountdownTicker()
+    ticker.set_bot(FakeBot(fail_for={1}))
+    ticker.track(1, make_timer(1, 60), now=0)
+
+    await ticker.tick(1)
+    assert 1 not in ticker.live
+
+@pytest.mark.asyncio
+async def test_manager_tracks_live_timers():
+    manager = TimerManager(live_default=True)
+    assert manager.get_settings(1)["live"] is True
+
+    await manager.start_timer(1, 60, chat_id=1, message_id=5, live=True)
+    await manager.start_timer(2, 60, chat_id=2, message_id=6)
+    assert set(manager.countdown.live) == {1}
+
+    await manager.reset_settings(1)
+    assert manager.get_settings(1)["live"] is True
+
+    await manager.stop_timer(1)
+    assert manager.countdown.live == {}
+    manager.shutdown()
@@ -0,0 +1,190 @@
+"""Unit tests for background export jobs"""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import select
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendDocument
+from aiogram.types import InputFile
+
+from src.models import ExportJob
+from src.services import export_jobs as export_jobs_module
+from src.services.export_jobs import ExportJobService, ExportLimitReached
+from src.services.media_registry import MediaRegistry
+
+class FakeBot:
+    """Records progress messages, their edits and uploaded documents"""
+
+    def __init__(self):
+        self.messages = {}
+        self.documents = []
+        self.rejected = set()  # file_ids Telegram no longer accepts
+        self.fail_messages = False
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.fail_messages:
+            raise ConnectionError("network down")
+        message_id = len(self.messages) + 1
+        self.messages[message_id] = [text]
+        return SimpleNamespace(message_id=message_id)
+
+    async def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        self.messages[message_id].append(text)
+
+    async def send_document(self, chat_id, document, **kwargs):
+        if document in self.rejected:
+            raise TelegramBadRequest(
+                method=SendDocument(chat_id=chat_id, document=document), message="wrong file identifier"
+            )
+        if isinstance(document, InputFile):
+            document = f"document-{len(self.documents) + 1}"
+        self.documents.append((chat_id, document))
+        return SimpleNamespace(document=SimpleNamespace(file_id=document))
+
+class FakeExports:
+    """Stands in for ExportService, optionally waiting to be released"""
+
+    def __init__(self, fail=False):
+        self.builds = 0
+        self.fail = fail
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def export_to_excel_file(self, user_id):
+        self.builds += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("disk full")
+        return b"xlsx"
+
+def make_service(monkeypatch, exports=None, **kwargs) -> ExportJobService:
+    monkeypatch.setattr(export_jobs_module, "media_registry", MediaRegistry())
+    service = ExportJobService(**kwargs)
+    service.set_bot(FakeBot())
+    service.exports = exports or FakeExports()
+    return service
+
+async def get_job(app_db, job_id) -> ExportJob:
+    async with app_db.get_session() as session:
+        return await session.get(ExportJob, job_id)
+
+@pytest.mark.asyncio
+class TestExportJobs:
+    """Exports are built by workers while the handler returns at once"""
+
+    async def test_job_reports_stages_and_sends_file(self, app_db, monkeypatch):
+        service = make_service(monkeypatch)
+        service.start()
+        try:
+            job = await service.submit(1, 100, 100, "xlsx")
+            assert service.bot.messages[job.message_id] == ["⏳ XLSX export queued…"]
+            await service.queue.join()
+        finally:
+            service.shutdown()
+
+        assert service.bot.messages[job.message_id][1:] == [
+            "⚙️ Building your XLSX file…",
+            "📤 Uploading your XLSX file…",
+            "✅ XLSX export sent",
+        ]
+        assert service.bot.documents == [(100, "document-1")]
+        job = await get_job(app_db, job.id)
+        assert (job.status, job.stage, job.attempts) == ("completed", "done", 1)
+
+    async def test_unchanged_data_is_resent_without_a_job(self, app_db, monkeypatch):
+        service = make_service(monkeypatch)
+        service.start()
+        try:
+            await service.submit(1, 100, 100, "xlsx")
+            await service.queue.join()
+            assert await service.submit(1, 100, 100, "xlsx") is None
+        finally:
+            service.shutdown()
+
+        assert service.exports.builds == 1
+        assert service.bot.documents == [(100, "document-1"), (100, "document-1")]
+
+    async def test_rejected_cached_file_is_rebuilt_by_a_job(self, app_db, monkeypatch):
+        service = make_service(monkeypatch)
+        service.start()
+        try:
+            await service.submit(1, 100, 100, "xlsx")
+            await service.queue.join()
+            service.bot.rejected.add("document-1")
+
+            job = await service.submit(1, 100, 100, "xlsx")
+            assert job is not None
+            # Nothing was built inside the handler
+            assert service.exports.builds == 1
+            await service.queue.join()
+        finally:
+            service.shutdown()
+
+        assert service.exports.builds == 2
+        assert service.bot.documents == [(100, "document-1"), (100, "document-2")]
+
+    async def test_job_runs_without_progress_message(self, app_db, monkeypatch):
+        service = make_service(monkeypatch)
+        service.bot.fail_messages = True
+        service.start()
+        try:
+            with pytest.raises(ConnectionError):
+                await service.submit(1, 100, 100, "xlsx")
+            await service.queue.join()
+        finally:
+            service.shutdown()
+
+        assert service.bot.documents == [(100, "document-1")]
+        async with app_db.get_session() as session:
+            job = (await session.execute(select(ExportJob))).scalar_one()
+        assert (job.status, job.message_id) == ("completed", None)
+
+    async def test_jobs_are_capped_per_user(self, app_db, monkeypatch):
+        service = make_service(monkeypatch, max_per_user=2)
+        await service.submit(1, 100, 100, "xlsx")
+        await service.submit(1, 100, 100, "csv")
+        with pytest.raises(ExportLimitReached):
+            await service.submit(1, 100, 100, "pdf")
+        # Other users are not affected
+        await service.submit(2, 200, 200, "xlsx")
+
+    async def test_interrupted_job_resumes_after_restart(self, app_db, monkeypatch):
+        exports = FakeExports()
+        exports.release.clear()
+        service = make_service(monkeypatch, exports=exports)
+        service.start()
+        job = await service.submit(1, 100, 100, "xlsx")
+        while exports.builds == 0:
+            await asyncio.sleep(0.01)
+        service.shutdown()
+        await asyncio.sleep(0)
+        assert (await get_job(app_db, job.id)).status == "running"
+
+        exports.release.set()
+        restarted = make_service(monkeypatch, exports=exports)
+        assert await restarted.resume_pending() == 1
+        restarted.start()
+        try:
+            await restarted.queue.join()
+        finally:
+            restarted.shutdown()
+
+        job = await get_job(app_db, job.id)
+        assert (job.status, job.attempts) == ("completed", 2)
+        assert restarted.bot.messages == {}
+        assert restarted.bot.documents == [(100, "document-1")]
+
+    async def test_failed_build_is_reported(self, app_db, monkeypatch):
+        service = make_service(monkeypatch, exports=FakeExports(fail=True))
+        service.start()
+        try:
+            job = await service.submit(1, 100, 100, "xlsx")
+            await service.queue.join()
+        finally:
+            service.shutdown()
+
+        assert service.bot.messages[job.message_id][-1] == "❌ The export failed, please try again later"
+        job = await get_job(app_db, job.id)
+        assert (job.status, job.error) == ("failed", "disk full")
+        assert service.bot.documents == []
@@ -0,0 +1,80 @@
+"""Unit tests for workout exports"""
+
+import csv
+import gzip
+import pytest
+from datetime import datetime, timedelta
+from io import BytesIO
+from openpyxl import load_workbook
+
+from src.models import User, Exercise, Workout, WorkoutExercise, WorkoutSet
+from src.services.export_service import ExportService
+
+async def create_workouts(app_db, days=3):
+    async with app_db.get_session() as session:
+        user = User(telegram_id=1, created_at=datetime.now(), last_active=datetime.now())
+        bench = Exercise(name="Bench Press", category="chest", muscle_group="Chest")
+        squat = Exercise(name="Squat", category="legs", muscle_group="Quadriceps")
+        session.add_all([user, bench, squat])
+        await session.flush()
+
+        for day in range(days):
+            workout = Workout(user_id=user.id, date=datetime.now() - timedelta(days=day + 1))
+            pressed = WorkoutExercise(exercise_id=bench.id, order=0, notes="paused")
+            pressed.sets = [WorkoutSet(set_number=n, reps=5, weight=100 + n * 2.5) for n in range(1, 4)]
+            # Logged without sets
+            skipped = WorkoutExercise(exercise_id=squat.id, order=1)
+            workout.workout_exercises = [pressed, skipped]
+            session.add(workout)
+        await session.commit()
+        return user.id
+
+@pytest.mark.asyncio
+class TestExcelExport:
+    """The workbook is streamed from the database into write-only sheets"""
+
+    async def test_sheets_match_workouts(self, app_db, monkeypatch):
+        monkeypatch.setattr("src.services.export_service.config.EXPORT_CHUNK_ROWS", 2)
+        user_id = await create_workouts(app_db)
+
+        wb = load_workbook(BytesIO(await ExportService().export_to_excel(user_id)))
+        assert wb.sheetnames == ["Workout Summary", "Detailed Workouts", "Statistics", "Personal Records"]
+
+        summary = list(wb["Workout Summary"].values)
+        assert summary[0][:3] == ("Date", "Exercise", "Sets")
+        assert len(summary) == 1 + 3 * 2
+        assert summary[1][1:] == ("Bench Press", 3, 15, 1575, 107.5, "paused")
+        assert summary[2][1:6] == ("Squat", 0, 0, 0, 0)
+        # Most recent workout first
+        assert [row[0] for row in summary[1:]] == sorted((row[0] for row in summary[1:]), reverse=True)
+
+        detail = list(wb["Detailed Workouts"].values)
+        assert len(detail) == 1 + 3 * 3
+        assert detail[1][1:5] == ("Bench Press", 1, 5, 102.5)
+        assert wb["Detailed Workouts"]["A1"].style == "header"
+
+    async def test_file_export_is_rewound(self, app_db):
+        user_id = await create_workouts(app_db, days=1)
+        with await ExportService().export_to_excel_file(user_id) as excel_file:
+            assert excel_file.read(2) == b"PK"
+
+@pytest.mark.asyncio
+class TestCsvExport:
+    """CSV is written page by page from plain column queries"""
+
+    async def test_pages_cover_every_set_once(self, app_db, monkeypatch):
+        monkeypatch.setattr("src.services.export_service.config.EXPORT_CHUNK_ROWS", 2)
+        user_id = await create_workouts(app_db)
+
+        rows = list(csv.reader((await ExportService().export_to_csv(user_id)).decode().splitlines()))
+        assert rows[0] == ExportService.CSV_HEADER
+        assert len(rows) == 1 + 3 * 3
+        assert rows[1][1:9] == ["Bench Press", "chest", "Chest", "1", "5", "102.5", "512.5", ""]
+        assert [row[4] for row in rows[1:4]] == ["1", "2", "3"]
+        assert [row[0] for row in rows[1:]] == sorted((row[0] for row in rows[1:]), reverse=True)
+
+    async def test_gzip_file_matches_plain_csv(self, app_db):
+        user_id = await create_workouts(app_db)
+        service = ExportService()
+        with await service.export_to_csv_file(user_id) as csv_file:
+            assert gzip.decompress(csv_file.read()) == await service.export_to_csv(user_id)
@@ -0,0 +1,95 @@
+"""Unit tests for queue-based logging"""
+
+import json
+import logging
+import os
+import queue
+
+from src.utils.logging_setup import (
+    DroppingQueueHandler, LogListener, SamplingFilter, SizeTimedRotatingFileHandler, parse_sampling, setup_logging
+)
+
+def make_record(name: str, level: int = logging.INFO, msg: str = "hello") -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+def test_sampling_keeps_fraction_of_chatty_loggers():
+    sampler = SamplingFilter(parse_sampling("src.handlers=0.5, src.handlers.workout=0.1"))
+
+    kept = [sampler.filter(make_record("src.handlers.workout")) for _ in range(100)]
+    assert sum(kept) == 10
+    kept = [sampler.filter(make_record("src.handlers.stats")) for _ in range(100)]
+    assert sum(kept) == 50
+    assert all(sampler.filter(make_record("src.services.timer_service")) for _ in range(10))
+    # Warnings are never sampled away
+    assert all(sampler.filter(make_record("src.handlers.workout", logging.WARNING)) for _ in range(10))
+
+def test_rotates_by_size_and_keeps_backups(tmp_path):
+    path = tmp_path / "bot.log"
+    handler = SizeTimedRotatingFileHandler(str(path), max_bytes=200, interval_seconds=3600, backup_count=2)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for i in range(30):
+        handler.emit(make_record("test", msg=f"line {i:02d} " + "x" * 40))
+    handler.close()
+
+    rotated = [name for name in os.listdir(tmp_path) if name != "bot.log"]
+    assert len(rotated) == 2
+    # Size is checked before each write, so a file ends at most one line past the limit
+    assert path.stat().st_size < 200 + 50
+    assert "line 29" in path.read_text()
+
+def test_rotates_by_time(tmp_path):
+    path = tmp_path / "bot.log"
+    handler = SizeTimedRotatingFileHandler(str(path), max_bytes=0, interval_seconds=3600)
+    handler.emit(make_record("test", msg="before"))
+    handler.rollover_at = 0
+    handler.emit(make_record("test", msg="after"))
+    handler.close()
+
+    assert path.read_text().strip() == "after"
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_json_output_through_queue(tmp_path):
+    path = tmp_path / "bot.log"
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    listener = setup_logging(log_file=str(path), json_format=True)
+    try:
+        logging.getLogger("src.test").info("queued %s", "message")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("src.test").exception("failed")
+    finally:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
+
+    entry, error = [json.loads(line) for line in path.read_text().splitlines()[-2:]]
+    assert entry["logger"] == "src.test"
+    assert entry["message"] == "queued message"
+    assert entry["level"] == "INFO"
+    assert "exception" not in entry
+
+    # The traceback survives being formatted before it is queued
+    assert error["message"] == "failed"
+    assert error["exception"].startswith("Traceback") and "ValueError: boom" in error["exception"]
+
+def test_full_queue_drops_and_still_stops():
+    log_queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue)
+    for i in range(5):
+        handler.handle(make_record("test", msg=f"line {i}"))
+    assert handler.dropped == 3
+
+    written = []
+    sink = logging.Handler()
+    sink.emit = lambda record: written.append(record.getMessage())
+    listener = LogListener(log_queue, sink)
+    listener.start()
+    listener.stop()
+    assert written == ["line 0", "line 1"]
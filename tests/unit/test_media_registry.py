@@ -0,0 +1,90 @@
+"""Unit tests for file_id reuse of generated media"""
+
+import pytest
+import tempfile
+from types import SimpleNamespace
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendPhoto
+from aiogram.types import InputFile
+
+from src.services.media_registry import MediaRegistry
+
+class FakeBot:
+    """Hands out a new file_id per upload and rejects revoked ones"""
+
+    def __init__(self):
+        self.uploads = 0
+        self.sent = []
+        self.revoked = set()
+        self.received = []
+
+    async def send_photo(self, chat_id, photo, **kwargs):
+        if isinstance(photo, InputFile):
+            self.uploads += 1
+            photo = f"photo-{self.uploads}"
+        elif photo in self.revoked:
+            raise TelegramBadRequest(method=SendPhoto(chat_id=chat_id, photo=photo), message="wrong file identifier")
+        self.sent.append((chat_id, photo))
+        return SimpleNamespace(photo=[SimpleNamespace(file_id="thumb"), SimpleNamespace(file_id=photo)])
+
+    async def send_document(self, chat_id, document, **kwargs):
+        if isinstance(document, InputFile):
+            self.received.append(b"".join([chunk async for chunk in document.read(self)]))
+            self.uploads += 1
+            document = f"document-{self.uploads}"
+        self.sent.append((chat_id, document))
+        return SimpleNamespace(document=SimpleNamespace(file_id=document))
+
+@pytest.mark.asyncio
+class TestMediaRegistry:
+    """Identical content is uploaded once"""
+
+    async def test_identical_bytes_reuse_file_id(self, app_db):
+        bot = FakeBot()
+        await MediaRegistry().send_photo(bot, 1, b"png", "chart.png")
+        # A restarted bot finds the file_id in the database
+        await MediaRegistry().send_photo(bot, 2, b"png", "chart.png")
+        await MediaRegistry().send_photo(bot, 2, b"other", "chart.png")
+
+        assert bot.uploads == 2
+        assert bot.sent == [(1, "photo-1"), (2, "photo-1"), (2, "photo-2")]
+
+    async def test_rejected_file_id_is_uploaded_again(self, app_db):
+        bot = FakeBot()
+        registry = MediaRegistry()
+        await registry.send_photo(bot, 1, b"png", "chart.png")
+        bot.revoked.add("photo-1")
+
+        await registry.send_photo(bot, 1, b"png", "chart.png")
+        await registry.send_photo(bot, 1, b"png", "chart.png")
+        assert bot.sent == [(1, "photo-1"), (1, "photo-2"), (1, "photo-2")]
+
+    async def test_keyed_document_is_built_only_once(self, app_db):
+        bot = FakeBot()
+        registry = MediaRegistry()
+        builds = 0
+
+        async def build():
+            nonlocal builds
+            builds += 1
+            return f"xlsx built at {builds}".encode()
+
+        for chat_id in (1, 2):
+            await registry.send_document(bot, chat_id, build, "export.xlsx", key="export:1:v3")
+        await registry.send_document(bot, 1, build, "export.xlsx", key="export:1:v4")
+
+        assert builds == 2
+        assert bot.sent == [(1, "document-1"), (2, "document-1"), (1, "document-2")]
+
+    async def test_file_is_uploaded_in_chunks_and_closed(self, app_db):
+        bot = FakeBot()
+        excel_file = tempfile.SpooledTemporaryFile()
+        excel_file.write(b"x" * 200_000)
+
+        async def build():
+            return excel_file
+
+        await MediaRegistry().send_document(bot, 1, build, "export.xlsx", key="export:1:v1")
+        assert bot.sent == [(1, "document-1")]
+        assert bot.received == [b"x" * 200_000]
+        assert excel_file.closed
@@ -0,0 +1,97 @@
+"""Unit tests for per-handler metrics"""
+
+import pytest
+from aiogram.types import Update
+from sqlalchemy import text
+
+from src.middlewares.metrics import (
+    HandlerStats, MetricsMiddleware, StatementStats, current_timings, instrument_db_timing, route_label
+)
+from src.utils.metrics import HANDLER_ERRORS
+
+def message_update(text: str) -> Update:
+    return Update.model_validate({
+        "update_id": 1,
+        "message": {
+            "message_id": 1,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    })
+
+def callback_update(data: str) -> Update:
+    return Update.model_validate({
+        "update_id": 1,
+        "callback_query": {
+            "id": "1",
+            "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+            "chat_instance": "1",
+            "data": data,
+        },
+    })
+
+def test_route_labels_have_low_cardinality():
+    assert route_label(message_update("/stats@GymBot")) == "/stats"
+    assert route_label(message_update("/Stats week")) == "/stats"
+    assert route_label(message_update("bench press")) == "message"
+    assert route_label(message_update("/<script>")) == "/other"
+    assert route_label(callback_update("nutrition:meal:lunch")) == "cb:nutrition"
+    assert route_label(callback_update("notif_add_day_3")) == "cb:notif_add_day"
+    assert route_label(callback_update("reminder_30")) == "cb:reminder"
+    assert route_label(callback_update("add_second")) == "cb:add_second"
+
+@pytest.mark.asyncio
+async def test_records_latency_db_time_and_errors(app_db):
+    instrument_db_timing(app_db.engine)
+    stats = HandlerStats()
+    middleware = MetricsMiddleware(stats)
+
+    async def handler(update, data):
+        async with app_db.get_session() as session:
+            await session.execute(text("SELECT 1"))
+        assert current_timings.get().db > 0
+
+    async def failing(update, data):
+        raise ValueError("boom")
+
+    await middleware(handler, message_update("/stats"), {})
+    with pytest.raises(ValueError):
+        await middleware(failing, message_update("/stats"), {})
+
+    [row] = stats.summary()
+    assert row["handler"] == "/stats"
+    assert row["count"] == 2 and row["errors"] == 1
+    assert row["db_mean"] > 0
+    assert HANDLER_ERRORS.labels("/stats", "ValueError")._value.get() >= 1
+    assert current_timings.get() is None
+
+@pytest.mark.asyncio
+async def test_failed_statement_does_not_leak_start_time(app_db):
+    instrument_db_timing(app_db.engine)
+    async with app_db.engine.connect() as conn:
+        with pytest.raises(Exception):
+            await conn.execute(text("SELECT * FROM missing_table"))
+        await conn.execute(text("SELECT 1"))
+        raw = await conn.get_raw_connection()
+        assert raw.info["query_started"] == []
+
+def test_percentiles():
+    stats = HandlerStats(window=100)
+    for ms in range(1, 101):
+        stats.record("/log", ms / 1000, 0, 0)
+    [row] = stats.summary()
+    assert row["p50"] == pytest.approx(0.051)
+    assert row["p99"] == pytest.approx(0.100)
+
+def test_statement_stats_rank_by_total_time():
+    stats = StatementStats(max_statements=2)
+    stats.record("SELECT  *\n FROM users", 0.010)
+    stats.record("SELECT * FROM users", 0.030)
+    stats.record("SELECT 1", 0.050)
+    stats.record("SELECT 2", 1.0)  # over the statement limit, ignored
+
+    top = stats.top()
+    assert [row["statement"] for row in top] == ["SELECT 1", "SELECT * FROM users"]
+    assert top[1]["count"] == 2 and top[1]["max"] == pytest.approx(0.030)
@@ -0,0 +1,76 @@
+"""Unit tests for the health and metrics endpoints"""
+
+import asyncio
+import time
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.bot.monitoring import LoopLagMonitor, MonitoringServer
+
+async def make_client(server: MonitoringServer) -> TestClient:
+    app = web.Application()
+    server.add_routes(app)
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    return client
+
+@pytest.mark.asyncio
+async def test_health_reports_database_and_lag(app_db):
+    server = MonitoringServer(max_loop_lag=1.0)
+    client = await make_client(server)
+
+    response = await client.get("/health")
+    assert response.status == 200
+    assert (await response.json())["database"] == "ok"
+
+    server.lag_monitor.lag = 5.0
+    response = await client.get("/health")
+    assert response.status == 503
+    assert (await response.json())["status"] == "unhealthy"
+    server.lag_monitor.lag = 0.0
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_health_fails_without_database():
+    client = await make_client(MonitoringServer())
+    response = await client.get("/health")
+    assert response.status == 503
+    assert (await response.json())["database"] == "not initialized"
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_runtime_gauges():
+    client = await make_client(MonitoringServer())
+    response = await client.get("/metrics")
+    body = await response.text()
+
+    assert response.status == 200
+    for name in (
+        "gymbot_outbound_queue_depth",
+        "gymbot_scheduler_lag_seconds",
+        "gymbot_event_loop_lag_seconds",
+        "gymbot_admission_wait_seconds",
+    ):
+        assert name in body
+    await client.close()
+
+def block_the_loop(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+@pytest.mark.asyncio
+async def test_watchdog_captures_blocking_code():
+    monitor = LoopLagMonitor(interval=0.02, block_threshold=0.05)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    block_the_loop(0.3)
+    await asyncio.sleep(0.05)
+    monitor.stop()
+
+    [(offender, count)] = monitor.top_offenders()
+    assert offender.startswith("block_the_loop (tests/unit/test_monitoring.py:")
+    assert count == 1
+    assert "block_the_loop" in monitor.recent_blocks[-1]["stack"]
+    assert monitor.recent_blocks[-1]["stalled"] >= 0.05
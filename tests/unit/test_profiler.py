@@ -0,0 +1,69 @@
+"""Unit tests for the sampling profiler"""
+
+import asyncio
+import time
+import pytest
+
+from src.utils.profiler import UpdateProfiler, profile_event_loop
+
+def busy_wait(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+@pytest.mark.asyncio
+async def test_profile_finds_blocking_code():
+    async def blocker():
+        await asyncio.sleep(0.02)
+        busy_wait(0.2)
+
+    task = asyncio.create_task(blocker())
+    profiler = await profile_event_loop(0.3, interval=0.002)
+    await task
+
+    assert profiler.samples > 0
+    top = {label: total for label, own, total in profiler.top_functions()}
+    busy = next(label for label in top if label.startswith("busy_wait"))
+    # Most samples during the blocking call land in busy_wait
+    assert top[busy] / profiler.samples > 0.3
+    assert "tests/unit/test_profiler.py" in busy
+
+    line = profiler.collapsed().splitlines()[0]
+    stack, count = line.rsplit(" ", 1)
+    assert ";" in stack and int(count) > 0
+
+@pytest.mark.asyncio
+async def test_update_profiler_only_samples_matching_updates(tmp_path):
+    profiler = UpdateProfiler(output_dir=str(tmp_path), interval=0.001)
+    assert profiler.matches("/progress", 1) is False
+
+    profiler.arm(route="/progress", max_captures=1)
+    assert profiler.matches("/stats", 1) is False
+
+    async def other_handler():
+        await asyncio.sleep(0.01)
+        busy_wait(0.1)
+
+    async def profiled_handler():
+        assert profiler.matches("/progress", 1) is True
+        async with profiler.capture("progress-1") as stacks:
+            await asyncio.sleep(0.05)
+            busy_wait(0.05)
+        return stacks
+
+    other = asyncio.create_task(other_handler())
+    stacks = await profiled_handler()
+    await other
+
+    # Samples taken while the other handler blocked the loop are not attributed
+    labels = {label for stack in stacks for label in stack}
+    assert any(label.startswith("profiled_handler") for label in labels)
+    assert not any(label.startswith("other_handler") for label in labels)
+
+    [(path, samples, seconds)] = profiler.captures
+    assert samples == sum(stacks.values()) > 0
+    assert path.startswith(str(tmp_path)) and path.endswith("progress-1.collapsed")
+
+    # The capture limit disarms the profiler
+    assert profiler.matches("/progress", 1) is False
+    assert not profiler.armed
@@ -1,5 +1,5 @@
 ﻿import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from src.models.exercise import Base, Exercise
 from src.utils.seed_exercises import seed_exercises, INITIAL_EXERCISES
@@ -18,3 +18,47 @@ def test_seed_exercises(test_session):
     exercises = test_session.query(Exercise).all()
     assert len(exercises) == len(INITIAL_EXERCISES)
     assert exercises[0].name == "Bench Press"
+
+@pytest.mark.asyncio
+class TestSeedOnStartup:
+    """src.data.exercises seeding writes only what changed since the last boot"""
+
+    async def test_unchanged_seed_is_skipped(self, app_db):
+        from src.data import exercises
+
+        async with app_db.get_session() as session:
+            assert await exercises.seed_exercises(session) == len(exercises.INITIAL_EXERCISES)
+
+        statements = []
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(app_db.engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            async with app_db.get_session() as session:
+                assert await exercises.seed_exercises(session) == 0
+        finally:
+            event.remove(app_db.engine.sync_engine, "before_cursor_execute", listener)
+        assert len(statements) == 1
+
+    async def test_changed_seed_upserts_only_changes(self, app_db, monkeypatch):
+        from src.data import exercises
+        from src.models import Exercise as AppExercise
+        from sqlalchemy import select
+
+        async with app_db.get_session() as session:
+            await exercises.seed_exercises(session)
+
+        changed = [dict(e) for e in exercises.INITIAL_EXERCISES]
+        changed[0]["equipment"] = "Smith Machine"
+        changed.append({"name": "Hip Thrust", "category": "Legs", "muscle_group": "Glutes", "equipment": "Barbell"})
+        monkeypatch.setattr(exercises, "INITIAL_EXERCISES", changed)
+
+        async with app_db.get_session() as session:
+            assert await exercises.seed_exercises(session) == 2
+            result = await session.execute(select(AppExercise).where(AppExercise.name.in_(["Bench Press", "Hip Thrust"])))
+            by_name = {e.name: e for e in result.scalars()}
+            count = len((await session.execute(select(AppExercise.id))).all())
+
+        assert by_name["Bench Press"].equipment == "Smith Machine"
+        assert by_name["Hip Thrust"].muscle_group == "Glutes"
+        assert count == len(changed)
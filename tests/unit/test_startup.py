@@ -0,0 +1,91 @@
+"""Unit tests for bot startup"""
+
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.bot.startup import StartupOrchestrator, StartupError
+
+ROOT = Path(__file__).resolve().parents[2]
+
+HEAVY = ["numpy", "pandas", "matplotlib", "seaborn", "openpyxl", "reportlab"]
+
+def test_bot_import_skips_heavy_libraries():
+    code = f"import json, sys, src.bot.app; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.splitlines()[-1]) == []
+
+def phase(log, name, seconds=0.0, fail=False):
+    async def run():
+        log.append(f"{name} start")
+        await asyncio.sleep(seconds)
+        if fail:
+            raise RuntimeError(name)
+        log.append(f"{name} end")
+    return run
+
+@pytest.mark.asyncio
+class TestStartupOrchestrator:
+    """Phases run concurrently in dependency order"""
+
+    async def test_independent_phases_overlap(self):
+        log = []
+        startup = StartupOrchestrator()
+        startup.add("database", phase(log, "database", 0.1))
+        startup.add("handlers", phase(log, "handlers", 0.1))
+        startup.add("seed", phase(log, "seed", 0.1), after=["database"])
+
+        started = time.perf_counter()
+        await startup.run()
+        assert time.perf_counter() - started < 0.3
+        assert log.index("database end") < log.index("seed start")
+        assert log.index("handlers start") < log.index("database end")
+        assert all(p.duration >= 0.1 for p in startup.phases.values())
+
+    async def test_background_phases_finish_after_run(self):
+        log = []
+        startup = StartupOrchestrator()
+        startup.add("database", phase(log, "database"))
+        startup.add("reminders", phase(log, "reminders", 0.1), after=["database"], critical=False)
+
+        await startup.run()
+        assert "reminders end" not in log
+        await startup.wait()
+        assert "reminders end" in log
+
+    async def test_background_failure_skips_only_dependents(self):
+        log = []
+        startup = StartupOrchestrator()
+        startup.add("warm", phase(log, "warm", fail=True), critical=False)
+        startup.add("after_warm", phase(log, "after_warm"), after=["warm"], critical=False)
+        startup.add("other", phase(log, "other"), critical=False)
+
+        await startup.run()
+        await startup.wait()
+        assert "after_warm start" not in log
+        assert "other end" in log
+        assert isinstance(startup.phases["after_warm"].error, StartupError)
+
+    async def test_critical_failure_stops_startup(self):
+        log = []
+        startup = StartupOrchestrator()
+        startup.add("database", phase(log, "database", fail=True))
+        startup.add("slow", phase(log, "slow", 10), critical=False)
+
+        with pytest.raises(StartupError):
+            await startup.run()
+        assert "slow end" not in log
+        assert all(task.done() for task in startup._tasks.values())
+
+    async def test_invalid_dependencies_are_rejected(self):
+        startup = StartupOrchestrator()
+        startup.add("cache", phase([], "cache"), critical=False)
+        with pytest.raises(ValueError):
+            startup.add("handlers", phase([], "handlers"), after=["cache"])
+        with pytest.raises(ValueError):
+            startup.add("seed", phase([], "seed"), after=["database"])
@@ -0,0 +1,66 @@
+"""Unit tests for the per-user rate limiter"""
+
+import pytest
+from aiogram.types import Update, User
+
+from src.middlewares.throttling import MemoryRateLimiter, ThrottlingMiddleware
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def callback_update(update_id: int, user_id: int) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"},
+            "chat_instance": "1",
+            "data": "add_second",
+        },
+    })
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_then_refills():
+    clock = Clock()
+    limiter = MemoryRateLimiter(clock)
+
+    assert [await limiter.allow("u", rate=1, capacity=3) for _ in range(4)] == [True, True, True, False]
+    clock.now = 1.0
+    assert await limiter.allow("u", rate=1, capacity=3) is True
+    assert await limiter.allow("u", rate=1, capacity=3) is False
+    # Other users have their own bucket
+    assert await limiter.allow("v", rate=1, capacity=3) is True
+
+@pytest.mark.asyncio
+async def test_sweep_drops_only_full_buckets():
+    clock = Clock()
+    limiter = MemoryRateLimiter(clock)
+    await limiter.allow("slow", rate=0.1, capacity=2)
+    await limiter.allow("fast", rate=10, capacity=2)
+
+    clock.now = 1.0
+    limiter._sweep(clock.now)
+    assert set(limiter.buckets) == {"slow"}
+
+@pytest.mark.asyncio
+async def test_throttled_callback_is_only_answered(monkeypatch):
+    middleware = ThrottlingMiddleware(MemoryRateLimiter(Clock()), messages_per_minute=20, callbacks_per_minute=60, burst=2)
+    data = {"event_from_user": User(id=1, is_bot=False, first_name="Test")}
+    handled, answered = [], []
+
+    async def handler(update, data):
+        handled.append(update.update_id)
+
+    async def answer(self, *args, **kwargs):
+        answered.append(self.id)
+
+    monkeypatch.setattr("aiogram.types.CallbackQuery.answer", answer)
+    for update_id in range(1, 5):
+        await middleware(handler, callback_update(update_id, 1), data)
+
+    assert handled == [1, 2]
+    assert answered == ["3", "4"]
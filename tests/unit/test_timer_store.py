@@ -0,0 +1,139 @@
+"""Unit tests for timer persistence"""
+
+import asyncio
+import time
+import pytest
+
+from src.services.timer_service import TimerManager
+from src.services.timer_store import MemoryTimerStore, SqlTimerStore
+
+@pytest.mark.asyncio
+class TestTimerStores:
+    """Both stores share the same claim semantics"""
+
+    async def check_store(self, store):
+        record = {"user_id": 7, "chat_id": 70, "message_id": 5, "deadline": time.time() + 60, "duration": 60, "live": False}
+        await store.save_timer(record)
+
+        assert await store.get_timer(7) == record
+        assert await store.load_timers() == [record]
+
+        # Only the holder of the current deadline may claim the timer
+        assert await store.claim_timer(7, record["deadline"] - 1) is False
+        assert await store.claim_timer(7, record["deadline"]) is True
+        assert await store.claim_timer(7, record["deadline"]) is False
+        assert await store.get_timer(7) is None
+
+        await store.save_settings(7, {"hours": 0, "minutes": 1, "seconds": 30, "live": True})
+        assert await store.load_settings(7) == {"hours": 0, "minutes": 1, "seconds": 30, "live": True}
+        assert await store.load_settings(8) is None
+
+    async def test_memory_store(self):
+        await self.check_store(MemoryTimerStore())
+
+    async def test_sql_store(self, app_db):
+        await self.check_store(SqlTimerStore())
+
+@pytest.mark.asyncio
+class TestTimerRestore:
+    """Timers survive a restart through the store"""
+
+    async def test_restore_rearms_and_fires_expired(self):
+        store = MemoryTimerStore()
+        now = time.time()
+        await store.save_timer({"user_id": 1, "chat_id": 10, "message_id": None, "deadline": now - 30, "duration": 60})
+        await store.save_timer({"user_id": 2, "chat_id": 20, "message_id": None, "deadline": now + 600, "duration": 900})
+
+        manager = TimerManager(tick_seconds=0.01)
+        manager.set_store(store)
+        fired = []
+
+        async def on_expire(bot, user_id, timer):
+            fired.append((user_id, timer.chat_id))
+
+        manager.set_expiry_handler(on_expire)
+        manager.start()
+        assert await manager.restore() == 2
+        await asyncio.sleep(0.05)
+
+        # The overdue timer fired, the other one is running again
+        assert fired == [(1, 10)]
+        assert manager.get_timer(2).remaining_seconds() > 590
+        assert await store.get_timer(1) is None
+        manager.shutdown()
+
+    async def test_only_one_replica_fires(self):
+        store = MemoryTimerStore()
+        replicas = [TimerManager(tick_seconds=0.01) for _ in range(2)]
+        fired = []
+
+        async def on_expire(bot, user_id, timer):
+            fired.append(user_id)
+
+        for replica in replicas:
+            replica.set_store(store)
+            replica.set_expiry_handler(on_expire)
+            replica.start()
+
+        # Replica 1 restarts while replica 0 still has the timer armed
+        await replicas[0].start_timer(1, 0.02, chat_id=10)
+        await replicas[1].restore()
+        await asyncio.sleep(0.1)
+
+        assert fired == [1]
+        for replica in replicas:
+            replica.shutdown()
+
+    async def test_unsaved_timer_still_fires(self):
+        class FailingStore(MemoryTimerStore):
+            async def save_timer(self, record):
+                raise ConnectionError("store unavailable")
+
+        manager = TimerManager(tick_seconds=0.01)
+        manager.set_store(FailingStore())
+        fired = []
+
+        async def on_expire(bot, user_id, timer):
+            fired.append(user_id)
+
+        manager.set_expiry_handler(on_expire)
+        manager.start()
+        await manager.start_timer(1, 0.02, chat_id=10)
+        await asyncio.sleep(0.1)
+
+        assert fired == [1]
+        manager.shutdown()
+
+    async def test_shutdown_cancels_pending_notifications(self):
+        manager = TimerManager(tick_seconds=0.01)
+        manager.set_store(MemoryTimerStore())
+        started = asyncio.Event()
+
+        async def on_expire(bot, user_id, timer):
+            started.set()
+            await asyncio.sleep(60)
+
+        manager.set_expiry_handler(on_expire)
+        manager.start()
+        await manager.start_timer(1, 0.01, chat_id=10)
+        await asyncio.wait_for(started.wait(), 1)
+
+        (task,) = manager._fire_tasks
+        manager.shutdown()
+        await asyncio.sleep(0)
+        assert task.cancelled()
+        assert not manager._fire_tasks
+
+    async def test_settings_survive_restart(self):
+        store = MemoryTimerStore()
+        manager = TimerManager()
+        manager.set_store(store)
+        settings = await manager.load_settings(1)
+        settings["minutes"] = 2
+        await manager.save_settings(1)
+        manager.shutdown()
+
+        restarted = TimerManager()
+        restarted.set_store(store)
+        assert (await restarted.load_settings(1))["minutes"] == 2
+        restarted.shutdown()
@@ -0,0 +1,95 @@
+"""Unit tests for the timing wheel and TimerManager"""
+
+import asyncio
+import random
+import pytest
+
+from src.utils.timing_wheel import TimingWheel
+from src.services.timer_service import TimerManager
+
+def noop(payload):
+    pass
+
+def test_entries_expire_at_their_deadline():
+    """Every entry fires exactly on its tick, across all wheel levels"""
+    wheel = TimingWheel(slots_bits=3, levels=3)
+    rng = random.Random(42)
+    deadlines = [rng.randint(0, 2000) for _ in range(500)]
+    for deadline in deadlines:
+        wheel.schedule(deadline, noop, deadline)
+
+    fired = {}
+    for tick in range(2001):
+        for entry in wheel.advance(tick):
+            fired.setdefault(entry.payload, []).append(tick)
+
+    assert len(wheel) == 0
+    assert all(ticks == [deadline] * len(ticks) for deadline, ticks in fired.items())
+    assert sum(len(ticks) for ticks in fired.values()) == len(deadlines)
+
+def test_cancel_removes_entry():
+    """Cancelled entries never fire"""
+    wheel = TimingWheel()
+    keep = wheel.schedule(10, noop, "keep")
+    drop = wheel.schedule(10, noop, "drop")
+
+    assert wheel.cancel(drop) is True
+    assert wheel.cancel(drop) is False
+    assert [e.payload for e in wheel.advance(10)] == ["keep"]
+    assert not keep.active
+
+def test_deadline_beyond_span():
+    """Entries further out than the wheel span are parked until due"""
+    wheel = TimingWheel(slots_bits=2, levels=2)  # span of 16 ticks
+    wheel.schedule(50, noop, "far")
+
+    assert wheel.advance(49) == []
+    assert [e.payload for e in wheel.advance(50)] == ["far"]
+
+def test_past_deadline_fires_on_next_advance():
+    """Scheduling in the past fires on the next tick"""
+    wheel = TimingWheel()
+    wheel.advance(100)
+    wheel.schedule(5, noop, "late")
+
+    assert [e.payload for e in wheel.advance(101)] == ["late"]
+
+@pytest.mark.asyncio
+async def test_timer_manager_fires_and_prunes_settings():
+    """Timers notify on expiry and idle settings are dropped"""
+    manager = TimerManager(tick_seconds=0.01, settings_idle_seconds=0.05)
+    manager.start()
+    fired = asyncio.Event()
+
+    async def on_expire(bot, user_id, timer):
+        fired.set()
+
+    manager.set_expiry_handler(on_expire)
+    manager.get_settings(1)["seconds"] = 5
+    await manager.start_timer(1, 0.03, chat_id=1)
+    assert manager.get_timer(1) is not None
+
+    await asyncio.wait_for(fired.wait(), timeout=1)
+    assert manager.get_timer(1) is None
+
+    await asyncio.sleep(0.15)
+    assert 1 not in manager.settings
+    manager.shutdown()
+
+@pytest.mark.asyncio
+async def test_timer_manager_cancel():
+    """Stopping a timer cancels its notification"""
+    manager = TimerManager(tick_seconds=0.01)
+    manager.start()
+    fired = []
+
+    async def on_expire(bot, user_id, timer):
+        fired.append(user_id)
+
+    manager.set_expiry_handler(on_expire)
+    await manager.start_timer(1, 0.03, chat_id=1)
+    assert await manager.stop_timer(1) is True
+    await asyncio.sleep(0.08)
+
+    assert fired == []
+    manager.shutdown()
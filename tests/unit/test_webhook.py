@@ -0,0 +1,83 @@
+"""Unit tests for the webhook server"""
+
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestClient, TestServer
+from aiogram import Bot, Dispatcher, Router
+from aiogram.types import Message
+
+from src.bot.webhook import WebhookServer, SECRET_HEADER
+
+def update_payload(update_id: int, text: str = "hi") -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "from": {"id": 1, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    }
+
+@pytest_asyncio.fixture
+async def webhook():
+    dp = Dispatcher()
+    router = Router()
+    release = asyncio.Event()
+    handled = []
+
+    @router.message()
+    async def on_message(message: Message):
+        await release.wait()
+        handled.append(message.message_id)
+
+    dp.include_router(router)
+    bot = Bot(token="42:TEST")
+    server = WebhookServer(bot, dp, secret_token="s3cret", max_pending=2)
+    client = TestClient(TestServer(server.app))
+    await client.start_server()
+    yield server, client, release, handled
+    await client.close()
+    await bot.session.close()
+
+@pytest.mark.asyncio
+async def test_rejects_bad_secret(webhook):
+    server, client, release, handled = webhook
+    response = await client.post("/webhook", json=update_payload(1), headers={SECRET_HEADER: "wrong"})
+    assert response.status == 401
+    assert server.pending == 0
+
+@pytest.mark.asyncio
+async def test_rejects_non_ascii_secret(webhook):
+    server, client, release, handled = webhook
+    response = await client.post("/webhook", json=update_payload(1), headers={SECRET_HEADER: "s3crét"})
+    assert response.status == 401
+    assert server.pending == 0
+
+@pytest.mark.asyncio
+async def test_acknowledges_before_handling(webhook):
+    server, client, release, handled = webhook
+    headers = {SECRET_HEADER: "s3cret"}
+
+    assert (await client.post("/webhook", json=update_payload(1), headers=headers)).status == 200
+    assert (await client.post("/webhook", json=update_payload(2), headers=headers)).status == 200
+    # Handlers are still blocked, the third update is over the pending limit
+    assert (await client.post("/webhook", json=update_payload(3), headers=headers)).status == 503
+    assert handled == []
+
+    release.set()
+    assert await server.drain(timeout=1) == 0
+    assert sorted(handled) == [1, 2]
+    assert (await client.post("/webhook", json=update_payload(4), headers=headers)).status == 503
+
+@pytest.mark.asyncio
+async def test_drain_cancels_stuck_updates(webhook):
+    server, client, release, handled = webhook
+    await client.post("/webhook", json=update_payload(1), headers={SECRET_HEADER: "s3cret"})
+    response = await client.post("/webhook", data=b"not json", headers={SECRET_HEADER: "s3cret"})
+    assert response.status == 400
+
+    assert await server.drain(timeout=0.05) == 1
+    assert server.pending == 0